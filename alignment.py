@@ -0,0 +1,230 @@
+"""
+Alignment of simultaneous device traces (caller/callee of a call, ...) on a common clock.
+
+Each trace is a DataFrame with a sorted `time` column and channel columns (the
+common schema of readers.read_log). The loggers of two phones do not share a
+clock: their offset (and linear drift) can be given or estimated from the
+power signals themselves, then every trace is joined onto one clock with a
+sorted as-of merge within a tolerance. Joint energy per time window is
+computed from the combined frame with one np.bincount per channel.
+
+    traces = read_traces({'caller': caller_file, 'callee': callee_file}, ['P_BAT', 'P_RF'])
+    offset = estimate_offset(traces['caller'], traces['callee'], 'P_BAT')
+    combined = align(traces, tolerance='20ms', corrections={'callee': (offset, 0)})
+    joint_energy(combined, window='10s')     # E_P_BAT_caller, E_P_BAT_callee, ..., E_total
+
+    python alignment.py caller.csv callee.csv [--window 10s] [--output joint.csv]
+"""
+import os
+import argparse
+import numpy as np
+import pandas as pd
+
+
+def read_traces(files, columns=None):
+    """
+    Reads one trace per device with readers.read_log (format sniffed per file).
+
+    Args:
+        files: dict device name -> log file
+        columns: channels to read (all by default)
+    """
+    from readers import read_log
+
+    return {name: read_log(file_name, columns) for name, file_name in files.items()}
+
+
+def correct_clock(times, offset=0.0, drift_ppm=0.0, origin=None):
+    """
+    Moves times onto the reference clock: t + offset + drift_ppm * 1e-6 * (t - origin).
+
+    Args:
+        times: datetime64 Series or array
+        offset: seconds added to every time
+        drift_ppm: clock rate error (positive if the device clock runs slow)
+        origin: time where the offset applies (first time by default)
+    """
+    times = pd.Series(times).astype('datetime64[ns]').reset_index(drop=True)
+    if len(times) == 0:
+        return times
+    origin = times.iloc[0] if origin is None else pd.Timestamp(origin)
+    elapsed = (times - origin).dt.total_seconds().to_numpy()
+    shift = offset + drift_ppm * 1e-6 * elapsed
+    return times + pd.to_timedelta(np.round(shift * 1e9).astype(np.int64), unit='ns')
+
+
+def _binned(trace, column, start, period, bins):
+    # Mean of `column` in regular bins of `period` seconds from `start` (linear time)
+    seconds = (trace['time'] - start).dt.total_seconds().to_numpy()
+    index = np.floor(seconds / period).astype(np.int64)
+    keep = (index >= 0) & (index < bins)
+    values = trace[column].to_numpy(dtype=float)
+    keep &= ~np.isnan(values)
+    sums = np.bincount(index[keep], weights=values[keep], minlength=bins)
+    counts = np.bincount(index[keep], minlength=bins)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+    # Empty bins take the overall mean, so they do not correlate
+    return np.where(counts > 0, means, np.nanmean(means) if counts.any() else 0.0)
+
+
+def estimate_offset(reference, other, column, max_lag=30.0, period=0.05):
+    """
+    Estimates the clock offset of `other` against `reference` by cross-correlating
+    their `column` signals (e.g. the P_BAT rise when the call starts).
+
+    Both traces are binned on a grid of `period` seconds and correlated with an
+    FFT over lags of at most `max_lag` seconds, the peak being refined between bins.
+
+    Returns:
+        float: seconds to add to the times of `other` (offset of correct_clock)
+    """
+    start = min(reference['time'].iloc[0], other['time'].iloc[0])
+    end = max(reference['time'].iloc[-1], other['time'].iloc[-1])
+    bins = int((end - start).total_seconds() / period) + 1
+    a = _binned(reference, column, start, period, bins)
+    b = _binned(other, column, start, period, bins)
+    a, b = a - a.mean(), b - b.mean()
+    size = 1 << int(np.ceil(np.log2(2 * bins)))
+    correlation = np.fft.irfft(np.fft.rfft(a, size) * np.conj(np.fft.rfft(b, size)), size)
+    max_bins = min(int(max_lag / period), bins - 1)
+    lags = np.concatenate([np.arange(0, max_bins + 1), np.arange(-max_bins, 0)])
+    scores = np.concatenate([correlation[:max_bins + 1], correlation[size - max_bins:]])
+    best = int(np.argmax(scores))
+    # Parabolic interpolation of the peak for a sub-bin offset
+    left, right = scores[best - 1], scores[(best + 1) % len(scores)]
+    curvature = left - 2 * scores[best] + right
+    shift = 0.5 * (left - right) / curvature if curvature < 0 else 0.0
+    return float((lags[best] + shift) * period)
+
+
+def estimate_drift(reference, other, column, window=120.0, max_lag=30.0, period=0.05):
+    """
+    Estimates offset and linear drift of `other` from the offsets found in its
+    first and last `window` seconds.
+
+    Returns:
+        tuple: (offset in seconds at the start of `other`, drift in ppm)
+    """
+    def part(trace, first):
+        edge = trace['time'].iloc[0] + pd.Timedelta(seconds=window) if first else \
+            trace['time'].iloc[-1] - pd.Timedelta(seconds=window)
+        times = trace['time']
+        lo, hi = (0, times.searchsorted(edge, 'right')) if first else (times.searchsorted(edge, 'left'), len(times))
+        return trace.iloc[lo:hi]
+
+    head = estimate_offset(part(reference, True), part(other, True), column, max_lag, period)
+    tail = estimate_offset(part(reference, False), part(other, False), column, max_lag, period)
+    # The offsets hold at the middle of the two windows
+    span = (other['time'].iloc[-1] - other['time'].iloc[0]).total_seconds() - window
+    drift_ppm = (tail - head) / span * 1e6 if span > 0 else 0.0
+    return head - drift_ppm * 1e-6 * window / 2, drift_ppm
+
+
+def align(traces, tolerance='20ms', clock=None, direction='nearest', corrections=None):
+    """
+    Joins device traces onto a common clock with sorted as-of merges.
+
+    Args:
+        traces: dict device name -> DataFrame (sorted `time` + channel columns)
+        tolerance: largest time gap between a clock tick and a joined sample
+        clock: None for the times of the first trace, a period ('10ms') for a
+            regular grid over the time span covered by all the traces, or an
+            array of times
+        direction: 'nearest', 'backward' (last sample before the tick) or 'forward'
+        corrections: dict device name -> (offset seconds, drift ppm) for correct_clock
+
+    Returns:
+        pd.DataFrame: time, then <column>_<device> for every channel of every trace
+        (NaN where a device has no sample within the tolerance)
+    """
+    corrections = corrections or {}
+    shifted = {}
+    for name, trace in traces.items():
+        trace = trace.reset_index(drop=True)
+        times = correct_clock(trace['time'], *corrections.get(name, (0.0, 0.0)))
+        channels = trace.drop(columns='time').add_suffix(f'_{name}')
+        shifted[name] = pd.concat([times.rename('time'), channels], axis=1)
+
+    if clock is None:
+        grid = next(iter(shifted.values()))['time']
+    elif isinstance(clock, (str, pd.Timedelta)):
+        start = max(t['time'].iloc[0] for t in shifted.values())
+        end = min(t['time'].iloc[-1] for t in shifted.values())
+        grid = pd.Series(pd.date_range(start, end, freq=pd.Timedelta(clock)))
+    else:
+        grid = pd.Series(clock)
+    combined = pd.DataFrame({'time': grid.astype('datetime64[ns]').to_numpy()})
+
+    for name, trace in shifted.items():
+        if not trace['time'].is_monotonic_increasing:
+            trace = trace.sort_values('time', kind='stable')
+        combined = pd.merge_asof(combined, trace, on='time', direction=direction,
+                                 tolerance=pd.Timedelta(tolerance))
+    return combined
+
+
+def joint_energy(combined, window='10s', columns=None):
+    """
+    Energy of every aligned power column per time window (trapezoidal rule on
+    the common clock, intervals with a missing sample add nothing).
+
+    Args:
+        combined: output of align()
+        window: window length
+        columns: power columns (default: every column starting with 'P_')
+
+    Returns:
+        pd.DataFrame: window start, E_<column> in J for each column, and E_total
+        (sum of the battery columns P_BAT*)
+    """
+    columns = columns or [c for c in combined.columns if c.startswith('P_')]
+    times = combined['time']
+    if len(times) == 0:
+        return pd.DataFrame(columns=['window_start'] + [f'E_{c}' for c in columns] + ['E_total'])
+    start = times.iloc[0]
+    seconds = (times - start).dt.total_seconds().to_numpy()
+    dt = np.diff(seconds, prepend=seconds[0])
+    # Each interval goes to the window of its end sample
+    size = pd.Timedelta(window).total_seconds()
+    index = np.floor(seconds / size).astype(np.int64)
+    bins = int(index[-1]) + 1
+
+    result = pd.DataFrame({'window_start': start + pd.to_timedelta(np.arange(bins) * size, unit='s')})
+    for column in columns:
+        power = combined[column].to_numpy(dtype=float)
+        previous = np.concatenate([power[:1], power[:-1]])
+        step = dt * (previous + power) / 2.0
+        step = np.where((dt > 0) & ~np.isnan(step), step, 0.0)
+        result[f'E_{column}'] = np.bincount(index, weights=step, minlength=bins)
+    battery = [f'E_{c}' for c in columns if c.startswith('P_BAT')]
+    result['E_total'] = result[battery].sum(axis=1) if battery else np.nan
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aligns a caller and a callee log and computes joint energy")
+    parser.add_argument('caller')
+    parser.add_argument('callee')
+    parser.add_argument('--column', default='P_BAT', help="channel used to estimate the clock offset")
+    parser.add_argument('--tolerance', default='20ms')
+    parser.add_argument('--window', default='10s')
+    parser.add_argument('--drift', action='store_true', help="also estimate a linear clock drift")
+    parser.add_argument('--output', default=None, help="CSV of the per-window joint energy")
+    args = parser.parse_args()
+
+    traces = read_traces({'caller': args.caller, 'callee': args.callee}, ['P_BAT', 'P_RF'])
+    if args.drift:
+        offset, drift_ppm = estimate_drift(traces['caller'], traces['callee'], args.column)
+    else:
+        offset, drift_ppm = estimate_offset(traces['caller'], traces['callee'], args.column), 0.0
+    print(f"⏱️ Callee clock: offset {offset:+.3f} s, drift {drift_ppm:+.1f} ppm")
+
+    combined = align(traces, args.tolerance, corrections={'callee': (offset, drift_ppm)})
+    energy = joint_energy(combined, args.window)
+    matched = combined.filter(like='_callee').notna().all(axis=1).mean()
+    print(f"✅ {len(combined)} aligned samples ({matched:.1%} matched), "
+          f"caller {energy['E_P_BAT_caller'].sum():.2f} J, callee {energy['E_P_BAT_callee'].sum():.2f} J")
+    if args.output:
+        energy.to_csv(args.output, index=False)
+        print(f"💾 {os.path.basename(args.output)}")
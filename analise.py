@@ -1,7 +1,10 @@
 import pandas as pd
+from utils import read_packed_csv, RASP_FF_PACKED_COLUMN, RASP_FF_CHANNELS
 
 # Prend le CSV en local
-df = pd.read_csv(r"data\Experiment_Data\SIR_Experiment\Reels\1_5_6pro_LTE_insta_Dyna_T1_Prefecture_INSA_64sps.csv")
+# La colonne combinée "V_BAT,I_BAT,...,P_PA" est directement découpée en colonnes float
+df = read_packed_csv(r"data\Experiment_Data\SIR_Experiment\Reels\1_5_6pro_LTE_insta_Dyna_T1_Prefecture_INSA_64sps.csv",
+                     RASP_FF_PACKED_COLUMN, RASP_FF_CHANNELS)
 # print("colunas no arquico csv")
 # print(df.columns.tolist())
 # with open(r"D:\Daniel\INSA\Materias\4TCA\SIR_2\data\Experiment_Data\SIR_Experiment\Reels\1_5_6pro_3G_insta_stat_64sps.csv", encoding="utf-8") as f:
@@ -10,9 +13,8 @@ df = pd.read_csv(r"data\Experiment_Data\SIR_Experiment\Reels\1_5_6pro_LTE_insta_
 
 
 #0. Organisation des colonnes
-# fait une division de la colonne avec les valeurs qui nous interessent
-colunas_embutidas = ['V_BAT', 'I_BAT', 'P_BAT', 'V_BB', 'I_BB', 'P_BB', 'V_PA', 'I_PA', 'P_PA']
-df[colunas_embutidas] = df["V_BAT,I_BAT,P_BAT,V_BB,I_BB,P_BB,V_PA,I_PA,P_PA"].str.split(",", expand=True).astype(float)
+# les colonnes qui nous interessent sont déjà séparées par read_packed_csv
+colunas_embutidas = RASP_FF_CHANNELS
 
 
 # 1. Recalcule la puissance pour vérifier la consistance des données
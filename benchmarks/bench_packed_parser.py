@@ -0,0 +1,70 @@
+"""
+Benchmark of the packed "V_BAT,I_BAT,P_BAT,V_BB,I_BB,P_BB,V_PA,I_PA,P_PA" column parsing.
+
+Compares the former pd.read_csv + Series.str.split + pd.to_numeric path with
+utils.read_packed_csv (float64 and float32) on a synthetic rasp_ff log.
+
+Usage:
+    python benchmarks/bench_packed_parser.py [rows]
+"""
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from utils import read_packed_csv, RASP_FF_PACKED_COLUMN, RASP_FF_CHANNELS
+
+
+def write_synthetic_rasp_ff(file_name, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    timestamps = pd.Timestamp('2025-05-20 14:00:00') + pd.to_timedelta(np.arange(rows) / 64, unit='s')
+    values = rng.uniform(0, 4, size=(rows, len(RASP_FF_CHANNELS)))
+    packed = pd.DataFrame(values).round(6).astype(str).agg(','.join, axis=1)
+    pd.DataFrame({
+        'Timestamp': timestamps.strftime('%Y-%m-%d %H:%M:%S.%f'),
+        RASP_FF_PACKED_COLUMN: packed,
+        'acc_samples_total': np.arange(rows) * 16,
+    }).to_csv(file_name, index=False)
+
+
+def parse_str_split(file_name):
+    df = pd.read_csv(file_name)
+    power_data = df[RASP_FF_PACKED_COLUMN].str.split(',', expand=True)
+    power_data.columns = RASP_FF_CHANNELS
+    power_data = power_data.apply(pd.to_numeric, errors='coerce')
+    return pd.concat([df, power_data], axis=1)
+
+
+def timed(function, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file_name = os.path.join(tmp, 'bench_rasp_ff.csv')
+        write_synthetic_rasp_ff(file_name, rows)
+        size_mb = os.path.getsize(file_name) / 1e6
+
+        t_split, reference = timed(lambda: parse_str_split(file_name))
+        t_fast, fast = timed(lambda: read_packed_csv(file_name, RASP_FF_PACKED_COLUMN, RASP_FF_CHANNELS))
+        t_fast32, _ = timed(lambda: read_packed_csv(file_name, RASP_FF_PACKED_COLUMN, RASP_FF_CHANNELS,
+                                                    dtype=np.float32))
+
+    assert np.array_equal(reference[RASP_FF_CHANNELS].to_numpy(), fast[RASP_FF_CHANNELS].to_numpy())
+
+    print(f"{rows} rows, {size_mb:.1f} MB")
+    print(f"{'method':<28}{'time (s)':>10}{'rows/s':>14}{'speedup':>10}")
+    for name, t in [('str.split + to_numeric', t_split),
+                    ('read_packed_csv float64', t_fast),
+                    ('read_packed_csv float32', t_fast32)]:
+        print(f"{name:<28}{t:>10.3f}{rows / t:>14,.0f}{t_split / t:>9.1f}x")
@@ -0,0 +1,341 @@
+"""
+Load test of the simulator backend (website/server/server.js).
+
+The server is started locally with node (or an already running one is given
+with --url), then asyncio clients on keep-alive connections replay random
+activity timelines built from the scenario_id of the summary CSVs: device and
+network of a measured scenario, activities (with their quality or voice
+technology) and durations of 1 to 60 minutes. Every (concurrency, activities
+per request) of the matrix runs for a fixed number of requests after a warm-up,
+and the p50/p95/p99 latency, throughput and error/fallback rates are written
+as JSON like run_benchmarks.py. Timelines are drawn from a seeded generator,
+so two runs replay the same requests.
+
+Usage:
+    python benchmarks/load_test.py [--concurrency 1 8 32] [--activities 1 4 16]
+                                   [--requests 2000] [--endpoint batch] [--compare old.json]
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import subprocess
+from urllib.parse import urlsplit
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..'))
+sys.path.insert(0, BENCH_DIR)
+
+from run_benchmarks import _metadata, DEFAULT_RESULTS_DIR
+
+SERVER_DIR = os.path.join(BENCH_DIR, '..', 'website', 'server')
+DEFAULT_PORT = 5055
+CONDITIONS = {'stat': 'static', 'dyna': 'moving'}
+VOICE_TECHS = {'umts': 'UMTS', 'volte': 'VoLTE', 'vowifi': 'VoWIFI'}
+NETWORK_NAMES = {'4g': '4G', 'lte': 'LTE', '5g': '5G', '3g': '3G', 'wifi': 'WiFi'}
+
+
+# =================== TIMELINES ===================
+
+def scenario_catalog(server_dir=SERVER_DIR):
+    """
+    Devices, networks and activities found in the scenario_id of the summary CSVs.
+
+    Returns:
+        dict: devices (list), networks (list of (device, network) of the
+        measured scenarios) and activities (list of {'name', 'quality'?})
+    """
+    from scenario_engine import ScenarioEngine, STREAMING_APPS
+
+    engine = ScenarioEngine(server_dir)
+    networks, activities = [], []
+    for key in engine.scenarios:
+        parts = key.split('_')
+        if len(parts) < 3 or parts[0].isdigit():
+            continue
+        device, network, rest = parts[0], parts[1], parts[2:]
+        if rest[0] in STREAMING_APPS and len(rest) == 3 and rest[2] in CONDITIONS:
+            activity = {'name': rest[0], 'quality': rest[1]}
+        elif len(rest) == 1 and rest[0] in VOICE_TECHS:
+            activity = {'name': 'call', 'quality': VOICE_TECHS[rest[0]]}
+        elif len(rest) == 2 and rest[1] in CONDITIONS:
+            activity = {'name': rest[0]}
+        else:
+            continue
+        networks.append((device, NETWORK_NAMES.get(network, network)))
+        if activity not in activities:
+            activities.append(activity)
+    devices = sorted(set(engine.device_specs) | {device for device, _ in networks})
+    return {'devices': devices, 'networks': networks, 'activities': activities}
+
+
+def make_timeline(rng, catalog, n_activities):
+    """
+    One /calculate request: the device and network of a measured scenario (or
+    a device of batteries_ue.csv one time in four) and n random activities.
+    """
+    device, network = rng.choice(catalog['networks'])
+    if rng.random() < 0.25:
+        device = rng.choice(catalog['devices'])
+    activities = [{**rng.choice(catalog['activities']), 'duration': rng.randint(1, 60)}
+                  for _ in range(n_activities)]
+    return {
+        'device': device,
+        'network': network,
+        'mobility': 'moving' if rng.random() < 0.2 else 'static',
+        'activities': activities,
+    }
+
+
+# =================== SERVER AND CLIENT ===================
+
+def start_server(port, cache_size=None, server_dir=SERVER_DIR, timeout=15.0):
+    """
+    Starts server.js with node on a port (logging off), waits until it answers.
+    """
+    env = {**os.environ, 'PORT': str(port), 'LOG_MODE': 'off'}
+    if cache_size is not None:
+        env['CALC_CACHE_SIZE'] = str(cache_size)
+    process = subprocess.Popen(['node', 'server.js'], cwd=server_dir, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server.js exited: {process.stderr.read().decode(errors='replace').strip()}")
+        try:
+            asyncio.run(asyncio.wait_for(_request('127.0.0.1', port, 'GET', '/'), 1.0))
+            return process
+        except (OSError, asyncio.TimeoutError):
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"server.js did not answer on port {port} within {timeout:g} s")
+
+
+class Connection:
+    """
+    Keep-alive HTTP/1.1 connection sending JSON requests.
+    """
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        data = json.dumps(body).encode() if body is not None else b''
+        self.writer.write(f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                          f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data)
+        try:
+            status, headers, payload = await _read_response(self.reader)
+        except Exception:
+            await self.close()
+            raise
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, payload
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+async def _read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed by the server")
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            chunks.append(await reader.readexactly(size + 2))
+            if size == 0:
+                break
+        payload = b''.join(chunk[:-2] for chunk in chunks)
+    else:
+        payload = await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers, payload
+
+
+async def _request(host, port, method, path, body=None):
+    connection = Connection(host, port)
+    try:
+        return await connection.request(method, path, body)
+    finally:
+        await connection.close()
+
+
+# =================== LOAD ===================
+
+def _fallbacks(status, payload, endpoint):
+    # (fallback activities, activities) of a successful response
+    if status != 200:
+        return 0, 0
+    answer = json.loads(payload)
+    results = answer['results'] if endpoint == 'batch' else [answer]
+    details = [a for result in results for a in result.get('activities', [])]
+    return sum(a['fallback'] for a in details), len(details)
+
+
+async def _load(host, port, bodies, concurrency, endpoint):
+    """
+    Sends the bodies with `concurrency` clients; returns per-request latencies,
+    status (None on connection errors), fallbacks and the wall time.
+    """
+    path = '/calculate/batch' if endpoint == 'batch' else '/calculate'
+    latencies = np.full(len(bodies), np.nan)
+    failed = np.zeros(len(bodies), dtype=bool)
+    fallback = np.zeros((len(bodies), 2), dtype=np.int64)
+    queue = iter(range(len(bodies)))
+
+    async def client():
+        connection = Connection(host, port)
+        for i in queue:
+            start = time.perf_counter()
+            try:
+                status, payload = await connection.request('POST', path, bodies[i])
+                latencies[i] = time.perf_counter() - start
+                failed[i] = status != 200
+                fallback[i] = _fallbacks(status, payload, endpoint)
+            except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError):
+                latencies[i] = time.perf_counter() - start
+                failed[i] = True
+        await connection.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, failed, fallback, time.perf_counter() - start
+
+
+def run(concurrency_list, activity_counts, n_requests, host, port, endpoint='calculate',
+        batch_size=50, warmup=200, distinct=0, seed=0):
+    """
+    Runs the load matrix against a running server.
+
+    Args:
+        endpoint: 'calculate' (one timeline per request) or 'batch' (batch_size per request)
+        distinct: number of distinct timelines replayed (0: every request is new,
+            the result cache of the server never hits)
+
+    Returns:
+        list: one dict per (concurrency, activities): latency percentiles (ms),
+        requests/s, timelines/s, error and fallback rates
+    """
+    catalog = scenario_catalog()
+    results = []
+    for n_activities in activity_counts:
+        for concurrency in concurrency_list:
+            # Same seed per cell: a rerun replays the same requests
+            rng = random.Random(f"{seed}-{n_activities}")
+            pool = [make_timeline(rng, catalog, n_activities) for _ in range(distinct)]
+            per_request = batch_size if endpoint == 'batch' else 1
+
+            def body():
+                timelines = [rng.choice(pool) if pool else make_timeline(rng, catalog, n_activities)
+                             for _ in range(per_request)]
+                return {'timelines': timelines} if endpoint == 'batch' else timelines[0]
+
+            asyncio.run(_load(host, port, [body() for _ in range(warmup)], concurrency, endpoint))
+            bodies = [body() for _ in range(n_requests)]
+            latencies, failed, fallback, wall = asyncio.run(_load(host, port, bodies, concurrency, endpoint))
+
+            ok = latencies[~failed] * 1000
+            p50, p95, p99 = np.percentile(ok, [50, 95, 99]) if len(ok) else (None, None, None)
+            record = {
+                'endpoint': endpoint, 'concurrency': concurrency, 'activities': n_activities,
+                'requests': n_requests, 'timelines_per_request': per_request, 'distinct': distinct,
+                'wall_s': wall,
+                'requests_per_s': len(ok) / wall,
+                'timelines_per_s': len(ok) * per_request / wall,
+                'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99,
+                'max_ms': float(ok.max()) if len(ok) else None,
+                'error_rate': float(failed.mean()),
+                'fallback_rate': float(fallback[:, 0].sum() / fallback[:, 1].sum()) if fallback[:, 1].sum() else None,
+            }
+            results.append(record)
+            print(f"✅ {endpoint:<9} c={concurrency:<4} {n_activities:>3} activities  "
+                  f"{record['requests_per_s']:9,.0f} req/s  p50 {p50 or 0:7.2f}  p95 {p95 or 0:7.2f}  "
+                  f"p99 {p99 or 0:7.2f} ms  errors {record['error_rate']:.1%}  "
+                  f"fallbacks {record['fallback_rate'] or 0:.1%}", flush=True)
+    return results
+
+
+def compare(results, baseline_file):
+    """
+    Prints the throughput and p95 ratio of each record against an earlier results file.
+    """
+    with open(baseline_file) as f:
+        baseline = {(r['endpoint'], r['concurrency'], r['activities']): r for r in json.load(f)['results']}
+    print(f"\n📊 Compared with {baseline_file} (throughput ratio < 1 = slower now)")
+    for record in results:
+        old = baseline.get((record['endpoint'], record['concurrency'], record['activities']))
+        if not old or not old['requests_per_s'] or not old['p95_ms'] or not record['p95_ms']:
+            continue
+        ratio = record['requests_per_s'] / old['requests_per_s']
+        flag = '⚠️' if ratio < 0.8 else '  '
+        print(f"{flag} {record['endpoint']:<9} c={record['concurrency']:<4} {record['activities']:>3} activities  "
+              f"{old['requests_per_s']:9,.0f} -> {record['requests_per_s']:9,.0f} req/s  x{ratio:.2f}  "
+              f"p95 {old['p95_ms']:.2f} -> {record['p95_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test of the simulator backend")
+    parser.add_argument('--concurrency', nargs='+', type=int, default=[1, 8, 32])
+    parser.add_argument('--activities', nargs='+', type=int, default=[1, 4, 16],
+                        help="activities per timeline")
+    parser.add_argument('--requests', type=int, default=2000, help="measured requests per cell")
+    parser.add_argument('--warmup', type=int, default=200)
+    parser.add_argument('--endpoint', choices=['calculate', 'batch'], default='calculate')
+    parser.add_argument('--batch-size', type=int, default=50, help="timelines per /calculate/batch request")
+    parser.add_argument('--distinct', type=int, default=0,
+                        help="distinct timelines replayed (0: all different, no cache hits)")
+    parser.add_argument('--cache-size', type=int, default=None, help="CALC_CACHE_SIZE of the started server")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--url', default=None, help="running server to test instead of starting one")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="port of the started server")
+    parser.add_argument('--output', default=None, help="JSON results file")
+    parser.add_argument('--compare', default=None, help="earlier JSON results file")
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port or 80
+    else:
+        host, port = '127.0.0.1', args.port
+        server = start_server(port, args.cache_size)
+    try:
+        results = run(args.concurrency, args.activities, args.requests, host, port, args.endpoint,
+                      args.batch_size, args.warmup, args.distinct, args.seed)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    meta = _metadata()
+    try:
+        meta['node'] = subprocess.run(['node', '--version'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        meta['node'] = None
+    meta.update({'url': args.url, 'cache_size': args.cache_size, 'seed': args.seed})
+    output = args.output or os.path.join(DEFAULT_RESULTS_DIR, f"load_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({'meta': meta, 'results': results}, f, indent=1)
+    print(f"💾 {output}")
+
+    if args.compare:
+        compare(results, args.compare)
@@ -0,0 +1,286 @@
+"""
+Benchmark suite of the processing pipeline on synthetic captures.
+
+For every format, SPS and duration of the matrix a synthetic file is generated
+(once, kept in --data-dir), then each stage reading that format runs in a fresh
+process so its wall time and peak RSS are not polluted by the previous stages.
+Results are written as JSON (one record per stage and file) and can be compared
+with an earlier run.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--sps 64 256 1024] [--durations 60 600 3600]
+                                        [--stages open_file_nf1 ...] [--compare old.json]
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..'))
+sys.path.insert(0, BENCH_DIR)
+
+DEFAULT_DATA_DIR = os.path.join(BENCH_DIR, '..', '.cache', 'bench_data')
+DEFAULT_RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+
+# =================== STAGES ===================
+
+def _read_rasp_ff(file_name):
+    from utils import _read_rasp_ff
+    return _read_rasp_ff(file_name)
+
+
+def _open_file_rasp_ff(file_name):
+    from utils import open_file_nf_6pro_3ch_rasp_ff
+    return open_file_nf_6pro_3ch_rasp_ff(file_name)
+
+
+def _open_file_rasp_ff_chunked(file_name):
+    from utils import open_file_nf_6pro_3ch_rasp_ff_chunked
+    return open_file_nf_6pro_3ch_rasp_ff_chunked(file_name, chunksize=200_000)
+
+
+def _dataset_analyze_rasp_ff(file_name):
+    from utils import dataset_analyze_rasp_ff
+    return dataset_analyze_rasp_ff(file_name)
+
+
+def _open_file_nf1(file_name):
+    from utils import open_file_nf1
+    return open_file_nf1(file_name)
+
+
+def _measurement_dataset_analyze(file_name):
+    from utils import measurement_dataset_analyze
+    return measurement_dataset_analyze(file_name, 100)
+
+
+def _parse_simple_power_csv(file_name):
+    from sequence_energy_simulator import parse_simple_power_csv
+    return parse_simple_power_csv(file_name)
+
+
+def notebook_scenario_summary(result_df):
+    """
+    Aggregation cell of the *_processing notebooks (scenario_id, then mean per scenario).
+    """
+    import pandas as pd
+
+    result_df['scenario_id'] = (
+        result_df['Device'].astype(str).str.strip() + "_" +
+        result_df['RAN Technology'].astype(str).str.strip() + "_" +
+        result_df['Platform'].astype(str).str.strip() + "_" +
+        result_df['Condition'].astype(str).str.strip()
+    )
+    energy_cols = ['E_RF Jm', 'E_BAT Jm', 'E_BB Jm', 'E_PA Jm']
+    result_df[energy_cols] = result_df[energy_cols].apply(pd.to_numeric, errors='coerce')
+    scenario_summary_df = result_df.groupby('scenario_id')[energy_cols].mean().reset_index()
+    scenario_summary_df.columns = ['scenario_id', 'E_RF_Jm', 'E_BAT_Jm', 'E_BB_Jm', 'E_PA_Jm']
+    return scenario_summary_df
+
+
+def _scenario_summary_setup(file_name, copies=20_000):
+    # result_df of `copies` files spread over a few hundred scenarios (not timed)
+    import pandas as pd
+    from utils import rasp_ff_row
+
+    row, _ = rasp_ff_row(file_name)
+    result_df = pd.DataFrame([row] * copies)
+    result_df['Platform'] = [f"app{i % 50}" for i in range(copies)]
+    result_df['RAN Technology'] = [['LTE', '5G', '3G', 'WiFi'][i % 4] for i in range(copies)]
+    return result_df
+
+
+# stage name -> (format, function, optional untimed setup returning the function argument,
+# whose length is then the rows of the stage)
+STAGES = {
+    'read_rasp_ff': ('rasp_ff', _read_rasp_ff, None),
+    'open_file_nf_6pro_3ch_rasp_ff': ('rasp_ff', _open_file_rasp_ff, None),
+    'open_file_nf_6pro_3ch_rasp_ff_chunked': ('rasp_ff', _open_file_rasp_ff_chunked, None),
+    'dataset_analyze_rasp_ff': ('rasp_ff', _dataset_analyze_rasp_ff, None),
+    'notebook_scenario_summary': ('rasp_ff', notebook_scenario_summary, _scenario_summary_setup),
+    'open_file_nf1': ('nf1', _open_file_nf1, None),
+    'measurement_dataset_analyze': ('nf1', _measurement_dataset_analyze, None),
+    'parse_simple_power_csv': ('call', _parse_simple_power_csv, None),
+}
+
+
+def _status_mb(field):
+    # VmRSS / VmHWM of /proc/self/status in MB, None where /proc is missing
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss():
+    """
+    Resets the peak RSS (VmHWM) of the process to its current RSS.
+
+    ru_maxrss cannot be reset and survives fork/exec, so on Linux the high water
+    mark is cleared through /proc/self/clear_refs. Returns False where it cannot.
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb():
+    peak = _status_mb('VmHWM')
+    if peak is not None:
+        return peak
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KB on Linux, bytes on macOS
+    return peak / 1024 / (1024 if sys.platform == 'darwin' else 1)
+
+
+def _run_stage(stage, file_name, repeat):
+    """
+    Runs one stage in the current (fresh) process and measures it.
+
+    The peak RSS is the high water mark reached while the stage runs (reset
+    after imports and setup), baseline_rss_mb the RSS before it and stage_rss_mb
+    the difference, i.e. the memory the stage itself needs. Stages with a setup
+    also return the rows of the table they process.
+    """
+    _, function, setup = STAGES[stage]
+    import utils  # noqa: F401  Imports are not part of the measure
+    argument = setup(file_name) if setup else file_name
+    reset = _reset_peak_rss()
+    baseline = _status_mb('VmRSS') if reset else _peak_rss_mb()
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(argument.copy() if setup else argument)
+        best = min(best, time.perf_counter() - start)
+    peak = _peak_rss_mb()
+    measure = {'wall_s': best, 'peak_rss_mb': peak, 'baseline_rss_mb': baseline,
+               'stage_rss_mb': max(peak - baseline, 0.0)}
+    if setup:
+        measure['rows'] = len(argument)
+    return measure
+
+
+def _count_lines(file_name):
+    with open(file_name, 'rb') as f:
+        return sum(block.count(b'\n') for block in iter(lambda: f.read(1 << 22), b'')) - 1
+
+
+def _metadata():
+    import numpy as np
+    import pandas as pd
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'system': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def run(stages, sps_list, durations, data_dir, repeat=1):
+    """
+    Runs the benchmark matrix.
+
+    Returns:
+        list: one dict per (stage, sps, duration): rows, file size, wall time,
+        rows/s, peak RSS and the RSS added by the stage
+    """
+    from synthetic import generate
+
+    results = []
+    spawn = multiprocessing.get_context('spawn')
+    for stage in stages:
+        fmt, _, setup = STAGES[stage]
+        for sps in sps_list:
+            for duration in durations:
+                file_name = generate(fmt, sps, duration, data_dir)
+                # Rows of the log, or of the table built by the setup (e.g. the
+                # aggregated result_df of notebook_scenario_summary)
+                rows = None if setup else _count_lines(file_name)
+                try:
+                    with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as executor:
+                        measure = executor.submit(_run_stage, stage, file_name, repeat).result()
+                    error = None
+                except Exception as e:
+                    measure, error = {'wall_s': None, 'peak_rss_mb': None, 'baseline_rss_mb': None,
+                                      'stage_rss_mb': None}, str(e)
+                rows = measure.pop('rows', rows)
+                record = {
+                    'stage': stage, 'format': fmt, 'sps': sps, 'duration_s': duration,
+                    'rows': rows, 'file_mb': os.path.getsize(file_name) / 1e6,
+                    **measure,
+                    'rows_per_s': rows / measure['wall_s'] if measure['wall_s'] else None,
+                    'error': error,
+                }
+                results.append(record)
+                if error:
+                    print(f"❌ Error with {stage} ({sps} SPS, {duration:g} s): {error}")
+                else:
+                    print(f"✅ {stage:<40} {sps:>5} SPS {duration:>7g} s  {rows:>10} rows  "
+                          f"{record['wall_s']:8.3f} s  {record['rows_per_s']:>12,.0f} rows/s  "
+                          f"{record['peak_rss_mb']:8.1f} MB peak  +{record['stage_rss_mb']:.1f} MB", flush=True)
+    return results
+
+
+def compare(results, baseline_file):
+    """
+    Prints the wall time ratio of each record against an earlier results file.
+    """
+    with open(baseline_file) as f:
+        baseline = {(r['stage'], r['sps'], r['duration_s']): r for r in json.load(f)['results']}
+    print(f"\n📊 Compared with {baseline_file} (ratio > 1 = slower now)")
+    for record in results:
+        old = baseline.get((record['stage'], record['sps'], record['duration_s']))
+        if not old or not old['wall_s'] or not record['wall_s']:
+            continue
+        ratio = record['wall_s'] / old['wall_s']
+        flag = '⚠️' if ratio > 1.2 else '  '
+        print(f"{flag} {record['stage']:<40} {record['sps']:>5} SPS {record['duration_s']:>7g} s  "
+              f"{old['wall_s']:8.3f} s -> {record['wall_s']:8.3f} s  x{ratio:.2f}  "
+              f"RSS +{old.get('stage_rss_mb') or 0:.0f} -> +{record['stage_rss_mb']:.0f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark suite on synthetic PAC1954 captures")
+    parser.add_argument('--stages', nargs='+', choices=sorted(STAGES), default=list(STAGES))
+    parser.add_argument('--sps', nargs='+', type=int, default=[64, 256, 1024])
+    parser.add_argument('--durations', nargs='+', type=float, default=[60, 600],
+                        help="capture durations in seconds (e.g. 60 600 3600 10800)")
+    parser.add_argument('--repeat', type=int, default=1, help="runs per stage, the best time is kept")
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help="where synthetic files are kept")
+    parser.add_argument('--output', default=None, help="JSON results file")
+    parser.add_argument('--compare', default=None, help="earlier JSON results file")
+    args = parser.parse_args()
+
+    results = run(args.stages, args.sps, args.durations, args.data_dir, args.repeat)
+    output = args.output or os.path.join(DEFAULT_RESULTS_DIR, f"bench_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump({'meta': _metadata(), 'results': results}, f, indent=1)
+    print(f"💾 {output}")
+
+    if args.compare:
+        compare(results, args.compare)
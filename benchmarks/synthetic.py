@@ -0,0 +1,175 @@
+"""
+Generators of realistic synthetic PAC1954 captures, in each format read by the repo.
+
+    rasp_ff   Timestamp,"V_BAT,I_BAT,P_BAT,V_BB,I_BB,P_BB,V_PA,I_PA,P_PA",acc_BAT_Wh,...,acc_samples_total,useful_data
+              one line per 16 samples (the Raspberry Pi sampler aggregates them)
+    nf1       V_BAT,m_sec_ms with "V_BAT,I_BAT,P_BAT,V_RF,I_RF,P_RF,useful_data,useful_state,count"
+              and a "%M:%S.%f" clock wrapping every hour, one line per sample
+    call      "dd-mm HH:MM,SS.ffffff,"P_BAT,P_RF,..."" (sequence_energy_simulator), one line per sample
+
+Power follows a baseline with random activity bursts (screen, radio), so the
+files compress and parse like real captures. Files are written in blocks, so
+multi-hour captures at 1024 SPS never need to fit in memory.
+
+Usage:
+    python benchmarks/synthetic.py rasp_ff 1024 3600 out.csv
+"""
+import os
+import sys
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from utils import RASP_FF_PACKED_COLUMN, NF1_PACKED_COLUMN
+
+FORMATS = ['rasp_ff', 'nf1', 'call']
+RASP_FF_SAMPLES_PER_LINE = 16
+BLOCK_ROWS = 500_000
+START = pd.Timestamp('2025-05-20 14:00:00')
+
+
+def _power_profile(rng, rows, base, burst, rate):
+    """
+    Baseline power with bursts of activity (W), plus measurement noise.
+    """
+    bursts = rng.random(rows) < rate
+    level = np.maximum.accumulate(np.where(bursts, np.arange(rows), 0))
+    active = (np.arange(rows) - level) < 40
+    return base + burst * active * rng.uniform(0.5, 1.0, rows) + rng.normal(0, base * 0.05, rows)
+
+
+def _channels(rng, rows):
+    v_bat = 3.85 + rng.normal(0, 0.005, rows)
+    p_bat = np.abs(_power_profile(rng, rows, 1.0, 2.0, 0.01))
+    v_bb = 3.79 + rng.normal(0, 0.005, rows)
+    p_bb = np.abs(_power_profile(rng, rows, 0.3, 0.8, 0.02))
+    v_pa = 3.70 + rng.normal(0, 0.005, rows)
+    p_pa = np.abs(_power_profile(rng, rows, 0.05, 0.4, 0.005))
+    return v_bat, p_bat, v_bb, p_bb, v_pa, p_pa
+
+
+def _rows(sps, duration_s, samples_per_line=1):
+    return max(int(duration_s * sps / samples_per_line), 2)
+
+
+def _write_blocks(file_name, header, total_rows, write_block, seed):
+    rng = np.random.default_rng(seed)
+    with open(file_name, 'w', newline='') as f:
+        f.write(header + '\n')
+        for start in range(0, total_rows, BLOCK_ROWS):
+            f.write(write_block(rng, start, min(BLOCK_ROWS, total_rows - start)))
+    return total_rows
+
+
+def write_rasp_ff(file_name, sps=64, duration_s=600, seed=0):
+    """
+    Writes a rasp_ff capture and returns its number of data lines.
+    """
+    step = RASP_FF_SAMPLES_PER_LINE / sps
+    accumulated = np.zeros(3)
+
+    def block(rng, start, rows):
+        index = np.arange(start, start + rows)
+        times = START.to_datetime64() + (index * step * 1e6).astype('timedelta64[us]')
+        stamps = np.char.replace(np.datetime_as_string(times, unit='us'), 'T', ' ')
+        v_bat, p_bat, v_bb, p_bb, v_pa, p_pa = _channels(rng, rows)
+        energy = np.cumsum(np.column_stack([p_bat, p_bb, p_pa]) * step / 3600, axis=0) + accumulated
+        accumulated[:] = energy[-1]
+        useful = ((index * step) % 300 < 240).astype(int)
+        lines = [
+            f'{t},"{a:.6f},{a2:.6f},{a3:.6f},{b:.6f},{b2:.6f},{b3:.6f},{c:.6f},{c2:.6f},{c3:.6f}",'
+            f'{e1!r},{e2!r},{e3!r},{n},{u}'
+            for t, a, a2, a3, b, b2, b3, c, c2, c3, e1, e2, e3, n, u in zip(
+                stamps.tolist(), v_bat, p_bat / v_bat, p_bat, v_bb, p_bb / v_bb, p_bb, v_pa, p_pa / v_pa, p_pa,
+                energy[:, 0].tolist(), energy[:, 1].tolist(), energy[:, 2].tolist(),
+                (index * RASP_FF_SAMPLES_PER_LINE).tolist(), useful.tolist())
+        ]
+        return '\n'.join(lines) + '\n'
+
+    header = f'Timestamp,"{RASP_FF_PACKED_COLUMN}",acc_BAT_Wh,acc_BB_Wh,acc_PA_Wh,acc_samples_total,useful_data'
+    return _write_blocks(file_name, header, _rows(sps, duration_s, RASP_FF_SAMPLES_PER_LINE), block, seed)
+
+
+def write_nf1(file_name, sps=100, duration_s=600, seed=0):
+    """
+    Writes an nf1 capture ("%M:%S.%f" clock starting at 58:00) and returns its number of lines.
+    """
+    count = max(int(round(1024 / sps)), 1)
+
+    def block(rng, start, rows):
+        ms = 58 * 60_000 + (np.arange(start, start + rows) * 1000 // sps)
+        minutes, seconds, millis = (ms // 60_000) % 60, (ms // 1000) % 60, ms % 1000
+        v_bat, p_bat, v_rf, p_rf, _, _ = _channels(rng, rows)
+        lines = [
+            f'"{a:.2f},{a2:.6f},{a3:.6f},{b:.1f},{b2:.6f},{b3:.6f},1,1,{count}",{m:02d}:{s:02d}.{f:03d}'
+            for a, a2, a3, b, b2, b3, m, s, f in zip(
+                v_bat, p_bat / v_bat, p_bat, v_rf, p_rf / v_rf, p_rf,
+                minutes.tolist(), seconds.tolist(), millis.tolist())
+        ]
+        return '\n'.join(lines) + '\n'
+
+    return _write_blocks(file_name, f'{NF1_PACKED_COLUMN},m_sec_ms', _rows(sps, duration_s), block, seed)
+
+
+def write_call(file_name, sps=64, duration_s=600, seed=0):
+    """
+    Writes a call capture for parse_simple_power_csv and returns its number of lines.
+    """
+    def block(rng, start, rows):
+        times = START.to_datetime64() + (np.arange(start, start + rows) * 1e6 / sps).astype('timedelta64[us]')
+        text = np.datetime_as_string(times, unit='us')
+        _, p_bat, _, p_bb, _, p_pa = _channels(rng, rows)
+        p_rf = np.minimum(p_bb + p_pa, p_bat * 1.02)  # A few RF > BAT rows, like noisy captures
+        lines = [
+            f'{t[8:10]}-{t[5:7]} {t[11:16]},{t[17:]},"{b:.6f},{r:.6f},{b:.3f}"'
+            for t, b, r in zip(text.tolist(), p_bat, p_rf)
+        ]
+        return '\n'.join(lines) + '\n'
+
+    return _write_blocks(file_name, 'date,time,"P_BAT,P_RF,P_BAT_avg"', _rows(sps, duration_s), block, seed)
+
+
+WRITERS = {
+    'rasp_ff': write_rasp_ff,
+    'nf1': write_nf1,
+    'call': write_call,
+}
+
+
+def synthetic_file_name(fmt, sps, duration_s):
+    """
+    File name following the naming convention of each format.
+    """
+    minutes = int(duration_s // 60)
+    if fmt == 'rasp_ff':
+        return f"1_5_6pro_LTE_bench{minutes}min_stat_{sps}sps.csv"
+    if fmt == 'nf1':
+        return f"1_5_X_4Gn1_BENCH_{minutes}min_Eco_{sps}sps.csv"
+    return f"iPX_CALL_bench_{sps}sps_{minutes}min_pac1954.csv"
+
+
+def generate(fmt, sps, duration_s, directory, seed=0):
+    """
+    Returns the path of a synthetic file, writing it only if it does not exist yet.
+    """
+    os.makedirs(directory, exist_ok=True)
+    file_name = os.path.join(directory, synthetic_file_name(fmt, sps, duration_s))
+    if not os.path.exists(file_name):
+        tmp = f"{file_name}.{os.getpid()}.tmp"
+        WRITERS[fmt](tmp, sps, duration_s, seed)
+        os.replace(tmp, file_name)
+    return file_name
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Writes a synthetic PAC1954 capture")
+    parser.add_argument('format', choices=FORMATS)
+    parser.add_argument('sps', type=int)
+    parser.add_argument('duration', type=float, help="seconds")
+    parser.add_argument('output')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rows = WRITERS[args.format](args.output, args.sps, args.duration, args.seed)
+    print(f"✅ {args.output}: {rows} lines, {os.path.getsize(args.output) / 1e6:.1f} MB")
@@ -0,0 +1,465 @@
+"""
+Incremental build of the website scenario summaries (website/server/*_scenario_summary_df.csv).
+
+Same results as the export blocks of the *_processing notebooks, but the
+per-file results are kept in a small SQLite state together with the size and
+mtime of each raw file. On the next build only the new or changed files are
+processed, only the scenario_id they contribute to are re-aggregated, and the
+summary CSV is replaced atomically so the Express server never reads a
+half-written file.
+
+Next to each mean, the summaries carry the number of repetitions and the
+bootstrap standard error and 95 % percentile interval of E_BAT_Jm and E_RF_Jm
+(<column>_se, <column>_ci_low, <column>_ci_high).
+
+After the build, website/server/scenario_index.json (the index loaded by the
+server, see scenario_index.py) is compiled again from the summaries.
+
+The call summary is not handled here: its readers only exist in
+call_processing.ipynb.
+
+Usage:
+    python build_summaries.py [--category short_video ...] [--full] [--workers N]
+"""
+import os
+import json
+import sqlite3
+import argparse
+import pandas as pd
+from utils import analyze_files
+from uncertainty import scenario_intervals, DEFAULT_RESAMPLES
+from scenario_index import compile_index
+
+DEFAULT_DATA_DIR = os.path.join('.', 'data', 'Experiment_Data')
+DEFAULT_SERVER_DIR = os.path.join('.', 'website', 'server')
+DEFAULT_STATE = os.path.join('.', '.cache', 'summaries.sqlite')
+
+# Columns of the summaries given a bootstrap confidence interval (uncertainty module)
+INTERVAL_COLUMNS = ['E_BAT_Jm', 'E_RF_Jm']
+INTERVAL_SUFFIXES = ['se', 'ci_low', 'ci_high']
+
+RASP_FF_ENERGY = {'E_RF Jm': 'E_RF_Jm', 'E_BAT Jm': 'E_BAT_Jm', 'E_BB Jm': 'E_BB_Jm', 'E_PA Jm': 'E_PA_Jm'}
+
+# Normalization of the video streaming names (video_streaming_processing.ipynb)
+STREAMING_TECH_MAP = {
+    '4Gn1': 'LTE',
+    '4Gn': 'LTE',
+    '4GSRS': 'LTE',
+    '5Gn3': '5G',
+    '5Gn78': '5G',
+    '3G': '3G',
+    'WIFI-2.4GHz': 'WiFi',
+    'WIFI-5GHz': 'WiFi',
+}
+STREAMING_QUALITY_MAP = {
+    'Bonne': 'Good',
+    'TRES-Bonne': 'VeryGood',
+    'OPTIMAL': 'Optimal',
+    'Eco': 'Eco',
+    'Auto': 'Auto',
+    'HIGH': 'High',
+    'MAX': 'Max',
+    '720p': '720p',
+    '480p': '480p',
+    '360p': '360p',
+}
+
+
+# Files of the video streaming summary: video_streaming_processing.ipynb analyzes an
+# explicit list, not every CSV of its folder (same order as the notebook)
+STREAMING_FILES = [
+    '1_5_12MINI_4Gn1_AMAZON_15min_Bonne_100sps.csv',
+    '1_5_12MINI_4Gn1_AMAZON_30min_Bonne_100sps.csv',
+    '1_5_12MINI_4Gn1_AMAZON_30min_OPTIMAL_100sps.csv',
+    '1_5_12MINI_4Gn1_APPLE_15min_Auto_100sps.csv',
+    '1_5_12MINI_4Gn1_APPLE_15min_HIGH_100sps.csv',
+    '1_5_12MINI_4Gn1_APPLE_30min_HIGH_100sps.csv',
+    '1_5_12MINI_4Gn1_DISNEY_15min_Auto_100sps.csv',
+    '1_5_12MINI_4Gn1_DISNEY_30min_Eco_100sps.csv',
+    '1_5_12MINI_4Gn1_DISNEY_43min_Auto_100sps.csv',
+    '1_5_12MINI_4Gn1_NETFLIX_15min_Eco_100sps.csv',
+    '1_5_12MINI_4Gn1_NETFLIX_15min_MAX_100sps.csv',
+    '1_5_12MINI_4Gn1_NETFLIX_30min_Eco_100sps.csv',
+    '1_5_12MINI_4Gn1_NETFLIX_30min_MAX_100sps.csv',
+    '1_5_12MINI_4Gn1_YOUTUBE_15min_720p_100sps.csv',
+    '1_5_12MINI_5Gn3_AMAZON_30min_Bonne_100sps.csv',
+    '1_5_12MINI_5Gn3_APPLE_15min_HIGH_100sps.csv',
+    '1_5_12MINI_5Gn3_APPLE_30min_Auto_100sps.csv',
+    '1_5_12MINI_5Gn3_DISNEY_15min_Auto_100sps.csv',
+    '1_5_12MINI_5Gn3_NETFLIX_30min_Eco_100sps.csv',
+    '1_5_12MINI_5Gn3_YOUTUBE_15min_720p_100sps.csv',
+    '1_5_12MINI_WIFI-2.4GHz_AMAZON_15min_Bonne_100sps.csv',
+    '1_5_12MINI_WIFI-2.4GHz_APPLE_15min_HIGH_100sps.csv',
+    '1_5_12MINI_WIFI-2.4GHz_NETFLIX_15min_Eco_100sps.csv',
+    '1_5_12MINI_WIFI-2.4GHz_YOUTUBE_15min_720p_100sps.csv',
+    '1_5_12MINI_WIFI-5GHz_AMAZON_15min_Bonne_100sps.csv',
+    '1_5_12MINI_WIFI-5GHz_APPLE_15min_HIGH_100sps.csv',
+    '1_5_12MINI_WIFI-5GHz_NETFLIX_15min_Eco_100sps.csv',
+    '1_5_12MINI_WIFI-5GHz_YOUTUBE_15min_720p_100sps.csv',
+    '1_5_X_3G_AMAZON_15min_Bonne_100sps.csv',
+    '1_5_X_3G_APPLE_15min_Auto_100sps.csv',
+    '1_5_X_3G_DISNEY_15min_Auto_100sps.csv',
+    '1_5_X_3G_NETFLIX_15min_Eco_100sps.csv',
+    '1_5_X_3G_YOUTUBE_15min_720p_100sps.csv',
+    '1_5_X_4Gn1_AMAZON_15min_Bonne_100sps.csv',
+    '1_5_X_4Gn1_APPLE_15min_Auto_100sps.csv',
+    '1_5_X_4Gn1_DISNEY_15min_Auto_100sps.csv',
+    '1_5_X_4Gn1_NETFLIX_15min_Eco_100sps.csv',
+    '1_5_X_4Gn1_YOUTUBE_15min_720p_100sps.csv',
+    '2_5_12MINI_4Gn1_AMAZON_15min_Bonne_100sps.csv',
+    '2_5_12MINI_4Gn1_AMAZON_30min_TRES-Bonne_100sps.csv',
+    '2_5_12MINI_5Gn3_APPLE_15min_Auto_100sps.csv',
+    '2_5_12MINI_5Gn3_APPLE_15min_HIGH_100sps.csv',
+    '2_5_12MINI_5Gn3_DISNEY_15min_Auto_100sps.csv',
+    '2_5_12MINI_4Gn1_DISNEY_15min_Eco_100sps.csv',
+    '2_5_12MINI_4Gn1_APPLE_15min_Auto_100sps.csv',
+    '3_5_12MINI_4Gn1_AMAZON_15min_Bonne_100sps.csv',
+    '3_5_12MINI_4Gn1_APPLE_30min_Auto_100sps.csv',
+    '3_5_12MINI_4Gn1_DISNEY_15min_Eco_100sps.csv',
+    '3_5_12MINI_4Gn1_AMAZON_30min_Bonne_100sps.csv',
+    '3_5_12MINI_4Gn1_DISNEY_15min_Auto_100sps.csv',
+    '3_5_12MINI_5Gn3_APPLE_15min_Auto_100sps.csv',
+    '3_5_12MINI_5Gn3_APPLE_30min_HIGH_100sps.csv',
+    '3_5_12MINI_5Gn3_DISNEY_30min_Auto_100sps.csv',
+    '3_5_12MINI_WIFI-2.4GHz_AMAZON_30min_Bonne_100sps.csv',
+    '4_5_12MINI_4Gn1_AMAZON_15min_OPTIMAL_100sps.csv',
+    '4_5_12MINI_4Gn1_AMAZON_15min_TRES-Bonne_100sps.csv',
+    '4_5_12MINI_4Gn1_DISNEY_15min_Auto_100sps.csv',
+    '4_5_12MINI_4Gn1_AMAZON_15min_Bonne_100sps.csv',
+    '5_5_12MINI_4Gn1_AMAZON_15min_Bonne_100sps.csv',
+    '6_5_12MINI_4Gn1_AMAZON_30min_Bonne_100sps.csv',
+    '7_5_12MINI_4Gn1_AMAZON_15min_Bonne_100sps.csv',
+    '2_5_12MINI_5Gn3_AMAZON_30min_Bonne_100sps.csv',
+    '3_5_12MINI_5Gn3_AMAZON_15min_Bonne_100sps.csv',
+    '4_5_12MINI_5Gn3_AMAZON_20min_Bonne_100sps.csv',
+    '2_5_12MINI_5Gn3_NETFLIX_15min_Eco_100sps.csv',
+    '3_5_12MINI_5Gn3_NETFLIX_30min_Eco_100sps.csv',
+    '4_5_12MINI_5Gn3_NETFLIX_30min_Eco_100sps.csv',
+    '5_5_12MINI_5Gn3_NETFLIX_15min_Eco_100sps.csv',
+    '2_5_12MINI_5Gn3_YOUTUBE_15min_720p_100sps.csv',
+    '6_5_12MINI_5Gn3_NETFLIX_15min_Eco_100sps.csv',
+    '3_5_12MINI_5Gn3_YOUTUBE_15min_720p_100sps.csv',
+    '2_5_12MINI_4Gn1_NETFLIX_15min_Eco_100sps.csv',
+    '4_5_12MINI_5Gn3_DISNEY_30min_Eco_100sps5Gn78.csv',
+    '4_5_12MINI_5Gn3_APPLE_30min_Auto_100sps5Gn78.csv',
+    '7_5_12MINI_5Gn3_NETFLIX_15min_Eco_100sps5Gn78.csv',
+    '4_5_12MINI_5Gn3_YOUTUBE_30min_720p_100sps5Gn78.csv',
+    '8_5_12MINI_5Gn3_NETFLIX_30min_Eco_100sps5Gn78.csv',
+    '9_5_12MINI_5Gn3_NETFLIX_15min_Eco_100sps.csv',
+    '1_5_12MINI_WIFI-2.4GHz_DISNEY_15min_Eco_100sps.csv',
+    '2_5_12MINI_WIFI-2.4GHz_DISNEY_15min_Eco_100sps.csv',
+    '1_5_12MINI_WIFI-5GHz_DISNEY_15min_Eco_100sps.csv',
+    '2_5_12MINI_WIFI-5GHz_DISNEY_15min_Eco_100sps.csv',
+    '2_5_12MINI_WIFI-5GHz_NETFLIX_15min_Eco_100sps.csv',
+    '3_5_12MINI_WIFI-5GHz_NETFLIX_15min_Eco_100sps.csv',
+    '2_5_12MINI_WIFI-5GHz_AMAZON_15min_Bonne_100sps.csv',
+    '2_5_12MINI_WIFI-5GHz_APPLE_15min_Auto_100sps.csv',
+    '3_5_12MINI_WIFI-5GHz_YOUTUBE_15min_720p_100sps.csv',
+    '2_5_12MINI_WIFI-5GHz_YOUTUBE_15min_720p_100sps.csv',
+    '2_5_12MINI_WIFI-2.4GHz_YOUTUBE_15min_720p_100sps.csv',
+    '2_5_12MINI_WIFI-2.4GHz_APPLE_15min_Auto_100sps.csv',
+    '3_5_X_4Gn1_DISNEY_15min_Eco_100sps.csv',
+    '2_5_X_4Gn1_DISNEY_15min_Eco_100sps.csv',
+    '3_5_X_4Gn1_NETFLIX_15min_Eco_100sps.csv',
+    '2_5_X_4Gn1_NETFLIX_15min_Eco_100sps.csv',
+    '3_5_X_3G_NETFLIX_15min_Eco_100sps.csv',
+    '2_5_X_3G_NETFLIX_15min_Eco_100sps.csv',
+    '3_5_X_3G_DISNEY_15min_Eco_100sps.csv',
+    '2_5_X_3G_DISNEY_15min_Eco_100sps.csv',
+    '3_5_X_3G_AMAZON_15min_Bonne_100sps.csv',
+    '2_5_X_3G_AMAZON_15min_Bonne_100sps.csv',
+    '3_5_X_3G_APPLE_15min_Auto_100sps.csv',
+    '2_5_X_3G_APPLE_15min_Auto_100sps.csv',
+    '3_5_X_3G_YOUTUBE_15min_720p_100sps.csv',
+    '2_5_X_3G_YOUTUBE_15min_720p_100sps.csv',
+    '3_5_X_4Gn1_YOUTUBE_15min_720p_100sps.csv',
+    '2_5_X_4Gn1_YOUTUBE_15min_720p_100sps.csv',
+    '4_5_X_4Gn1_APPLE_15min_Auto_100sps.csv',
+    '3_5_X_4Gn1_APPLE_15min_Auto_100sps.csv',
+    '2_5_X_4Gn1_APPLE_15min_Auto_100sps.csv',
+    '3_5_X_4Gn1_AMAZON_15min_Bonne_100sps.csv',
+    '2_5_12MINI_5Gn3_DISNEY_30min_Eco_100sps.csv',
+    '2_5_X_4Gn1_AMAZON_15min_Bonne_100sps.csv',
+    '1_5_X_4Gn1_AMAZON_30min_Bonne_100sps.csv',
+    '2_5_12MINI_WIFI-2.4GHz_NETFLIX_15min_Eco_100sps.csv',
+    '2_5_12MINI_4Gn1_YOUTUBE_30min_720p_100sps.csv',
+    '4_5_12MINI_WIFI-2.4GHz_NETFLIX_30min_Eco_100sps.csv',
+    '2_5_12MINI_4Gn1_DISNEY_30min_Auto_100sps.csv',
+    '3_5_12MINI_4Gn1_DISNEY_30min_Auto_100sps.csv',
+    '3_5_12MINI_4Gn1_APPLE_30min_HIGH_100sps.csv',
+    '3_5_12MINI_4Gn1_YOUTUBE_30min_360p_100sps.csv',
+    '1_5_12MINI_4Gn1_YOUTUBE_30min_480p_100sps.csv',
+    '4_5_12MINI_4Gn1_YOUTUBE_30min_480p_100sps.csv',
+    '4_5_12MINI_4Gn1_YOUTUBE_30min_360p_100sps.csv',
+    '3_5_12MINI_4Gn1_YOUTUBE_30min_480p_100sps.csv',
+    '1_5_X_WIFI-2.4GHz_AMAZON_15min_Bonne_100sps.csv',
+    '1_5_X_WIFI-2.4GHz_NETFLIX_15min_Eco_100sps.csv',
+    '1_5_X_WIFI-2.4GHz_DISNEY_15min_Eco_100sps.csv',
+    '1_5_X_WIFI-2.4GHz_APPLE_15min_Eco_100sps.csv',
+    '1_5_X_WIFI-5GHz_DISNEY_15min_Auto_100sps.csv',
+    '1_5_X_WIFI-5GHz_AMAZON_15min_Auto_100sps.csv',
+    '1_5_X_WIFI-5GHz_APPLE_15min_Auto_100sps.csv',
+    '3_5_12MINI_4GSRS_APPLE_15min_Auto_100spsn7.csv',
+    '2_5_12MINI_4GSRS_AMAZON_15min_Bonne_100spsn7.csv',
+    '2_5_12MINI_4GSRS_DISNEY_15min_Eco_100spsn7.csv',
+    '2_5_12MINI_4GSRS_NETFLIX_15min_Eco_100spsn7.csv',
+    '1_5_12MINI_4GSRS_YOUTUBE_15min_720p_100spsn7.csv',
+    '1_5_12MINI_4GSRS_NETFLIX_15min_Eco_100spsn7.csv',
+    '1_5_12MINI_4GSRS_DISNEY_15min_Eco_100spsn7.csv',
+    '1_5_12MINI_4GSRS_APPLE_15min_Auto_100spsn7.csv',
+    '1_5_12MINI_4GSRS_AMAZON_15min_Bonne_100spsn7.csv',
+    '1_5_X_4GSRS_AMAZON_15min_Bonne_100sps.csv',
+    '2_5_X_4GSRS_AMAZON_15min_Bonne_100sps.csv',
+    '1_5_X_4GSRS_APPLE_15min_Auto_100sps.csv',
+    '1_5_X_4GSRS_DISNEY_15min_Eco_100sps.csv',
+    '1_5_X_4GSRS_NETFLIX_15min_Eco_100sps.csv',
+    '1_5_X_4GSRS_YOUTUBE_15min_720p_100sps.csv',
+]
+
+
+def _rasp_ff_record(row):
+    # scenario_id = Device_RAN Technology_Platform_Condition
+    scenario_id = "_".join(str(row[c]).strip() for c in ['Device', 'RAN Technology', 'Platform', 'Condition'])
+    values = {name: pd.to_numeric(row[column], errors='coerce') for column, name in RASP_FF_ENERGY.items()}
+    return scenario_id, values
+
+
+def _streaming_record(row):
+    # scenario_id = device_tech_platform_quality_mobility
+    tech = STREAMING_TECH_MAP.get(row['Technology'])
+    quality = STREAMING_QUALITY_MAP.get(row['Quality'])
+    if tech is None or quality is None:
+        return None, None
+    scenario_id = f"{row['Device'].lower()}_{tech}_{row['Platform'].lower()}_{quality}_stat"
+    values = {
+        'Avg_RF_Power_W': pd.to_numeric(row['Avg RF Power W'], errors='coerce'),
+        'Avg_BAT_Power_W': pd.to_numeric(row['Avg BAT Power W'], errors='coerce'),
+    }
+    return scenario_id, values
+
+
+def _rasp_ff_summary(means):
+    return means[['scenario_id', 'E_RF_Jm', 'E_BAT_Jm', 'E_BB_Jm', 'E_PA_Jm']]
+
+
+def _streaming_summary(means):
+    # Energy per minute from the mean powers, zero placeholders for BB/PA
+    means['E_BAT_Jm'] = means['Avg_BAT_Power_W'] * 60
+    means['E_RF_Jm'] = means['Avg_RF_Power_W'] * 60
+    means['E_BB_Jm'] = 0
+    means['E_PA_Jm'] = 0
+    return means[['scenario_id', 'E_BAT_Jm', 'E_RF_Jm', 'E_BB_Jm', 'E_PA_Jm']]
+
+
+# One entry per summary CSV: raw folders, analyzer, files (explicit list, every CSV of
+# the folders when absent), blacklist and aggregation
+CATEGORIES = {
+    'short_video': {
+        'folders': [os.path.join('SIR_Experiment', 'Reels'), os.path.join('SIR_Experiment', 'Voice call')],
+        'analyzer': 'rasp_ff',
+        'kwargs': {},
+        'blacklist': {
+            "2_5_6pro_LTE_YTshorts_stat_64sps.csv",
+            "1_5_6pro_LTE_tiktok_stat_64sps.csv",
+        },
+        'record': _rasp_ff_record,
+        'summary': _rasp_ff_summary,
+        'output': 'short_video_scenario_summary_df.csv',
+    },
+    'visio': {
+        'folders': [os.path.join('SIR_Experiment', 'video conference ')],
+        'analyzer': 'rasp_ff',
+        'kwargs': {},
+        'blacklist': {
+            "1_5_4G_teams_stat.csv",
+            "1_5_4G_zoom_stat.csv",
+            "1_5_5G_teams_stat.csv",
+            "1_5_5G_zoom_stat.csv",
+        },
+        'record': _rasp_ff_record,
+        'summary': _rasp_ff_summary,
+        'output': 'visio_scenario_summary_df.csv',
+    },
+    'others': {
+        'folders': [os.path.join('SIR_Experiment', 'Web browsing'), os.path.join('SIR_Experiment', 'pubg')],
+        'analyzer': 'rasp_ff',
+        'kwargs': {},
+        'blacklist': {
+            "1_5_4G_web.csv",
+            "1_5_4G_zoom_stat.csv",
+            "1_5_5G_web_stat.csv",
+            "1_5_5G_teams_stat.csv",
+            "1_5_5G_zoom_stat.csv",
+        },
+        'record': _rasp_ff_record,
+        'summary': _rasp_ff_summary,
+        'output': 'others_scenario_summary_df.csv',
+    },
+    'video_streaming': {
+        'folders': [os.path.join('Video straming', 'db')],
+        'analyzer': 'nf1',
+        'kwargs': {'d': 100},
+        'files': STREAMING_FILES,
+        'blacklist': set(),
+        'record': _streaming_record,
+        'summary': _streaming_summary,
+        'output': 'video_streaming_scenario_summary_df.csv',
+    },
+}
+
+
+def _connect(state_path):
+    os.makedirs(os.path.dirname(os.path.abspath(state_path)), exist_ok=True)
+    con = sqlite3.connect(state_path)
+    con.execute("""CREATE TABLE IF NOT EXISTS contributions (
+                       category TEXT, path TEXT, size INTEGER, mtime_ns INTEGER,
+                       scenario_id TEXT, vals TEXT, PRIMARY KEY (category, path))""")
+    con.execute("CREATE INDEX IF NOT EXISTS idx_contributions_scenario "
+                "ON contributions (category, scenario_id)")
+    return con
+
+
+def _raw_files(category, data_dir):
+    spec = CATEGORIES[category]
+    selected = set(spec['files']) if spec.get('files') is not None else None
+    files = {}
+    for folder in spec['folders']:
+        directory = os.path.join(data_dir, folder)
+        if not os.path.isdir(directory):
+            continue
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith('.csv') or name in spec['blacklist']:
+                continue
+            if selected is not None and name not in selected:
+                continue
+            path = os.path.abspath(os.path.join(directory, name))
+            stat = os.stat(path)
+            files[path] = (stat.st_size, stat.st_mtime_ns)
+    if selected is not None:
+        missing = selected - {os.path.basename(path) for path in files}
+        if missing:
+            print(f"⚠️ {category}: {len(missing)} listed files not found, e.g. {sorted(missing)[0]}")
+    return files
+
+
+def write_csv_atomic(df, path):
+    """
+    Writes a CSV next to its destination, then renames it in place.
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def build(category, data_dir=DEFAULT_DATA_DIR, server_dir=DEFAULT_SERVER_DIR,
+          state_path=DEFAULT_STATE, full=False, workers=None, resamples=DEFAULT_RESAMPLES):
+    """
+    Brings one scenario summary CSV up to date with the raw files.
+
+    Args:
+        category: key of CATEGORIES
+        full: forget the stored per-file results and reprocess every file
+        workers: processes used to analyze the changed files
+        resamples: bootstrap resamples of the confidence intervals
+
+    Returns:
+        dict: counts of processed/removed files and updated scenarios, failures
+    """
+    spec = CATEGORIES[category]
+    con = _connect(state_path)
+    if full:
+        con.execute("DELETE FROM contributions WHERE category = ?", (category,))
+
+    known = {path: (size, mtime_ns, scenario_id) for path, size, mtime_ns, scenario_id in
+             con.execute("SELECT path, size, mtime_ns, scenario_id FROM contributions WHERE category = ?",
+                         (category,))}
+    files = _raw_files(category, data_dir)
+    changed = [path for path, stat in files.items() if known.get(path, (None, None))[:2] != stat]
+    removed = [path for path in known if path not in files]
+
+    # Scenarios whose mean must be recomputed: old and new scenario of each changed file
+    affected = {known[path][2] for path in changed + removed if path in known}
+    for path in removed:
+        con.execute("DELETE FROM contributions WHERE category = ? AND path = ?", (category, path))
+
+    rows, failures = analyze_files(changed, spec['analyzer'], workers, **spec['kwargs'])
+    done = [path for path in changed if path not in failures]
+    for path, (_, row) in zip(done, rows.iterrows()):
+        scenario_id, values = spec['record'](row)
+        con.execute("INSERT OR REPLACE INTO contributions VALUES (?, ?, ?, ?, ?, ?)",
+                    (category, path, *files[path], scenario_id, json.dumps(values)))
+        affected.add(scenario_id)
+    for path in changed:
+        if path in failures:
+            # A file that cannot be analyzed no longer contributes
+            con.execute("DELETE FROM contributions WHERE category = ? AND path = ?", (category, path))
+    con.commit()
+    affected.discard(None)
+
+    output = os.path.join(server_dir, spec['output'])
+    # Untouched rows are kept as text, exactly as they were written
+    current = pd.read_csv(output, dtype=str) if os.path.exists(output) and not full else pd.DataFrame()
+    interval_columns = ['n_repetitions'] + [f'{c}_{s}' for c in INTERVAL_COLUMNS for s in INTERVAL_SUFFIXES]
+    if len(current) and not set(interval_columns) <= set(current.columns):
+        # Summary written before the confidence intervals: every scenario is re-aggregated
+        affected |= {scenario_id for (scenario_id,) in con.execute(
+            "SELECT DISTINCT scenario_id FROM contributions WHERE category = ?", (category,))}
+        affected.discard(None)
+
+    # Re-aggregate only the affected scenarios
+    placeholders = ', '.join('?' * len(affected))
+    contributions = con.execute(
+        f"SELECT scenario_id, vals FROM contributions WHERE category = ? AND scenario_id IN ({placeholders})",
+        (category, *sorted(affected))).fetchall()
+    con.close()
+
+    if affected or full:
+        values = pd.DataFrame([{'scenario_id': scenario_id, **json.loads(vals)}
+                               for scenario_id, vals in contributions])
+        if len(values):
+            updated = spec['summary'](values.groupby('scenario_id').mean().reset_index())
+            # Bootstrap over the per-file values (one per repetition) of each scenario
+            intervals = scenario_intervals(spec['summary'](values.copy()), 'scenario_id',
+                                           INTERVAL_COLUMNS, n_resamples=resamples)
+            updated = updated.merge(intervals, on='scenario_id', how='left')
+        else:
+            updated = pd.DataFrame()
+        if len(current):
+            current = current[~current['scenario_id'].isin(affected)]
+            if len(updated):
+                updated = updated[list(current.columns) + [c for c in updated.columns if c not in current.columns]]
+        summary = pd.concat([current, updated], ignore_index=True)
+        if len(summary):
+            summary = summary.sort_values('scenario_id', ignore_index=True)
+        write_csv_atomic(summary, output)
+
+    return {
+        'processed': len(done),
+        'removed': len(removed),
+        'scenarios': len(affected),
+        'failures': failures,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental build of the scenario summaries")
+    parser.add_argument('--category', action='append', choices=sorted(CATEGORIES))
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR)
+    parser.add_argument('--server-dir', default=DEFAULT_SERVER_DIR)
+    parser.add_argument('--state', default=DEFAULT_STATE)
+    parser.add_argument('--full', action='store_true', help="reprocess every file")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--resamples', type=int, default=DEFAULT_RESAMPLES,
+                        help="bootstrap resamples of the confidence intervals")
+    args = parser.parse_args()
+
+    for category in args.category or sorted(CATEGORIES):
+        report = build(category, args.data_dir, args.server_dir, args.state, args.full, args.workers,
+                       args.resamples)
+        print(f"✅ {category}: {report['processed']} files processed, {report['removed']} removed, "
+              f"{report['scenarios']} scenarios updated")
+        if report['failures']:
+            print("⚠️ Problematic files:", list(report['failures']))
+
+    index = compile_index(args.server_dir)
+    print(f"✅ Scenario index: {len(index['scenarios'])} scenarios, {len(index['fallbacks'])} fallbacks")
@@ -0,0 +1,339 @@
+"""
+Indexed catalog of the experiment files.
+
+Scans the data tree once, parses the metadata encoded in every naming scheme and
+stores it in a local SQLite table, so selections such as "LTE static, 6pro, tiktok"
+are index lookups instead of directory walks and file reads.
+
+Naming schemes:
+    rasp_ff static   1_5_6pro_LTE_tiktok_stat_64sps.csv
+    rasp_ff dynamic  1_5_6pro_LTE_tiktok_Dyna_T1_Doua_Auditorium_64sps.csv
+    nf1 streaming    1_5_12MINI_4Gn1_NETFLIX_15min_Eco_100sps.csv
+    call 3ch         1_3_6Pro_TX_4G_VoLTE_iPhone_RX_3G_UMTS_sps256.csv
+    call 2ch         1_5_P1_12_4G_VoLTE_TO_P2_X_4G_VoLTE_256sps.csv
+
+Usage:
+    python catalog.py scan [ROOT]
+    python catalog.py select [--device 6pro] [--ran LTE] [--platform tiktok] [--condition stat] ...
+"""
+import os
+import re
+import csv
+import sqlite3
+import argparse
+import pandas as pd
+
+DEFAULT_DATA_DIR = os.path.join('.', 'data', 'Experiment_Data')
+DEFAULT_CATALOG = os.path.join('.', '.cache', 'catalog.sqlite')
+
+# Columns of the catalog table
+FIELDS = [
+    'path', 'name', 'folder', 'scheme', 'repetition', 'total', 'device', 'ran', 'platform',
+    'platform_family', 'condition', 'route_path', 'route_from', 'route_to', 'quality',
+    'file_duration', 'voice', 'peer_device', 'peer_ran', 'peer_voice', 'sps',
+    'size', 'mtime_ns', 'rows', 'duration_s',
+]
+
+# Column types of the catalog table (TEXT otherwise)
+FIELD_TYPES = {
+    'path': 'TEXT PRIMARY KEY', 'repetition': 'INTEGER', 'total': 'INTEGER', 'sps': 'INTEGER',
+    'size': 'INTEGER', 'mtime_ns': 'INTEGER', 'rows': 'INTEGER', 'duration_s': 'REAL',
+}
+
+# Same families as the platform sniffing of analyse_v2.py
+PLATFORM_FAMILIES = {
+    'insta': 'instagram',
+    'tiktok': 'tiktok',
+    'ytshorts': 'youtube shorts',
+}
+
+_CALL_3CH = re.compile(
+    r'^(?P<repetition>[^_]+)_(?P<total>\d+)_(?P<device>[^_]+)_TX_(?P<tx>.+?)_'
+    r'(?P<peer_device>[^_]+)_RX_(?P<rx>.+)_sps(?P<sps>\d+)$'
+)
+_CALL_2CH = re.compile(
+    r'^(?P<repetition>[^_]+)_(?P<total>\d+)_P1_(?P<device>[^_]+)_(?P<ran>[^_]+)_(?P<voice>[^_]+)_TO_'
+    r'P2_(?P<peer_device>[^_]+)_(?P<peer_ran>[^_]+)_(?P<peer_voice>[^_]+)_(?P<sps>\d+)sps$'
+)
+# Leading rate only: '64sps', 'sps256', '256', but also '100spsn7' or '100sps5Gn78'
+_SPS = re.compile(r'^(?:sps(\d+)|(\d+)(?:sps|$))', re.IGNORECASE)
+_MINUTES = re.compile(r'^(\d+)min$', re.IGNORECASE)
+
+
+def _sps(part):
+    match = _SPS.match(part or '')
+    return int(match.group(1) or match.group(2)) if match else None
+
+
+def _minutes(part):
+    # "15min" -> 900.0 seconds
+    match = _MINUTES.match(part or '')
+    return int(match.group(1)) * 60.0 if match else None
+
+
+def _int(part):
+    return int(part) if part and part.isdigit() else None
+
+
+def _split_tech(tech):
+    # "4G_VoLTE" -> ("4G", "VoLTE"), "E_UMTS" -> ("E", "UMTS")
+    ran, _, voice = tech.rpartition('_')
+    return ran, voice
+
+
+def platform_family(platform):
+    """
+    Groups platform spellings ('insta', 'Insta', ...) under one name.
+    """
+    if not platform:
+        return None
+    name = platform.lower()
+    for key, family in PLATFORM_FAMILIES.items():
+        if key in name:
+            return family
+    return name
+
+
+def parse_filename(file_name):
+    """
+    Parses the experiment metadata encoded in a measurement file name.
+
+    Returns:
+        dict: typed fields (see FIELDS), None where the scheme has no such field
+    """
+    name = os.path.basename(file_name)
+    stem = name[:-4] if name.lower().endswith('.csv') else name
+    parts = stem.split('_')
+    info = dict.fromkeys(FIELDS)
+    info['name'] = name
+
+    match = _CALL_2CH.match(stem)
+    if match:
+        info.update(match.groupdict())
+        info['scheme'] = 'call_2ch'
+        info['platform'] = 'call'
+    elif _CALL_3CH.match(stem):
+        groups = _CALL_3CH.match(stem).groupdict()
+        info['repetition'], info['total'] = groups['repetition'], groups['total']
+        info['device'], info['peer_device'] = groups['device'], groups['peer_device']
+        info['ran'], info['voice'] = _split_tech(groups['tx'])
+        info['peer_ran'], info['peer_voice'] = _split_tech(groups['rx'])
+        info['sps'] = groups['sps']
+        info['scheme'] = 'call_3ch'
+        info['platform'] = 'call'
+    elif len(parts) >= 7 and parts[5].lower() == 'dyna':
+        # exp_total_device_ran_platform_dyna_path_from_to_sps
+        info.update(zip(['repetition', 'total', 'device', 'ran', 'platform', 'condition'], parts[:6]))
+        info['route_path'] = parts[6]
+        info['route_from'] = parts[7] if len(parts) >= 8 else None
+        info['route_to'] = parts[8] if len(parts) >= 9 else None
+        info['sps'] = parts[9] if len(parts) >= 10 else None
+        info['scheme'] = 'rasp_ff'
+    elif len(parts) == 7 and parts[5].lower() == 'stat':
+        # exp_total_device_ran_platform_stat_sps
+        info.update(zip(['repetition', 'total', 'device', 'ran', 'platform', 'condition', 'sps'], parts))
+        info['scheme'] = 'rasp_ff'
+    elif len(parts) >= 7 and _MINUTES.match(parts[5]):
+        # exp_total_device_techno_platform_duration_quality_sps
+        info.update(zip(['repetition', 'total', 'device', 'ran', 'platform', 'file_duration', 'quality'], parts))
+        info['sps'] = parts[7] if len(parts) >= 8 else None
+        info['condition'] = 'stat'
+        info['scheme'] = 'nf1'
+    else:
+        # Free-form names (e.g. 1_5_4G_web.csv): keep what can be recognised
+        if len(parts) >= 2 and parts[1].isdigit():
+            info['repetition'], info['total'] = parts[0], parts[1]
+            parts = parts[2:]
+        for part in parts:
+            if part.lower() in ('stat', 'dyna'):
+                info['condition'] = part
+            elif _sps(part) is not None and 'sps' in part.lower():
+                info['sps'] = part
+            elif re.match(r'^(?:[2-5]G|LTE|WIFI)', part, re.IGNORECASE) and info['ran'] is None:
+                info['ran'] = part
+            elif info['platform'] is None:
+                info['platform'] = part
+        info['scheme'] = 'other'
+
+    info['repetition'] = _int(info['repetition'])
+    info['total'] = _int(info['total'])
+    info['sps'] = _sps(info['sps'])
+    info['platform_family'] = platform_family(info['platform'])
+    return info
+
+
+def _count_rows(file_name, block_size=1 << 22):
+    # Number of data lines (newlines minus the header)
+    lines = 0
+    last = b'\n'
+    with open(file_name, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            lines += block.count(b'\n')
+            last = block[-1:]
+    if last != b'\n':
+        lines += 1
+    return max(lines - 1, 0)
+
+
+def _last_line(file_name, block_size=4096):
+    with open(file_name, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        f.seek(max(end - block_size, 0))
+        lines = f.read().splitlines()
+    return lines[-1].decode('utf-8', 'replace') if lines else ''
+
+
+def _duration(file_name, nominal=None):
+    """
+    Log duration from the first and last line, without reading the file.
+
+    rasp_ff logs have a full Timestamp. The nf logs only have the "%M:%S.%f"
+    m_sec_ms clock, which wraps every hour: the whole hours are taken from the
+    `nominal` duration of the file name (e.g. 15min), the rest from the clock.
+    """
+    with open(file_name, 'r', encoding='utf-8-sig', errors='replace') as f:
+        header = next(csv.reader([f.readline()]), [])
+        first = f.readline()
+    column = next((c for c in ['Timestamp', 'm_sec_ms'] if c in header), None)
+    if column is None or not first:
+        return None
+    position = header.index(column)
+    try:
+        values = [next(csv.reader([line]))[position] for line in [first, _last_line(file_name)]]
+        if column == 'Timestamp':
+            start, end = (pd.Timestamp(value) for value in values)
+            return (end - start).total_seconds()
+        start, end = (pd.to_datetime(value, format='%M:%S.%f') for value in values)
+    except (ValueError, IndexError, StopIteration):
+        return None
+    elapsed = (end - start).total_seconds() % 3600
+    if nominal:
+        elapsed += 3600 * round((nominal - elapsed) / 3600)
+    return elapsed
+
+
+def _under(root):
+    """
+    SQL condition and parameters keeping the paths under `root`: a range on the
+    binary order of the paths, since LIKE would take the '_' and '%' of folder
+    names as wildcards (and ignores case).
+    """
+    prefix = os.path.join(os.path.abspath(root), '')
+    return "path >= ? AND path < ?", [prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)]
+
+
+def connect(db_path=DEFAULT_CATALOG):
+    """
+    Opens (and creates if needed) the catalog database.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    con = sqlite3.connect(db_path)
+    con.row_factory = sqlite3.Row
+    declared = {row['name']: row['type'] for row in con.execute("PRAGMA table_info(files)")}
+    if declared and declared.get('repetition') != FIELD_TYPES['repetition']:
+        # Catalog written before the column types: indexed again by the next scan
+        con.execute("DROP TABLE files")
+    columns = ', '.join(f"{field} {FIELD_TYPES.get(field, 'TEXT')}" for field in FIELDS)
+    con.execute(f"CREATE TABLE IF NOT EXISTS files ({columns})")
+    for fields in [('ran', 'condition', 'device', 'platform'), ('device',), ('platform',),
+                   ('platform_family',), ('scheme',), ('folder',)]:
+        con.execute(f"CREATE INDEX IF NOT EXISTS idx_files_{'_'.join(fields)} "
+                    f"ON files ({', '.join(f'{f} COLLATE NOCASE' for f in fields)})")
+    return con
+
+
+def scan(root=DEFAULT_DATA_DIR, db_path=DEFAULT_CATALOG, verbose=False):
+    """
+    Adds or refreshes every CSV file under `root` in the catalog.
+    Files whose size and mtime did not change are not read again, and files
+    that disappeared are removed.
+
+    Returns:
+        int: number of files (re)indexed
+    """
+    con = connect(db_path)
+    condition, params = _under(root)
+    known = {row['path']: (row['size'], row['mtime_ns']) for row in
+             con.execute(f"SELECT path, size, mtime_ns FROM files WHERE {condition}", params)}
+    seen = set()
+    updated = 0
+    for folder, _, names in os.walk(root):
+        for name in sorted(names):
+            if not name.lower().endswith('.csv'):
+                continue
+            path = os.path.abspath(os.path.join(folder, name))
+            seen.add(path)
+            stat = os.stat(path)
+            if known.get(path) == (stat.st_size, stat.st_mtime_ns):
+                continue
+            info = parse_filename(path)
+            info.update({
+                'path': path,
+                'folder': os.path.relpath(folder, root),
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'rows': _count_rows(path),
+                'duration_s': _duration(path, _minutes(info['file_duration'])),
+            })
+            con.execute(f"INSERT OR REPLACE INTO files ({', '.join(FIELDS)}) "
+                        f"VALUES ({', '.join('?' * len(FIELDS))})", [info[f] for f in FIELDS])
+            updated += 1
+            if verbose:
+                print(f"📄 {name} ({info['scheme']})")
+    removed = [(path,) for path in known if path not in seen]
+    con.executemany("DELETE FROM files WHERE path = ?", removed)
+    con.commit()
+    con.close()
+    return updated
+
+
+def select(db_path=DEFAULT_CATALOG, root=None, **filters):
+    """
+    Selects catalog entries, e.g. select(ran='LTE', condition='stat', device='6pro', platform='tiktok').
+    Text filters are case-insensitive; a list or tuple matches any of its values.
+    `root` keeps only the files under that directory.
+
+    Returns:
+        pd.DataFrame: one row per file (FIELDS columns)
+    """
+    clauses, params = [], []
+    for field, value in filters.items():
+        if field not in FIELDS:
+            raise KeyError(f"Unknown catalog field '{field}'")
+        values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+        clauses.append(f"{field} COLLATE NOCASE IN ({', '.join('?' * len(values))})")
+        params.extend(values)
+    if root is not None:
+        condition, root_params = _under(root)
+        clauses.append(condition)
+        params.extend(root_params)
+    query = "SELECT * FROM files"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    con = connect(db_path)
+    df = pd.read_sql_query(query + " ORDER BY path", con, params=params)
+    con.close()
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Catalog of the experiment files")
+    parser.add_argument('--db', default=DEFAULT_CATALOG)
+    commands = parser.add_subparsers(dest='command', required=True)
+    scan_cmd = commands.add_parser('scan', help="index the CSV files of a data tree")
+    scan_cmd.add_argument('root', nargs='?', default=DEFAULT_DATA_DIR)
+    select_cmd = commands.add_parser('select', help="list the files matching some fields")
+    for field in FIELDS:
+        select_cmd.add_argument(f"--{field}", action='append')
+    args = parser.parse_args()
+
+    if args.command == 'scan':
+        count = scan(args.root, args.db, verbose=True)
+        print(f"✅ {count} files indexed")
+    else:
+        filters = {field: getattr(args, field) for field in FIELDS if getattr(args, field)}
+        result = select(args.db, **filters)
+        print(result[['name', 'scheme', 'device', 'ran', 'platform', 'condition', 'sps',
+                      'rows', 'duration_s']].to_string(index=False))
+        print(f"\n{len(result)} files")
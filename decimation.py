@@ -0,0 +1,231 @@
+"""
+Multi-resolution decimation of power traces for Plotly figures.
+
+A 1024 SPS log has millions of points per channel, far more than the pixels of
+a figure. A Pyramid precomputes, for one channel, levels of bins of factor**k
+samples (min, max with their positions, and mean). query() then returns the
+coarsest level that still has about one bin per pixel over the requested time
+range: each bin is drawn as its min and max points, so peaks stay visible at
+any zoom while a trace never holds more than ~2 x width points.
+
+    pyramid = Pyramid(df['time_sec'], df['P_RF'])
+    x, y = pyramid.query(width=1500)                 # whole log
+    x, y = pyramid.query(120, 180, width=1500)       # zoom on one minute
+
+zoomable() wraps a figure in a go.FigureWidget that re-queries the pyramids
+when the x axis is zoomed (Jupyter); show() displays that widget in a notebook
+and falls back to the static figure elsewhere.
+
+    fig = go.Figure([go.Scatter(x=x, y=y)])
+    show(fig, [pyramid])
+"""
+import numpy as np
+import pandas as pd
+
+DEFAULT_WIDTH = 1500
+
+
+def _as_numeric_x(x):
+    """
+    Returns x as float64 or int64 values, and the datetime dtype to restore (or None).
+    """
+    values = np.asarray(x)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype('datetime64[ns]').view(np.int64), np.dtype('datetime64[ns]')
+    return values.astype(float), None
+
+
+def _reduce_bins(values, positions, factor, pick, fill):
+    """
+    Min (pick=np.argmin) or max (np.argmax) of each group of `factor` consecutive
+    values, with the position of the picked value.
+    """
+    n_bins = -(-len(values) // factor)
+    padded = np.full(n_bins * factor, fill)
+    padded[:len(values)] = values
+    grouped = padded.reshape(n_bins, factor)
+    chosen = pick(grouped, axis=1)
+    rows = np.arange(n_bins)
+    index = np.minimum(rows * factor + chosen, len(values) - 1)
+    return grouped[rows, chosen], positions[index]
+
+
+class Pyramid:
+    """
+    Min/max/mean pyramid of one channel.
+
+    Args:
+        x: sample times (seconds, or datetimes), sorted
+        y: sample values
+        factor: number of bins of level k merged into one bin of level k + 1
+        min_bins: levels stop once they have fewer bins than this
+    """
+
+    def __init__(self, x, y, factor=4, min_bins=256):
+        self.x, self.x_dtype = _as_numeric_x(x)
+        self.y = np.asarray(y, dtype=float)
+        if len(self.x) != len(self.y):
+            raise ValueError(f"x and y lengths differ ({len(self.x)} != {len(self.y)})")
+        if np.any(np.diff(self.x) < 0):
+            order = np.argsort(self.x, kind='stable')
+            self.x, self.y = self.x[order], self.y[order]
+        self.factor = factor
+
+        # NaN are ignored by min/max (+-inf) and by the mean (count)
+        valid = ~np.isnan(self.y)
+        level = {
+            'start': self.x, 'end': self.x,
+            'min': np.where(valid, self.y, np.inf), 'x_min': self.x,
+            'max': np.where(valid, self.y, -np.inf), 'x_max': self.x,
+            'sum': np.where(valid, self.y, 0.0), 'count': valid.astype(float),
+        }
+        self.levels = []
+        while len(level['start']) > min_bins:
+            level = self._next_level(level)
+            self.levels.append(level)
+
+    def _next_level(self, level):
+        f = self.factor
+        n = len(level['start'])
+        heads = np.arange(0, n, f)
+        tails = np.minimum(heads + f, n) - 1
+        y_min, x_min = _reduce_bins(level['min'], level['x_min'], f, np.argmin, np.inf)
+        y_max, x_max = _reduce_bins(level['max'], level['x_max'], f, np.argmax, -np.inf)
+        return {
+            'start': level['start'][heads], 'end': level['end'][tails],
+            'min': y_min, 'x_min': x_min,
+            'max': y_max, 'x_max': x_max,
+            'sum': np.add.reduceat(level['sum'], heads), 'count': np.add.reduceat(level['count'], heads),
+        }
+
+    def _restore_x(self, x):
+        return x.view(np.int64).astype(self.x_dtype) if self.x_dtype is not None else x
+
+    def _to_numeric(self, bound):
+        if bound is None:
+            return None
+        if self.x_dtype is not None:
+            return pd.Timestamp(bound).value
+        return float(bound)
+
+    def query(self, x0=None, x1=None, width=DEFAULT_WIDTH, how='minmax'):
+        """
+        Returns the points to draw between x0 and x1 (whole trace by default) on
+        a figure `width` pixels wide.
+
+        Args:
+            x0, x1: range of the x axis (same unit as x, None for the ends)
+            width: number of horizontal pixels (about one bin per pixel)
+            how: 'minmax' (two points per bin, keeps the peaks) or 'mean'
+
+        Returns:
+            tuple: (x, y) arrays, raw samples when the range is small enough
+        """
+        x0, x1 = self._to_numeric(x0), self._to_numeric(x1)
+        lo = 0 if x0 is None else max(np.searchsorted(self.x, x0, 'left') - 1, 0)
+        hi = len(self.x) if x1 is None else min(np.searchsorted(self.x, x1, 'right') + 1, len(self.x))
+        if hi - lo <= 2 * width or not self.levels:
+            return self._restore_x(self.x[lo:hi]), self.y[lo:hi]
+
+        # Finest level with at most `width` bins in the range (one bin of margin on each side)
+        for level in self.levels:
+            b_lo = 0 if x0 is None else max(np.searchsorted(level['end'], x0, 'left') - 1, 0)
+            b_hi = len(level['start']) if x1 is None else \
+                min(np.searchsorted(level['start'], x1, 'right') + 1, len(level['start']))
+            if b_hi - b_lo <= width:
+                break
+        part = {key: values[b_lo:b_hi] for key, values in level.items()}
+        empty = part['count'] == 0
+
+        if how == 'mean':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                y = np.where(empty, np.nan, part['sum'] / part['count'])
+            x = part['start'] + (part['end'] - part['start']) // 2 if self.x_dtype is not None \
+                else (part['start'] + part['end']) / 2
+            return self._restore_x(x), y
+
+        # Min and max of each bin, in time order
+        min_first = part['x_min'] <= part['x_max']
+        x = np.empty(2 * len(empty), dtype=self.x.dtype)
+        y = np.empty(2 * len(empty))
+        x[0::2] = np.where(min_first, part['x_min'], part['x_max'])
+        x[1::2] = np.where(min_first, part['x_max'], part['x_min'])
+        y[0::2] = np.where(min_first, part['min'], part['max'])
+        y[1::2] = np.where(min_first, part['max'], part['min'])
+        y[np.repeat(empty, 2)] = np.nan
+        return self._restore_x(x), y
+
+
+def build_pyramids(df, x_column, columns, **kwargs):
+    """
+    Returns one Pyramid per column of a DataFrame, keyed by column name.
+    """
+    return {column: Pyramid(df[x_column], df[column], **kwargs) for column in columns}
+
+
+def redecimate(fig, pyramids, x_range=None, width=DEFAULT_WIDTH, how='minmax'):
+    """
+    Replaces the points of the traces built from pyramids by those of x_range.
+
+    Args:
+        fig: go.Figure or go.FigureWidget
+        pyramids: list of Pyramid, one per trace (None for traces to leave as is)
+        x_range: (x0, x1) of the x axis, None for the whole trace
+    """
+    x0, x1 = x_range if x_range else (None, None)
+    for trace, pyramid in zip(fig.data, pyramids):
+        if pyramid is not None:
+            trace.x, trace.y = pyramid.query(x0, x1, width, how)
+
+
+def zoomable(fig, pyramids, width=DEFAULT_WIDTH, how='minmax'):
+    """
+    Returns a go.FigureWidget whose traces are re-decimated when the x axis is
+    zoomed or panned, and brought back to the whole trace when it is reset
+    (needs a Jupyter front end with widget support, and anywidget for plotly >= 6).
+
+    Args:
+        fig: figure whose traces were built from the pyramids, in the same order
+        pyramids: list of Pyramid, one per trace (None for traces to leave as is)
+    """
+    import plotly.graph_objects as go
+
+    widget = go.FigureWidget(fig)
+
+    def update(layout, x_range, autorange):
+        with widget.batch_update():
+            redecimate(widget, pyramids, None if autorange else x_range, width, how)
+
+    widget.layout.on_change(update, 'xaxis.range', 'xaxis.autorange')
+    return widget
+
+
+def _in_notebook():
+    try:
+        from IPython import get_ipython
+    except ImportError:
+        return False
+    shell = get_ipython()
+    return shell is not None and 'IPKernelApp' in shell.config
+
+
+def show(fig, pyramids, width=DEFAULT_WIDTH, how='minmax'):
+    """
+    Shows a figure built from pyramids: as a zoomable() widget in Jupyter, so
+    zooming fetches finer levels, and as the static figure elsewhere (scripts,
+    no widget support), where zooming only magnifies the whole-trace decimation.
+
+    Returns:
+        the widget, or the figure when it was shown statically
+    """
+    if _in_notebook():
+        try:
+            widget = zoomable(fig, pyramids, width, how)
+        except ImportError:
+            pass
+        else:
+            from IPython.display import display
+            display(widget)
+            return widget
+    fig.show()
+    return fig
@@ -0,0 +1,317 @@
+"""
+Fleet-scale simulation of daily phone usage: battery drain and CO2 of many user-days.
+
+Each simulated user gets a device, a network and a mobility, then a day of
+activities generated by a Markov chain over the activity states (idle, call,
+tiktok, netflix, teams, pubg...) with one transition per time step. Each
+step costs the E_BAT_Jm / E_RF_Jm rate of the scenario the server would
+use for that (device, network, mobility, activity), with the same fallback
+chain (scenario_engine). The battery percentage uses the capacity of
+batteries_ue.csv scaled by screen size, as in /calculate.
+
+Users are simulated in numpy batches: the states of a whole batch advance
+together with one np.searchsorted per step, and the energy is accumulated
+step by step (time of depletion included). There is no loop over users. A
+million user-days of 5-minute steps take a few seconds.
+
+    model = UsageModel.default()                        # or UsageModel.from_json('model.json')
+    days = simulate(1_000_000, model, seed=0)           # one row per user-day
+    summarize(days, by='device')                        # battery % / energy distributions
+
+The model can also be fitted on observed sequences (UsageModel.fit).
+
+Usage:
+    python fleet_simulator.py [--users 1000000] [--model model.json] [--output days.csv]
+"""
+import os
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from scenario_engine import ScenarioEngine, DEFAULT_SERVER_DIR, CO2_MIN_G_PER_KWH, CO2_MAX_G_PER_KWH
+
+IDLE = 'idle'
+BATCH_USERS = 250_000
+QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+# Default usage: mean minutes before starting each activity while idle, mean session length
+DEFAULT_STATES = [
+    {'name': IDLE},
+    {'name': 'call', 'quality': 'VoLTE', 'every_minutes': 240, 'session_minutes': 6},
+    {'name': 'tiktok', 'every_minutes': 150, 'session_minutes': 15},
+    {'name': 'insta', 'every_minutes': 180, 'session_minutes': 10},
+    {'name': 'netflix', 'quality': 'eco', 'every_minutes': 600, 'session_minutes': 45},
+    {'name': 'youtube', 'quality': '720p', 'every_minutes': 300, 'session_minutes': 20},
+    {'name': 'teams', 'every_minutes': 600, 'session_minutes': 40},
+    {'name': 'pubg', 'every_minutes': 900, 'session_minutes': 30},
+    {'name': 'web', 'every_minutes': 120, 'session_minutes': 8},
+]
+DEFAULT_POPULATION = {
+    'devices': None,                    # None: every device of batteries_ue.csv, same weight
+    'networks': {'4G': 0.5, '5G': 0.25, 'WiFi': 0.2, '3G': 0.05},
+    'moving': 0.2,                      # share of users on the move
+}
+
+
+class UsageModel:
+    """
+    Markov chain of activity states, one transition per step.
+
+    Args:
+        states: list of dicts with name and optional quality (as in a /calculate
+            activity). A state may fix its own E_BAT_Jm / E_RF_Jm rates
+            instead of looking them up (the idle state costs nothing by default)
+        transition: (states, states) matrix, rows summing to 1
+        initial: probability of each state at the start of the day
+        step_minutes: length of a step
+        day_minutes: length of the simulated day (waking hours)
+    """
+
+    def __init__(self, states, transition, initial=None, step_minutes=5, day_minutes=16 * 60):
+        self.states = [dict(state) for state in states]
+        self.transition = np.asarray(transition, dtype=float)
+        n = len(self.states)
+        if self.transition.shape != (n, n) or np.any(self.transition < 0) or \
+                not np.allclose(self.transition.sum(axis=1), 1):
+            raise ValueError(f"transition must be a ({n}, {n}) stochastic matrix")
+        self.initial = np.full(n, 1 / n) if initial is None else np.asarray(initial, dtype=float)
+        if len(self.initial) != n or not np.isclose(self.initial.sum(), 1):
+            raise ValueError("initial must hold one probability per state, summing to 1")
+        self.step_minutes = step_minutes
+        self.steps = int(day_minutes // step_minutes)
+
+    @classmethod
+    def from_sessions(cls, states, step_minutes=5, day_minutes=16 * 60):
+        """
+        Builds the chain from the mean time between sessions of each activity
+        (`every_minutes`, counted while idle) and their mean length
+        (`session_minutes`). Sessions have geometric lengths and end on idle.
+        """
+        names = [state['name'] for state in states]
+        idle = names.index(IDLE)
+        transition = np.zeros((len(states), len(states)))
+        for i, state in enumerate(states):
+            if i == idle:
+                continue
+            transition[idle, i] = min(step_minutes / state['every_minutes'], 1)
+            stop = min(step_minutes / state['session_minutes'], 1)
+            transition[i, i] = 1 - stop
+            transition[i, idle] = stop
+        if transition[idle].sum() > 1:
+            raise ValueError("sessions start more often than the step allows, use a shorter step")
+        transition[idle, idle] = 1 - transition[idle].sum()
+        initial = np.zeros(len(states))
+        initial[idle] = 1
+        return cls(states, transition, initial, step_minutes, day_minutes)
+
+    @classmethod
+    def default(cls, step_minutes=5, day_minutes=16 * 60):
+        return cls.from_sessions(DEFAULT_STATES, step_minutes, day_minutes)
+
+    @classmethod
+    def fit(cls, sequences, states=None, step_minutes=5, day_minutes=16 * 60):
+        """
+        Empirical chain estimated from observed sequences.
+
+        Args:
+            sequences: DataFrame with user, step and activity (state name), one
+                row per user and step
+            states: state dicts (name, quality); default: one per observed activity
+        """
+        sequences = sequences.sort_values(['user', 'step'], kind='stable')
+        states = states or [{'name': name} for name in sorted(sequences['activity'].unique())]
+        codes = pd.Categorical(sequences['activity'], categories=[s['name'] for s in states]).codes
+        if np.any(codes < 0):
+            raise ValueError("activities missing from the states")
+        users = sequences['user'].to_numpy()
+        same_user = users[1:] == users[:-1]
+        n = len(states)
+        counts = np.bincount(codes[:-1][same_user] * n + codes[1:][same_user], minlength=n * n).reshape(n, n)
+        # A state never left stays where it is
+        counts[counts.sum(axis=1) == 0] = np.eye(n, dtype=counts.dtype)[counts.sum(axis=1) == 0]
+        first = np.concatenate([[True], ~same_user])
+        initial = np.bincount(codes[first], minlength=n) / first.sum()
+        return cls(states, counts / counts.sum(axis=1, keepdims=True), initial, step_minutes, day_minutes)
+
+    @classmethod
+    def from_json(cls, path):
+        """
+        Reads a model file: {"states": [...], "transition": [[...]], "initial": [...]}
+        or {"states": [...]} with every_minutes / session_minutes, plus optional
+        step_minutes and day_minutes.
+        """
+        with open(path) as f:
+            spec = json.load(f)
+        options = {key: spec[key] for key in ['step_minutes', 'day_minutes'] if key in spec}
+        if 'transition' in spec:
+            return cls(spec['states'], spec['transition'], spec.get('initial'), **options)
+        return cls.from_sessions(spec['states'], **options)
+
+    def sample(self, n_users, rng):
+        """
+        Generates the state index of n users at every step, (steps, users) matrix.
+        """
+        return np.stack(list(self._walk(n_users, rng)))
+
+    def _walk(self, n_users, rng):
+        # One searchsorted per step: the cumulative rows are laid end to end,
+        # row s shifted by s, so u + s falls inside row s of the current state
+        n = len(self.states)
+        cumulative = np.cumsum(self.transition, axis=1)
+        cumulative[:, -1] = 1.0
+        flat = (cumulative + np.arange(n)[:, None]).ravel()
+        state = np.searchsorted(np.cumsum(self.initial), rng.random(n_users), 'right').clip(0, n - 1)
+        for _ in range(self.steps):
+            yield state
+            draw = rng.random(n_users) + state
+            state = np.searchsorted(flat, draw, 'right') - state * n
+            np.clip(state, 0, n - 1, out=state)
+
+
+def _choice(rng, options, n):
+    names = list(options)
+    weights = np.asarray([options[name] for name in names], dtype=float)
+    return np.asarray(names, dtype=object), rng.choice(len(names), size=n, p=weights / weights.sum())
+
+
+def _rate_tables(engine, model, devices, networks):
+    """
+    Wh per step of each (profile, state), for battery and RF, and whether the
+    state has no scenario for the profile. Profiles are (device, network, moving).
+    """
+    n_states = len(model.states)
+    shape = (len(devices), len(networks), 2, n_states)
+    battery, rf = np.zeros(shape), np.zeros(shape)
+    unmatched = np.zeros(shape, dtype=bool)
+    for d, device in enumerate(devices):
+        for k, network in enumerate(networks):
+            for m, mobility in enumerate(['static', 'moving']):
+                for s, state in enumerate(model.states):
+                    if 'E_BAT_Jm' in state or state['name'] == IDLE:
+                        rates = (state.get('E_BAT_Jm', 0.0), state.get('E_RF_Jm', 0.0))
+                    else:
+                        rates = engine.resolve(device, network, mobility, state['name'], state.get('quality'))[1]
+                    if rates is None:
+                        unmatched[d, k, m, s] = True
+                    else:
+                        # J/min -> Wh per step, like the server
+                        battery[d, k, m, s] = rates[0] / 3600 * model.step_minutes
+                        rf[d, k, m, s] = rates[1] / 3600 * model.step_minutes
+    return battery.reshape(-1, n_states), rf.reshape(-1, n_states), unmatched.reshape(-1, n_states)
+
+
+def simulate(n_users, model=None, population=None, server_dir=DEFAULT_SERVER_DIR, seed=0,
+             batch_users=BATCH_USERS):
+    """
+    Simulates n user-days.
+
+    Args:
+        model: UsageModel (UsageModel.default() by default)
+        population: dict of devices / networks (name -> weight) and moving share,
+            see DEFAULT_POPULATION
+        batch_users: users advanced together (bounds memory)
+
+    Returns:
+        pd.DataFrame: one row per user-day: device, network, mobility, energy_Wh,
+        rf_energy_Wh, battery_percent (capped at 100 like the server), co2_min_g,
+        co2_max_g, active_minutes, fallback_minutes (activities without scenario,
+        counted as 0 Wh) and depleted_minute (NaN if the battery lasts the day)
+    """
+    model = model or UsageModel.default()
+    population = {**DEFAULT_POPULATION, **(population or {})}
+    engine = ScenarioEngine(server_dir)
+    device_weights = population['devices'] or dict.fromkeys(engine.device_specs, 1)
+    devices, networks = list(device_weights), list(population['networks'])
+    battery_rate, rf_rate, unmatched = _rate_tables(engine, model, devices, networks)
+    capacity = np.array([engine.adjusted_capacity(device) for device in devices])
+    idle = np.array([state['name'] == IDLE for state in model.states])
+
+    parts = []
+    for batch, start in enumerate(range(0, n_users, batch_users)):
+        n = min(batch_users, n_users - start)
+        rng = np.random.default_rng([seed, batch])
+        device_names, device = _choice(rng, device_weights, n)
+        network_names, network = _choice(rng, population['networks'], n)
+        moving = rng.random(n) < population['moving']
+        profile = (device * len(networks) + network) * 2 + moving
+        user_capacity = capacity[device]
+
+        energy, rf_energy = np.zeros(n), np.zeros(n)
+        active, fallback = np.zeros(n, dtype=np.int32), np.zeros(n, dtype=np.int32)
+        depleted = np.full(n, -1, dtype=np.int32)
+        for step, state in enumerate(model._walk(n, rng)):
+            energy += battery_rate[profile, state]
+            rf_energy += rf_rate[profile, state]
+            active += ~idle[state]
+            fallback += unmatched[profile, state]
+            empty = (depleted < 0) & (energy >= user_capacity)
+            depleted[empty] = step + 1
+
+        parts.append(pd.DataFrame({
+            'device': pd.Categorical.from_codes(device, devices),
+            'network': pd.Categorical.from_codes(network, networks),
+            'mobility': np.where(moving, 'moving', 'static'),
+            'energy_Wh': energy,
+            'rf_energy_Wh': rf_energy,
+            'battery_percent': np.minimum(100, energy / user_capacity * 100),
+            'co2_min_g': energy / 1000 * CO2_MIN_G_PER_KWH,
+            'co2_max_g': energy / 1000 * CO2_MAX_G_PER_KWH,
+            'active_minutes': active * model.step_minutes,
+            'fallback_minutes': fallback * model.step_minutes,
+            'depleted_minute': np.where(depleted > 0, depleted * model.step_minutes, np.nan),
+        }))
+    days = pd.concat(parts, ignore_index=True)
+    days['mobility'] = days['mobility'].astype('category')
+    return days
+
+
+def summarize(days, by=None, columns=('battery_percent', 'energy_Wh', 'co2_max_g')):
+    """
+    Distribution of the simulated user-days: quantiles of each column, mean,
+    share of days where the battery ran out and share of the active minutes
+    without scenario (no energy counted, e.g. most activities over WiFi).
+
+    Args:
+        by: column(s) to group by (e.g. 'device'), None for the whole fleet
+    """
+    groups = days.groupby(by, observed=True) if by else days.groupby(np.zeros(len(days)))
+    table = groups[list(columns)].quantile(QUANTILES).unstack()
+    table.columns = [f'{column}_p{int(q * 100)}' for column, q in table.columns]
+    table.insert(0, 'user_days', groups.size())
+    for column in columns:
+        table[f'{column}_mean'] = groups[column].mean()
+    table['depleted_share'] = groups['depleted_minute'].apply(lambda minutes: minutes.notna().mean())
+    table['fallback_share'] = groups['fallback_minutes'].sum() / groups['active_minutes'].sum()
+    return table if by else table.reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Battery drain and CO2 of simulated user-days")
+    parser.add_argument('--users', type=int, default=1_000_000)
+    parser.add_argument('--model', default=None, help="JSON usage model (default: built-in sessions)")
+    parser.add_argument('--population', default=None, help="JSON devices / networks / moving share")
+    parser.add_argument('--server-dir', default=DEFAULT_SERVER_DIR)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--by', default='device', help="column of the summary groups ('' for none)")
+    parser.add_argument('--output', default=None, help="CSV of every simulated user-day")
+    args = parser.parse_args()
+
+    model = UsageModel.from_json(args.model) if args.model else UsageModel.default()
+    population = None
+    if args.population:
+        with open(args.population) as f:
+            population = json.load(f)
+
+    start = time.perf_counter()
+    days = simulate(args.users, model, population, args.server_dir, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"✅ {len(days):,} user-days of {model.steps} steps simulated in {elapsed:.1f} s")
+
+    pd.set_option('display.width', 200)
+    print(f"\n📊 Fleet\n{summarize(days).round(2).to_string()}")
+    if args.by:
+        print(f"\n📊 By {args.by}\n{summarize(days, args.by).round(2).to_string()}")
+    if args.output:
+        days.to_csv(args.output, index=False)
+        print(f"💾 {os.path.basename(args.output)}")
@@ -0,0 +1,352 @@
+"""
+Live energy of a running PAC1954 capture (rasp_ff format).
+
+The sample lines written by the Raspberry Pi sampler are read as they arrive
+(pipe, TCP socket or tailed file) and folded into a LiveAccumulator: per-channel
+trapezoidal energy (BAT, BB, PA, RF = BB + PA), SPS and dropout counters are
+updated in O(1) per line with constant memory. A snapshot is published every
+few seconds (printed, and optionally written as JSON for a dashboard).
+
+At the end of a file the totals are the same as open_file_nf_6pro_3ch_rasp_ff
+(same integration rule, same SPS definitions).
+
+The replay command feeds an existing CSV at its recorded rate, so the service
+can be tested without the hardware:
+
+Usage:
+    python live_energy.py replay capture.csv [--speed 10] | python live_energy.py serve -
+    python live_energy.py serve --listen 0.0.0.0:5555 [--snapshot-file live.json]
+    python live_energy.py replay capture.csv --connect raspberrypi:5555
+    python live_energy.py serve --follow capture.csv
+"""
+import os
+import sys
+import json
+import math
+import time
+import socket
+import argparse
+from collections import deque
+from datetime import datetime
+
+from utils import _expanded_header, RASP_FF_PACKED_COLUMN, RASP_FF_CHANNELS
+
+CHANNELS = ['BAT', 'BB', 'PA', 'RF']
+
+
+class LiveAccumulator:
+    """
+    Running totals of one capture, updated one sample line at a time.
+
+    Args:
+        window: length in seconds of the rolling SPS window
+        gap_factor: a step longer than gap_factor times the usual step is a dropout
+    """
+
+    def __init__(self, window=10, gap_factor=3.0):
+        self.window = window
+        self.gap_factor = gap_factor
+
+        self.rows = 0
+        self.malformed = 0
+        self.backwards = 0            # Steps with dt < 0 (clock going back)
+        self.dropouts = 0             # Steps much longer than the usual one
+        self.dropout_seconds = 0.0
+
+        self.first_time = None
+        self.last_time = None
+        self.last_power = None
+        self.last_samples = None
+        self.energy = dict.fromkeys(CHANNELS, 0.0)   # J
+        self.usual_dt = None          # Moving average of the step (s)
+
+        # Same SPS definitions as open_file_nf_6pro_3ch_rasp_ff
+        self.sps_sum, self.sps_n = 0.0, 0
+        self.samples_sum = 0.0
+        self.n_seconds = 0
+        self.last_second = None
+
+        # Rolling SPS: sample count per second over the last `window` seconds
+        self._seconds = deque()
+        self._window_samples = 0.0
+
+    def update(self, timestamp, power, samples):
+        """
+        Adds one sample line.
+
+        Args:
+            timestamp: datetime of the line
+            power: dict with P_BAT, P_BB and P_PA (W)
+            samples: acc_samples_total of the line
+        """
+        power = (power['P_BAT'], power['P_BB'], power['P_PA'], power['P_BB'] + power['P_PA'])
+        self.rows += 1
+        if self.last_time is None:
+            self.first_time = timestamp
+            sample_diff = 0.0
+            dt = 0.0
+        else:
+            dt = (timestamp - self.last_time).total_seconds()
+            sample_diff = samples - self.last_samples
+
+            # Energy: rows with dt <= 0 add nothing (cumulative_trapezoid_energy rule)
+            if dt > 0:
+                for channel, previous, current in zip(CHANNELS, self.last_power, power):
+                    self.energy[channel] += dt * (previous + current) / 2.0
+            elif dt < 0:
+                self.backwards += 1
+
+            # Dropouts, against a moving average of the usual step
+            if dt > 0:
+                if self.usual_dt is not None and dt > self.gap_factor * self.usual_dt:
+                    self.dropouts += 1
+                    self.dropout_seconds += dt - self.usual_dt
+                else:
+                    self.usual_dt = dt if self.usual_dt is None else 0.95 * self.usual_dt + 0.05 * dt
+
+            sps = sample_diff / dt if dt > 0 else 0
+            if sps > 0 and dt > 0:
+                self.sps_sum += sps
+                self.sps_n += 1
+
+        if not math.isnan(sample_diff):
+            self.samples_sum += sample_diff
+        second = timestamp.replace(microsecond=0)
+        if second != self.last_second:
+            self.n_seconds += 1
+            self.last_second = second
+            self._seconds.append([second, 0.0])
+        if not math.isnan(sample_diff):
+            self._seconds[-1][1] += sample_diff
+            self._window_samples += sample_diff
+        while (second - self._seconds[0][0]).total_seconds() >= self.window:
+            self._window_samples -= self._seconds.popleft()[1]
+
+        self.last_time = timestamp
+        self.last_power = power
+        self.last_samples = samples
+
+    def snapshot(self):
+        """
+        Returns the current totals as a JSON-serializable dict.
+        """
+        duration = (self.last_time - self.first_time).total_seconds() if self.rows else 0
+        span = (self.last_second - self._seconds[0][0]).total_seconds() + 1 if self._seconds else 0
+        return {
+            'time': self.last_time.isoformat() if self.rows else None,
+            'rows': self.rows,
+            'duration_s': duration,
+            **{f'E_{channel}_J': value for channel, value in self.energy.items()},
+            **{f'E_{channel}_Jm': value / duration * 60 if duration > 0 else 0
+               for channel, value in self.energy.items()},
+            'SPS_mean': self.sps_sum / self.sps_n if self.sps_n > 0 else 0,
+            'SPS_count_mean': self.samples_sum / self.n_seconds if self.n_seconds > 0 else 0,
+            'SPS_rolling': self._window_samples / span if span > 0 else 0,
+            'dropouts': self.dropouts,
+            'dropout_s': self.dropout_seconds,
+            'backwards': self.backwards,
+            'malformed': self.malformed,
+        }
+
+
+class LineParser:
+    """
+    Splits rasp_ff sample lines (Timestamp,"V_BAT,...,P_PA",acc...,acc_samples_total,...)
+    according to the header line of the capture.
+    """
+
+    def __init__(self, header_line):
+        columns = _expanded_header(header_line.encode(), RASP_FF_PACKED_COLUMN, RASP_FF_CHANNELS)
+        self.n_fields = len(columns)
+        self.i_time = columns.index('Timestamp')
+        self.i_power = {name: columns.index(name) for name in ['P_BAT', 'P_BB', 'P_PA']}
+        self.i_samples = columns.index('acc_samples_total')
+
+    def parse(self, line):
+        """
+        Returns (timestamp, power dict, samples), or None for a malformed line.
+        """
+        # Quotes dropped: the packed values become normal fields
+        fields = line.strip().replace('"', '').split(',')
+        if len(fields) != self.n_fields:
+            return None
+        try:
+            timestamp = datetime.fromisoformat(fields[self.i_time])
+            power = {name: float(fields[i]) for name, i in self.i_power.items()}
+            samples = float(fields[self.i_samples])
+        except ValueError:
+            return None
+        return timestamp, power, samples
+
+
+def _is_header(line):
+    return line.startswith('Timestamp')
+
+
+def consume(lines, accumulator=None, publish=None, every=5.0):
+    """
+    Folds sample lines into an accumulator and publishes snapshots.
+
+    The header line of the capture is expected first; a new header (restart of
+    the sampler) starts a new parser but keeps the totals.
+
+    Args:
+        lines: iterable of text lines (pipe, socket, tailed file...)
+        accumulator: LiveAccumulator to update (a new one by default)
+        publish: function called with each snapshot dict
+        every: seconds (wall clock) between two snapshots
+
+    Returns:
+        LiveAccumulator: the final state
+    """
+    accumulator = accumulator or LiveAccumulator()
+    parser = None
+    next_publish = time.monotonic() + every
+    for line in lines:
+        if not line.strip():
+            continue
+        if _is_header(line):
+            parser = LineParser(line)
+            continue
+        parsed = parser.parse(line) if parser else None
+        if parsed is None:
+            accumulator.malformed += 1
+        else:
+            accumulator.update(*parsed)
+
+        if publish and time.monotonic() >= next_publish:
+            publish(accumulator.snapshot())
+            next_publish = time.monotonic() + every
+    if publish:
+        publish(accumulator.snapshot())
+    return accumulator
+
+
+# =================== SOURCES ===================
+
+def follow_file(file_name, poll=0.5, idle_timeout=None):
+    """
+    Yields the lines of a file as it grows (tail -f), partial lines are held
+    back until complete. Stops after `idle_timeout` seconds without new data.
+    """
+    with open(file_name, 'r') as f:
+        pending = ''
+        idle = 0.0
+        while True:
+            chunk = f.readline()
+            if chunk:
+                idle = 0.0
+                pending += chunk
+                if pending.endswith('\n'):
+                    yield pending
+                    pending = ''
+                continue
+            if idle_timeout is not None and idle >= idle_timeout:
+                if pending:
+                    yield pending
+                return
+            time.sleep(poll)
+            idle += poll
+
+
+def listen_lines(address):
+    """
+    Accepts one TCP connection on "host:port" and yields its lines.
+    """
+    host, port = address.rsplit(':', 1)
+    with socket.create_server((host, int(port))) as server:
+        connection, peer = server.accept()
+        print(f"📡 Connected: {peer[0]}:{peer[1]}", file=sys.stderr)
+        with connection, connection.makefile('r', encoding='utf-8', newline='') as stream:
+            yield from stream
+
+
+def replay(file_name, out, speed=1.0):
+    """
+    Writes a capture line by line at its recorded rate (`speed` times faster).
+    """
+    with open(file_name, 'r') as f:
+        header = f.readline()
+        out.write(header)
+        parser = LineParser(header)
+        start_wall, start_time = time.monotonic(), None
+        for line in f:
+            parsed = parser.parse(line)
+            if parsed is not None:
+                if start_time is None:
+                    start_time = parsed[0]
+                delay = (parsed[0] - start_time).total_seconds() / speed - (time.monotonic() - start_wall)
+                if delay > 0:
+                    out.flush()
+                    time.sleep(delay)
+            out.write(line)
+        out.flush()
+
+
+def _print_snapshot(snapshot):
+    print(f"⏱️ {snapshot['duration_s']:8.1f} s  rows {snapshot['rows']:>9}  "
+          f"BAT {snapshot['E_BAT_J']:9.2f} J  RF {snapshot['E_RF_J']:8.2f} J  "
+          f"(BB {snapshot['E_BB_J']:.2f} / PA {snapshot['E_PA_J']:.2f})  "
+          f"SPS {snapshot['SPS_rolling']:6.1f}  dropouts {snapshot['dropouts']}  "
+          f"malformed {snapshot['malformed']}", flush=True)
+
+
+def _write_json(path, data):
+    # Atomic write: readers never see a half-written file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=1)
+    os.replace(tmp, path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Live energy of a running PAC1954 capture")
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve = commands.add_parser('serve', help="accumulate sample lines and publish snapshots")
+    source = serve.add_mutually_exclusive_group(required=True)
+    source.add_argument('input', nargs='?', help="'-' for stdin")
+    source.add_argument('--listen', metavar='HOST:PORT', help="accept the sampler on a TCP socket")
+    source.add_argument('--follow', metavar='FILE', help="tail a capture file as it grows")
+    serve.add_argument('--every', type=float, default=5.0, help="seconds between snapshots")
+    serve.add_argument('--window', type=float, default=10.0, help="rolling SPS window in seconds")
+    serve.add_argument('--snapshot-file', default=None, help="JSON file rewritten at each snapshot")
+    serve.add_argument('--idle-timeout', type=float, default=None,
+                       help="with --follow, stop after this many seconds without new lines")
+    replay_cmd = commands.add_parser('replay', help="feed a capture at its recorded rate")
+    replay_cmd.add_argument('file')
+    replay_cmd.add_argument('--speed', type=float, default=1.0)
+    replay_cmd.add_argument('--connect', metavar='HOST:PORT', help="send to a TCP socket instead of stdout")
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        if args.listen:
+            lines = listen_lines(args.listen)
+        elif args.follow:
+            lines = follow_file(args.follow, idle_timeout=args.idle_timeout)
+        elif args.input == '-':
+            lines = sys.stdin
+        else:
+            lines = open(args.input, 'r')
+
+        def publish(snapshot):
+            _print_snapshot(snapshot)
+            if args.snapshot_file:
+                _write_json(args.snapshot_file, snapshot)
+
+        try:
+            consume(lines, LiveAccumulator(window=args.window), publish, args.every)
+        except KeyboardInterrupt:
+            pass
+    else:
+        try:
+            if args.connect:
+                host, port = args.connect.rsplit(':', 1)
+                with socket.create_connection((host, int(port))) as connection, \
+                        connection.makefile('w', encoding='utf-8', newline='') as out:
+                    replay(args.file, out, args.speed)
+            else:
+                replay(args.file, sys.stdout, args.speed)
+        except BrokenPipeError:
+            pass
+        except Exception as e:
+            print(f"❌ Error with {os.path.basename(args.file)}: {e}", file=sys.stderr)
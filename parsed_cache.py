@@ -0,0 +1,338 @@
+"""
+Columnar cache of parsed measurement files.
+
+Each raw log is parsed once and its typed columns are saved as one .npy file per
+column, so later loads are memory-mapped (zero-copy) instead of re-parsing the CSV.
+
+Layout of the cache directory (default ./.cache/parsed, or $SIR_CACHE_DIR):
+    <reader>.v<version>-<content hash>/meta.json      columns, dtypes, rows, source file info
+    <reader>.v<version>-<content hash>/NNN.npy        one array per column (NNN = column index)
+    <reader>.v<version>-<content hash>/NNN.cat.npy    categories of a text column (NNN.npy
+                                                      holds its codes, -1 where missing)
+    paths/<path hash>.json                            path, size, mtime -> content hash
+
+Entries are content-addressed: a file that is moved or copied keeps its entry,
+and the path index only avoids re-hashing unchanged files (same size and mtime).
+The key also holds the version of the reader (READER_VERSIONS), so the entries
+parsed by an older reader are never served after its output changed; they are
+left to the LRU eviction.
+
+The mtime of meta.json records the last access, used for LRU eviction once the
+cache grows past its size cap ($SIR_CACHE_MAX_BYTES, default 20 GB).
+
+Usage:
+    python parsed_cache.py warm [--reader rasp_ff] FILES...
+    python parsed_cache.py info
+    python parsed_cache.py evict [--max-bytes N]
+    python parsed_cache.py clear
+"""
+import os
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+
+DEFAULT_CACHE_DIR = os.path.join('.', '.cache', 'parsed')
+DEFAULT_MAX_BYTES = 20 * 1024 ** 3
+
+
+def _read_rasp_ff(file_name):
+    from utils import _read_rasp_ff
+    return _read_rasp_ff(file_name)
+
+
+def _read_nf1(file_name):
+    from utils import read_packed_csv, NF1_PACKED_COLUMN, NF1_CHANNELS
+    return read_packed_csv(file_name, NF1_PACKED_COLUMN, NF1_CHANNELS, dtype=None)
+
+
+# Parsers whose output can be cached, by name
+READERS = {
+    'rasp_ff': _read_rasp_ff,
+    'nf1': _read_nf1,
+}
+
+# Output version of each parser, part of the cache key: bump it whenever the
+# columns, dtypes or values a parser returns change (e.g. the short packed rows
+# of utils._parse_packed_block now parsed as NaN: version 2)
+READER_VERSIONS = {
+    'rasp_ff': 2,
+    'nf1': 2,
+}
+
+
+def cache_dir():
+    return os.environ.get('SIR_CACHE_DIR', DEFAULT_CACHE_DIR)
+
+
+def max_cache_bytes():
+    return int(os.environ.get('SIR_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES))
+
+
+def content_hash(file_name, block_size=1 << 22):
+    """
+    BLAKE2b digest of the file content, read in blocks.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_name, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_json(path, data):
+    # Atomic write: readers never see a half-written file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=1)
+    os.replace(tmp, path)
+
+
+def _path_index_file(file_name):
+    path_hash = hashlib.blake2b(os.path.abspath(file_name).encode(), digest_size=16).hexdigest()
+    return os.path.join(cache_dir(), 'paths', f"{path_hash}.json")
+
+
+def _key(reader, digest):
+    return f"{reader}.v{READER_VERSIONS[reader]}-{digest}"
+
+
+def entry_key(file_name, reader='rasp_ff'):
+    """
+    Returns the cache key of a file for a reader (name, version and content hash).
+
+    The content hash is only computed when the path, size or mtime of the file
+    changed since it was last seen.
+    """
+    stat = os.stat(file_name)
+    index_file = _path_index_file(file_name)
+    try:
+        with open(index_file) as f:
+            known = json.load(f)
+        if known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+            return _key(reader, known['hash'])
+    except (OSError, ValueError, KeyError):
+        pass
+
+    digest = content_hash(file_name)
+    os.makedirs(os.path.dirname(index_file), exist_ok=True)
+    _write_json(index_file, {
+        'path': os.path.abspath(file_name),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'hash': digest,
+    })
+    return _key(reader, digest)
+
+
+def _to_arrays(series):
+    """
+    Returns the array to save for a column, and the categories of a text column
+    (None otherwise).
+    """
+    values = series.to_numpy()
+    if values.dtype != object:
+        return values, None
+    # Text columns: int32 codes (-1 for missing values, not the string 'nan') and
+    # fixed-width unicode categories, both memory-mappable
+    codes, categories = pd.factorize(series, use_na_sentinel=True)
+    return codes.astype(np.int32), np.asarray(categories, dtype=str)
+
+
+def _from_codes(codes, categories):
+    values = np.asarray(categories, dtype=object)[np.maximum(codes, 0)] if len(categories) else \
+        np.empty(len(codes), dtype=object)
+    values[codes < 0] = np.nan
+    return values
+
+
+def store(file_name, df, reader='rasp_ff'):
+    """
+    Saves the columns of a parsed DataFrame in the cache and returns the entry key.
+    """
+    key = entry_key(file_name, reader)
+    entry_dir = os.path.join(cache_dir(), key)
+    if os.path.exists(os.path.join(entry_dir, 'meta.json')):
+        return key
+
+    # Write everything in a temporary directory, then move it in place
+    tmp_dir = f"{entry_dir}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    columns = {}
+    for i, column in enumerate(df.columns):
+        values, categories = _to_arrays(df[column])
+        file_part = f"{i:03d}.npy"
+        np.save(os.path.join(tmp_dir, file_part), values, allow_pickle=False)
+        columns[column] = {'file': file_part, 'dtype': str(values.dtype)}
+        if categories is not None:
+            np.save(os.path.join(tmp_dir, f"{i:03d}.cat.npy"), categories, allow_pickle=False)
+            columns[column].update({'dtype': 'object', 'categories': f"{i:03d}.cat.npy"})
+
+    stat = os.stat(file_name)
+    _write_json(os.path.join(tmp_dir, 'meta.json'), {
+        'reader': reader,
+        'version': READER_VERSIONS[reader],
+        'source': os.path.abspath(file_name),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'rows': len(df),
+        'columns': columns,
+    })
+    try:
+        os.rename(tmp_dir, entry_dir)
+    except OSError:
+        # Another process stored the same entry first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    evict(max_cache_bytes(), keep=key)
+    return key
+
+
+def load_columns(file_name, reader='rasp_ff', columns=None):
+    """
+    Returns the parsed columns of a raw log as read-only memory-mapped arrays,
+    parsing and caching the file first if needed.
+
+    Args:
+        file_name: path of the raw CSV log
+        reader: name of the parser in READERS
+        columns: optional list of columns to load (all by default)
+
+    Returns:
+        dict: column name -> np.ndarray (memory-mapped, except the text columns
+        which are rebuilt as object arrays with NaN for the missing values)
+    """
+    key = entry_key(file_name, reader)
+    meta_file = os.path.join(cache_dir(), key, 'meta.json')
+    if not os.path.exists(meta_file):
+        store(file_name, READERS[reader](file_name), reader)
+
+    with open(meta_file) as f:
+        meta = json.load(f)
+    os.utime(meta_file)  # Last access for LRU eviction
+
+    selected = meta['columns'] if columns is None else {c: meta['columns'][c] for c in columns}
+    entry_dir = os.path.dirname(meta_file)
+    arrays = {}
+    for column, info in selected.items():
+        values = np.load(os.path.join(entry_dir, info['file']), mmap_mode='r', allow_pickle=False)
+        if 'categories' in info:
+            values = _from_codes(values, np.load(os.path.join(entry_dir, info['categories']), allow_pickle=False))
+        arrays[column] = values
+    return arrays
+
+
+def load_frame(file_name, reader='rasp_ff', columns=None):
+    """
+    Same as load_columns, assembled as a DataFrame (the columns are copied into
+    pandas' own blocks, use load_columns to stay zero-copy).
+    """
+    return pd.DataFrame({column: np.asarray(values) for column, values in
+                         load_columns(file_name, reader, columns).items()})
+
+
+def cache_info():
+    """
+    Lists the cache entries, most recently used first.
+
+    Returns:
+        pd.DataFrame: key, reader, source, rows, bytes, last access
+    """
+    rows = []
+    root = cache_dir()
+    if not os.path.isdir(root):
+        return pd.DataFrame(columns=['key', 'reader', 'source', 'rows', 'bytes', 'last_access'])
+    for key in os.listdir(root):
+        meta_file = os.path.join(root, key, 'meta.json')
+        if not os.path.isfile(meta_file):
+            continue
+        with open(meta_file) as f:
+            meta = json.load(f)
+        entry_dir = os.path.join(root, key)
+        size = sum(os.path.getsize(os.path.join(entry_dir, name)) for name in os.listdir(entry_dir))
+        rows.append({
+            'key': key,
+            'reader': meta['reader'],
+            'source': meta['source'],
+            'rows': meta['rows'],
+            'bytes': size,
+            'last_access': pd.Timestamp(os.path.getmtime(meta_file), unit='s'),
+        })
+    info = pd.DataFrame(rows, columns=['key', 'reader', 'source', 'rows', 'bytes', 'last_access'])
+    return info.sort_values('last_access', ascending=False, ignore_index=True)
+
+
+def evict(max_bytes=None, keep=None):
+    """
+    Removes the least recently used entries until the cache fits in `max_bytes`.
+    The entry `keep` (e.g. the one just stored) is never removed.
+
+    Returns:
+        list: keys of the removed entries
+    """
+    if max_bytes is None:
+        max_bytes = max_cache_bytes()
+    info = cache_info()
+    total = info['bytes'].sum()
+    removed = []
+    # Oldest access first
+    for row in info.iloc[::-1].itertuples():
+        if total <= max_bytes:
+            break
+        if row.key == keep:
+            continue
+        shutil.rmtree(os.path.join(cache_dir(), row.key), ignore_errors=True)
+        total -= row.bytes
+        removed.append(row.key)
+    return removed
+
+
+def clear():
+    shutil.rmtree(cache_dir(), ignore_errors=True)
+
+
+def _format_bytes(size):
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cache of parsed measurement files")
+    commands = parser.add_subparsers(dest='command', required=True)
+    warm = commands.add_parser('warm', help="parse and cache files")
+    warm.add_argument('files', nargs='+')
+    warm.add_argument('--reader', default='rasp_ff', choices=sorted(READERS))
+    commands.add_parser('info', help="list cache entries")
+    evict_cmd = commands.add_parser('evict', help="remove least recently used entries")
+    evict_cmd.add_argument('--max-bytes', type=int, default=None)
+    commands.add_parser('clear', help="remove the whole cache")
+    args = parser.parse_args()
+
+    if args.command == 'warm':
+        for file_name in args.files:
+            start = time.perf_counter()
+            try:
+                load_columns(file_name, args.reader)
+                print(f"✅ {os.path.basename(file_name)} ({time.perf_counter() - start:.2f} s)")
+            except Exception as e:
+                print(f"❌ Error with {os.path.basename(file_name)}: {e}")
+    elif args.command == 'info':
+        info = cache_info()
+        print(f"📂 {cache_dir()}: {len(info)} entries, {_format_bytes(info['bytes'].sum())}"
+              f" (cap {_format_bytes(max_cache_bytes())})")
+        for row in info.itertuples():
+            print(f"  {row.key[:24]:<24} {row.rows:>10} rows {_format_bytes(row.bytes):>10}"
+                  f"  {row.last_access:%Y-%m-%d %H:%M}  {os.path.basename(row.source)}")
+    elif args.command == 'evict':
+        removed = evict(args.max_bytes)
+        print(f"🗑️ {len(removed)} entries removed")
+    elif args.command == 'clear':
+        clear()
+        print(f"🗑️ {cache_dir()} removed")
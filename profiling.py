@@ -0,0 +1,157 @@
+"""
+Opt-in per-stage profiling of the readers and analyzers of utils.
+
+The processing functions mark their steps with `stage(name)` blocks (CSV read,
+packed column parsing, datetime conversion, integration, SPS groupby, time
+strings...). Outside of a Profile these blocks do nothing but return a shared
+no-op context. Inside one, every block records its wall time, CPU time and the
+memory it allocated (net and peak, through tracemalloc).
+
+    with Profile() as profile:
+        dataset_analyze_rasp_ff(file_name)
+    profile.table()                  # one row per stage, slowest first
+    profile.to_json('profile.json')
+
+    profile = Profile()
+    df, failures = analyze_files(file_list, profile=profile)   # merged across workers
+"""
+import json
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+_NULL_STAGE = nullcontext()
+_active = None    # Profile currently recording, if any
+_frames = []      # Open stages: [start traced bytes, peak traced bytes seen in children]
+
+FIELDS = ['calls', 'wall_s', 'cpu_s', 'alloc_bytes', 'peak_bytes']
+
+
+def stage(name):
+    """
+    Returns a context manager recording the `name` stage in the active Profile
+    (a shared no-op one when no Profile is active).
+    """
+    if _active is None:
+        return _NULL_STAGE
+    return _Stage(_active, name)
+
+
+class _Stage:
+    __slots__ = ('profile', 'name', 'wall', 'cpu')
+
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        if self.profile.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if _frames:
+                _frames[-1][1] = max(_frames[-1][1], peak)
+            tracemalloc.reset_peak()
+            _frames.append([current, current])
+        self.cpu = time.process_time()
+        self.wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        alloc = peak = 0
+        if self.profile.memory:
+            current, traced_peak = tracemalloc.get_traced_memory()
+            start, children_peak = _frames.pop()
+            top = max(traced_peak, children_peak)
+            if _frames:
+                _frames[-1][1] = max(_frames[-1][1], top)
+            tracemalloc.reset_peak()
+            alloc, peak = current - start, top - start
+        self.profile.record(self.name, wall, cpu, alloc, peak)
+        return False
+
+
+class Profile:
+    """
+    Per-stage totals (calls, wall time, CPU time, allocated and peak bytes).
+
+    Args:
+        memory: also measure allocations with tracemalloc (slows the profiled
+            code down, timings stay comparable between stages)
+    """
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.stages = {}
+        self.runs = 0
+        self._previous = None
+        self._started_tracing = False
+
+    def __enter__(self):
+        global _active
+        self._previous, _active = _active, self
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self.runs += 1
+        return self
+
+    def __exit__(self, *exc):
+        global _active
+        _active = self._previous
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return False
+
+    def record(self, name, wall, cpu, alloc=0, peak=0):
+        totals = self.stages.setdefault(name, dict.fromkeys(FIELDS, 0))
+        totals['calls'] += 1
+        totals['wall_s'] += wall
+        totals['cpu_s'] += cpu
+        totals['alloc_bytes'] += alloc
+        totals['peak_bytes'] = max(totals['peak_bytes'], peak)
+
+    def merge(self, other):
+        """
+        Adds the stages of another Profile (or of its to_dict()), e.g. from a worker.
+        """
+        data = other if isinstance(other, dict) else other.to_dict()
+        self.runs += data['runs']
+        for name, values in data['stages'].items():
+            totals = self.stages.setdefault(name, dict.fromkeys(FIELDS, 0))
+            for key in FIELDS:
+                if key == 'peak_bytes':
+                    totals[key] = max(totals[key], values[key])
+                else:
+                    totals[key] += values[key]
+        return self
+
+    def to_dict(self):
+        return {
+            'runs': self.runs,
+            'memory': self.memory,
+            'stages': {name: dict(values) for name, values in self.stages.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('memory', True)).merge(data)
+
+    def to_json(self, file_name):
+        with open(file_name, 'w') as f:
+            json.dump(self.to_dict(), f, indent=1)
+
+    def table(self):
+        """
+        Returns a DataFrame with one row per stage, slowest first, with its share
+        of the profiled wall time.
+        """
+        import pandas as pd
+
+        df = pd.DataFrame.from_dict(self.stages, orient='index', columns=FIELDS)
+        df.index.name = 'stage'
+        total = df['wall_s'].sum()
+        df['wall_%'] = 100 * df['wall_s'] / total if total > 0 else 0.0
+        df['mean_wall_s'] = df['wall_s'] / df['calls']
+        return df.sort_values('wall_s', ascending=False)
@@ -0,0 +1,319 @@
+"""
+Data-quality scan of the measurement archive.
+
+Every log is read through the format registry (readers.read_log) with only
+the columns the checks need, then vectorized checks flag bad rows:
+
+    time_order   timestamp going backwards (the hourly wrap of the m_sec_ms clock excepted)
+    gap          interval longer than gap_factor x the usual sample interval
+    dropout      acc_samples_total jumping by more than the usual count (lost
+                 samples, rasp_ff) or going backwards (counter reset)
+    power_vi     |V x I - P| / P above vi_tolerance, for every V/I/P triplet of the format
+    rf_gt_bat    P_RF above P_BAT (rows already dropped by parse_simple_power_csv are counted)
+    nan          NaN in a channel
+
+Files are scanned in parallel. The result is one report row per file (counts,
+shares, SPS per second like open_file_nf_6pro_3ch_rasp_ff, mean V x I error
+like analise.py) and the bad spans: runs of flagged rows, with their time
+range. Later analyses can drop them with exclusion_mask():
+
+    report, spans, failures = scan_files(file_list, workers=8)
+    keep = ~exclusion_mask(df['Timestamp'], spans[spans['file'] == name])
+
+    python quality.py DATA_DIR_OR_FILES... [--workers 8] [--output-dir quality/]
+"""
+import os
+import argparse
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from profiling import stage
+
+FLAGS = {'time_order': 1, 'gap': 2, 'dropout': 4, 'power_vi': 8, 'rf_gt_bat': 16, 'nan': 32}
+# Checks flagging the interval before a row rather than the row itself
+INTERVAL_CHECKS = {'time_order', 'gap', 'dropout'}
+
+DEFAULTS = {
+    'gap_factor': 4.0,          # gap: dt > gap_factor x median positive dt ...
+    'min_gap_s': 0.05,          # ... and longer than this
+    'dropout_tolerance': 0.5,   # dropout: samples per row > (1 + tolerance) x median
+    'vi_tolerance': 0.05,       # power_vi: relative error
+    'vi_min_power': 0.01,       # power_vi: rows with |P| below this (W) are not checked
+    'max_bad_share': 0.01,      # report 'ok' when at most this share of rows is flagged
+}
+POWER_PREFIXES = ['BAT', 'BB', 'PA', 'RF']
+
+
+def _plan(columns):
+    """
+    Columns each check needs among those of a format.
+
+    Returns:
+        dict: vi triplets [(V, I, P)], rf pairs [(P_RF, P_BAT)], samples column or None
+    """
+    available = set(columns)
+    triplets = [(f'V_{p}', f'I_{p}', f'P_{p}') for p in POWER_PREFIXES
+                if {f'V_{p}', f'I_{p}', f'P_{p}'} <= available]
+    pairs = [(f'P_RF{s}', f'P_BAT{s}') for s in ['', '_P1', '_P2'] if {f'P_RF{s}', f'P_BAT{s}'} <= available]
+    return {
+        'triplets': triplets,
+        'pairs': pairs,
+        'samples': 'acc_samples_total' if 'acc_samples_total' in available else None,
+    }
+
+
+def _needed_columns(plan):
+    columns = [c for triplet in plan['triplets'] for c in triplet]
+    columns += [c for pair in plan['pairs'] for c in pair]
+    if plan['samples']:
+        columns.append(plan['samples'])
+    return list(dict.fromkeys(columns))
+
+
+def _check_time(seconds, options, report):
+    dt = np.diff(seconds, prepend=seconds[:1])
+    positive = dt[dt > 0]
+    nominal = float(np.median(positive)) if len(positive) else 0.0
+    backwards = dt < 0
+    gap = dt > max(options['gap_factor'] * nominal, options['min_gap_s']) if nominal else np.zeros(len(dt), bool)
+    report.update({
+        'non_monotonic': int(backwards.sum()),
+        'duplicate_times': int((dt[1:] == 0).sum()),
+        'median_dt_s': nominal,
+        'gaps': int(gap.sum()),
+        'gap_time_s': float(dt[gap].sum()),
+        'longest_gap_s': float(dt[gap].max()) if gap.any() else 0.0,
+    })
+    return backwards, gap
+
+
+def _check_samples(samples, seconds, options, report):
+    diff = np.diff(samples, prepend=samples[:1])
+    positive = diff[diff > 0]
+    nominal = float(np.median(positive)) if len(positive) else 0.0
+    reset = diff < 0
+    dropout = (diff > (1 + options['dropout_tolerance']) * nominal) if nominal else np.zeros(len(diff), bool)
+    dropped = float((diff[dropout] - nominal).sum())
+    counted = float(diff[diff > 0].sum())
+
+    # Samples per second, like groupby(Timestamp.floor('s')) in open_file_nf_6pro_3ch_rasp_ff
+    second = np.floor(seconds - seconds.min()).astype(np.int64) if len(seconds) else np.zeros(0, np.int64)
+    valid = (diff > 0) & (second >= 0)
+    per_second = np.bincount(second[valid], weights=diff[valid])
+    # First and last seconds are partial
+    full = per_second[1:-1] if len(per_second) > 2 else per_second
+    sps_median = float(np.median(full)) if len(full) else np.nan
+    report.update({
+        'samples_per_row': nominal,
+        'dropouts': int(dropout.sum()),
+        'dropped_samples': dropped,
+        'dropout_share': dropped / (dropped + counted) if dropped + counted else 0.0,
+        'counter_resets': int(reset.sum()),
+        'sps_median': sps_median,
+        'sps_min': float(full.min()) if len(full) else np.nan,
+        'low_sps_seconds': int((full < 0.9 * sps_median).sum()) if len(full) else 0,
+    })
+    return dropout | reset
+
+
+def _check_vi(df, triplets, options, report):
+    bad = np.zeros(len(df), dtype=bool)
+    for v, i, p in triplets:
+        power = df[p].to_numpy(dtype=float)
+        computed = df[v].to_numpy(dtype=float) * df[i].to_numpy(dtype=float)
+        checked = np.abs(power) >= options['vi_min_power']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            error = np.where(checked, np.abs(computed - power) / np.abs(power), np.nan)
+        over = error > options['vi_tolerance']
+        bad |= over
+        report[f'{p}_vi_error_pct'] = float(np.nanmean(error) * 100) if checked.any() else np.nan
+        report[f'{p}_vi_bad_share'] = float(over.sum() / checked.sum()) if checked.any() else np.nan
+    return bad
+
+
+def _check_rf(df, pairs, report):
+    bad = np.zeros(len(df), dtype=bool)
+    for rf, bat in pairs:
+        bad |= df[rf].to_numpy(dtype=float) > df[bat].to_numpy(dtype=float)
+    # Rows parse_simple_power_csv already dropped for this reason
+    report['rf_gt_bat'] = int(bad.sum()) + int(df.attrs.get('skipped', 0))
+    return bad
+
+
+def _spans(flags, times, seconds):
+    """
+    Runs of consecutive rows carrying each flag, with their time range.
+    """
+    spans = []
+    for name, bit in FLAGS.items():
+        flagged = (flags & bit) != 0
+        if not flagged.any():
+            continue
+        edges = np.diff(np.concatenate([[0], flagged.view(np.int8), [0]]))
+        starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+        # An interval check covers the time since the previous row
+        first = np.maximum(starts - 1, 0) if name in INTERVAL_CHECKS else starts
+        # Ordered bounds: a backwards step ends before it starts
+        lo, hi = np.minimum(seconds[first], seconds[ends - 1]), np.maximum(seconds[first], seconds[ends - 1])
+        spans.append(pd.DataFrame({
+            'check': name,
+            'start_row': starts,
+            'end_row': ends,
+            'start': np.minimum(times[first], times[ends - 1]),
+            'end': np.maximum(times[first], times[ends - 1]),
+            'duration_s': hi - lo,
+        }))
+    return pd.concat(spans, ignore_index=True) if spans else pd.DataFrame(
+        columns=['check', 'start_row', 'end_row', 'start', 'end', 'duration_s'])
+
+
+def scan_file(file_name, fmt=None, **options):
+    """
+    Runs every check on one log.
+
+    Args:
+        fmt: format name (sniffed by default)
+        **options: thresholds, see DEFAULTS
+
+    Returns:
+        dict: report row
+        np.ndarray: per-row flags (bits of FLAGS)
+        pd.DataFrame: bad spans (check, rows, time range)
+    """
+    from readers import READERS, read_log, sniff
+
+    options = {**DEFAULTS, **options}
+    fmt = fmt or sniff(file_name)
+    plan = _plan(READERS[fmt]['columns'])
+    with stage('quality_read'):
+        df = read_log(file_name, _needed_columns(plan), fmt, dtype=np.float32)
+
+    times = df['time'].to_numpy()
+    seconds = (times - times[0]) / np.timedelta64(1, 's') if len(times) else np.zeros(0)
+    report = {'file': os.path.basename(file_name), 'format': fmt, 'rows': len(df),
+              'duration_s': float(seconds.max() - seconds.min()) if len(df) else 0.0}
+    flags = np.zeros(len(df), dtype=np.uint8)
+
+    with stage('quality_checks'):
+        backwards, gap = _check_time(seconds, options, report)
+        flags[backwards] |= FLAGS['time_order']
+        flags[gap] |= FLAGS['gap']
+        if plan['samples']:
+            flags[_check_samples(df[plan['samples']].to_numpy(dtype=float), seconds, options, report)] |= \
+                FLAGS['dropout']
+        flags[_check_vi(df, plan['triplets'], options, report)] |= FLAGS['power_vi']
+        flags[_check_rf(df, plan['pairs'], report)] |= FLAGS['rf_gt_bat']
+        channels = df.drop(columns='time')
+        missing = channels.isna().to_numpy().any(axis=1)
+        flags[missing] |= FLAGS['nan']
+        report['nan_rows'] = int(missing.sum())
+        report['malformed_rows'] = int(df.attrs.get('malformed', 0))
+
+    flagged = int((flags != 0).sum())
+    report['flagged_rows'] = flagged
+    report['flagged_share'] = flagged / len(df) if len(df) else 0.0
+    report['ok'] = report['flagged_share'] <= options['max_bad_share']
+    return report, flags, _spans(flags, times, seconds)
+
+
+def _scan_one(task):
+    # Runs in a worker process: never raises, failures are returned as messages
+    file_name, options = task
+    try:
+        report, _, spans = scan_file(file_name, **options)
+        return report, spans, None
+    except Exception as e:
+        return None, None, f"{type(e).__name__}: {e}"
+
+
+def scan_files(file_list, workers=None, **options):
+    """
+    Scans many logs in parallel.
+
+    Returns:
+        pd.DataFrame: one report row per scanned file, in the order of file_list
+        pd.DataFrame: bad spans of every file (column file first)
+        dict: file name -> error message for the files that could not be scanned
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    tasks = [(file_name, options) for file_name in file_list]
+    if workers == 1 or len(tasks) <= 1:
+        results = list(map(_scan_one, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_scan_one, tasks, chunksize=4))
+
+    reports, spans, failures = [], [], {}
+    for file_name, (report, file_spans, error) in zip(file_list, results):
+        if error is None:
+            reports.append(report)
+            if len(file_spans):
+                file_spans.insert(0, 'file', report['file'])
+                spans.append(file_spans)
+        else:
+            failures[os.path.basename(file_name)] = error
+            print(f"❌ Error with {os.path.basename(file_name)}: {error}")
+    spans = pd.concat(spans, ignore_index=True) if spans else pd.DataFrame(
+        columns=['file', 'check', 'start_row', 'end_row', 'start', 'end', 'duration_s'])
+    return pd.DataFrame(reports), spans, failures
+
+
+def exclusion_mask(times, spans, checks=None):
+    """
+    Rows of a log falling inside its bad spans (start <= time <= end).
+
+    Each span is found by binary search on the sorted times and the coverage
+    is a cumulative sum of +1/-1 marks, so the cost is linear in the rows.
+
+    Args:
+        times: sorted timestamps of the log
+        spans: bad spans of this log (scan_file / scan_files)
+        checks: names of the checks to exclude (all by default)
+
+    Returns:
+        np.ndarray: boolean, True for the rows to exclude
+    """
+    times = np.asarray(pd.Series(times).astype('datetime64[ns]'))
+    if checks is not None:
+        spans = spans[spans['check'].isin(checks)]
+    starts = np.searchsorted(times, spans['start'].to_numpy().astype('datetime64[ns]'), 'left')
+    ends = np.searchsorted(times, spans['end'].to_numpy().astype('datetime64[ns]'), 'right')
+    marks = np.zeros(len(times) + 1, dtype=np.int64)
+    np.add.at(marks, starts, 1)
+    np.add.at(marks, ends, -1)
+    return np.cumsum(marks[:-1]) > 0
+
+
+def _collect(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(str(f) for f in Path(path).rglob('*.csv') if f.is_file())
+        else:
+            files.append(path)
+    return files
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Data-quality scan of measurement logs")
+    parser.add_argument('paths', nargs='+', help="log files or folders (scanned recursively)")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output-dir', default='.', help="where quality_report.csv and quality_spans.csv go")
+    for name, value in DEFAULTS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=float, default=value)
+    args = parser.parse_args()
+
+    options = {name: getattr(args, name) for name in DEFAULTS}
+    report, spans, failures = scan_files(_collect(args.paths), args.workers, **options)
+    os.makedirs(args.output_dir, exist_ok=True)
+    report.to_csv(os.path.join(args.output_dir, 'quality_report.csv'), index=False)
+    spans.to_csv(os.path.join(args.output_dir, 'quality_spans.csv'), index=False)
+
+    bad = report[~report['ok']] if len(report) else report
+    print(f"✅ {len(report)} files scanned, {len(spans)} bad spans")
+    for row in bad.itertuples(index=False):
+        print(f"⚠️ {row.file}: {row.flagged_share:.1%} of the rows flagged")
+    if failures:
+        print("⚠️ Problematic files:", list(failures))
+    print(f"💾 {os.path.join(args.output_dir, 'quality_report.csv')}")
@@ -0,0 +1,193 @@
+"""
+Registry of the PAC1954 log formats: header sniffing and column projection.
+
+Every format of the repo is registered with a sniffer (looking at the header
+and the first data line only) and a reader returning one common columnar
+schema:
+
+    time                   datetime64[ns]; absolute for rasp_ff and call captures,
+                           1900-01-01 + unwrapped "%M:%S.%f" clock for the nf logs
+    V_*, I_*, P_*          channels in V, A, W (P_RF = P_BB + P_PA when the log
+                           has no RF channel of its own)
+    P_BAT_P1 ... P_RF_P2   the two probes of the iPhone 2-channel call logs
+    useful_data, useful_state, count, acc_samples_total   as logged
+
+Only the requested columns are decoded: the other fields are skipped by the CSV
+parser, so the RF box plot reading P_PA never converts the eight other channels.
+
+    read_log(file_name, ['P_PA'])                 # time + P_PA, format sniffed
+    read_log(file_name, ['P_RF'], time=False)     # reads P_BB and P_PA only
+    sniff(file_name)                              # 'rasp_ff', 'nf1', ...
+
+    python readers.py FILES...                    # prints the detected formats
+"""
+import os
+import re
+import csv
+import argparse
+import numpy as np
+import pandas as pd
+from utils import (read_packed_csv, unwrap_m_sec_ms, RASP_FF_PACKED_COLUMN, RASP_FF_CHANNELS,
+                   NF1_PACKED_COLUMN, NF1_CHANNELS)
+
+SNIFF_BYTES = 1 << 16
+NF_6PRO_3CH_CHANNELS = ['V_BAT', 'I_BAT', 'P_BAT', 'V_BB', 'I_BB', 'P_BB', 'V_PA', 'I_PA', 'P_PA',
+                        'useful_data', 'useful_state', 'count']
+IPHONE_2CH_PACKED_COLUMN = 'P_BAT_P1'
+IPHONE_2CH_CHANNELS = ['P_BAT_P1', 'P_RF_P1', 'P_BAT_P2', 'P_RF_P2', 'useful_data', 'useful_state',
+                       'count_1', 'count_2']
+INTEGER_COLUMNS = {'useful_data', 'useful_state', 'count', 'count_1', 'count_2', 'acc_samples_total'}
+
+# name -> {'sniff': f(header, first_row) -> bool, 'read': f(file_name, columns, time, dtype), 'columns': [...]}
+READERS = {}
+
+
+def register_reader(name, sniff, read, columns):
+    """
+    Adds a format to the registry. Formats are sniffed in registration order.
+
+    Args:
+        sniff: function(header fields, first data row fields) -> True if the file is of this format
+        read: function(file_name, columns, time, dtype) -> DataFrame of the common schema
+        columns: columns (besides time) the format provides
+    """
+    READERS[name] = {'sniff': sniff, 'read': read, 'columns': list(columns)}
+
+
+def _first_lines(file_name):
+    with open(file_name, 'rb') as f:
+        lines = f.read(SNIFF_BYTES).decode('utf-8-sig', errors='replace').splitlines()
+    rows = list(csv.reader(lines[:2]))
+    return (rows + [[], []])[:2]
+
+
+def sniff(file_name):
+    """
+    Returns the name of the registered format of a file, from its first bytes.
+    """
+    header, first_row = _first_lines(file_name)
+    for name, spec in READERS.items():
+        if spec['sniff'](header, first_row):
+            return name
+    raise ValueError(f"Unknown log format: {os.path.basename(file_name)} (header {header})")
+
+
+def read_log(file_name, columns=None, fmt=None, time=True, dtype=np.float64):
+    """
+    Reads a log of any registered format into the common schema.
+
+    Args:
+        columns: columns to decode (all the columns of the format by default)
+        fmt: format name (sniffed from the header when None)
+        time: also decode the time column
+        dtype: float type of the channels
+
+    Returns:
+        pd.DataFrame: time (if asked) then the requested columns, in the asked order
+    """
+    spec = READERS[fmt or sniff(file_name)]
+    columns = list(spec['columns'] if columns is None else columns)
+    missing = [c for c in columns if c not in spec['columns']]
+    if missing:
+        raise KeyError(f"Columns {missing} not available in {fmt or sniff(file_name)} logs")
+    return spec['read'](file_name, columns, time, dtype)
+
+
+def _packed_reader(packed_column, names, time_column, parse_time, derived=None):
+    """
+    Reader of a format whose channels are packed in one quoted field.
+
+    Args:
+        derived: dict column -> list of channels summed to build it (e.g. P_RF)
+    """
+    derived = derived or {}
+
+    def read(file_name, columns, time, dtype):
+        needed = [source for column in columns for source in derived.get(column, [column])]
+        usecols = list(dict.fromkeys(([time_column] if time else []) + needed))
+        raw = read_packed_csv(file_name, packed_column, names, dtype=None, usecols=usecols)
+        df = pd.DataFrame(index=raw.index)
+        if time:
+            df['time'] = parse_time(raw[time_column])
+        for column in columns:
+            values = sum(raw[source] for source in derived[column]) if column in derived else raw[column]
+            df[column] = values if column in INTEGER_COLUMNS else values.astype(dtype)
+        return df
+
+    return read
+
+
+def _rasp_ff_time(timestamps):
+    return pd.to_datetime(timestamps).astype('datetime64[ns]')
+
+
+def _nf_time(m_sec_ms):
+    return (pd.Timestamp('1900-01-01') + unwrap_m_sec_ms(m_sec_ms)).astype('datetime64[ns]')
+
+
+def _packed_count(header, first_row, packed_column):
+    # Number of values in the packed field of the first data row
+    if packed_column not in header or len(first_row) != len(header):
+        return None
+    return len(first_row[header.index(packed_column)].split(','))
+
+
+def _read_call(file_name, columns, time, dtype):
+    from sequence_energy_simulator import parse_simple_power_csv
+
+    raw = parse_simple_power_csv(file_name)
+    df = pd.DataFrame({'time': raw['timestamp'].astype('datetime64[ns]')}) if time else pd.DataFrame(index=raw.index)
+    for column in columns:
+        df[column] = raw[column].astype(dtype)
+    df.attrs.update(raw.attrs)
+    return df
+
+
+CALL_ROW = re.compile(r'^\d{2}-\d{2} \d{2}:\d{2}$')
+
+register_reader(
+    'rasp_ff',
+    lambda header, row: RASP_FF_PACKED_COLUMN in header,
+    _packed_reader(RASP_FF_PACKED_COLUMN, RASP_FF_CHANNELS, 'Timestamp', _rasp_ff_time,
+                   derived={'P_RF': ['P_BB', 'P_PA']}),
+    RASP_FF_CHANNELS + ['P_RF', 'acc_BAT_Wh', 'acc_BB_Wh', 'acc_PA_Wh', 'acc_samples_total', 'useful_data'],
+)
+register_reader(
+    'nf1',
+    lambda header, row: 'm_sec_ms' in header and _packed_count(header, row, NF1_PACKED_COLUMN) == len(NF1_CHANNELS),
+    _packed_reader(NF1_PACKED_COLUMN, NF1_CHANNELS, 'm_sec_ms', _nf_time),
+    NF1_CHANNELS,
+)
+register_reader(
+    'nf_6pro_3ch',
+    lambda header, row: 'm_sec_ms' in header and
+    _packed_count(header, row, NF1_PACKED_COLUMN) == len(NF_6PRO_3CH_CHANNELS),
+    _packed_reader(NF1_PACKED_COLUMN, NF_6PRO_3CH_CHANNELS, 'm_sec_ms', _nf_time,
+                   derived={'P_RF': ['P_BB', 'P_PA']}),
+    NF_6PRO_3CH_CHANNELS + ['P_RF'],
+)
+register_reader(
+    'iphone_2ch',
+    lambda header, row: 'm_sec_ms' in header and
+    _packed_count(header, row, IPHONE_2CH_PACKED_COLUMN) == len(IPHONE_2CH_CHANNELS),
+    _packed_reader(IPHONE_2CH_PACKED_COLUMN, IPHONE_2CH_CHANNELS, 'm_sec_ms', _nf_time),
+    IPHONE_2CH_CHANNELS,
+)
+register_reader(
+    'call',
+    lambda header, row: len(row) >= 3 and bool(CALL_ROW.match(row[0].strip())),
+    _read_call,
+    ['P_BAT', 'P_RF'],
+)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Detects the format of PAC1954 logs")
+    parser.add_argument('files', nargs='+')
+    args = parser.parse_args()
+
+    for file_name in args.files:
+        try:
+            print(f"✅ {os.path.basename(file_name)}: {sniff(file_name)}")
+        except (ValueError, OSError) as e:
+            print(f"❌ Error with {os.path.basename(file_name)}: {e}")
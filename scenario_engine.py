@@ -0,0 +1,305 @@
+"""
+Offline version of the /calculate endpoint of website/server/server.js.
+
+The five scenario summary CSVs and batteries_ue.csv are loaded once into
+dictionaries keyed by the lowercase scenario_id / device value. An activity is
+resolved with the same fallback chain as the server (4g <-> lte synonyms, then
+the x / 12mini devices for streaming, 6pro for the other activities and calls),
+but each step is a dict lookup instead of a scan of every scenario, and each
+distinct (device, network, mobility, activity, quality) is resolved only once.
+
+    engine = ScenarioEngine()
+    engine.calculate({'device': '6pro', 'network': '4G', 'mobility': 'static',
+                      'activities': [{'name': 'netflix', 'duration': 30}]})
+
+evaluate_batch() scores many activity timelines at once with numpy, giving the
+same numbers as the server (the energies are summed in activity order).
+
+Usage:
+    python scenario_engine.py timelines.csv [--output results.csv]
+"""
+import os
+import re
+import math
+import argparse
+import numpy as np
+import pandas as pd
+
+DEFAULT_SERVER_DIR = os.path.join('.', 'website', 'server')
+
+# Same loading order as server.js: the first scenario_id found wins
+SUMMARY_FILES = [
+    'short_video_scenario_summary_df.csv',
+    'video_streaming_scenario_summary_df.csv',
+    'visio_scenario_summary_df.csv',
+    'others_scenario_summary_df.csv',
+    'call_scenario_summary_df.csv',
+]
+DEVICES_FILE = 'batteries_ue.csv'
+
+STREAMING_APPS = ['netflix', 'disney', 'amazon', 'apple', 'youtube']
+# Quality used when a streaming activity does not give one
+DEFAULT_QUALITY = {
+    'netflix': 'eco',
+    'youtube': '720p',
+    'amazon': 'good',
+    'apple': 'auto',
+    'disney': 'eco',
+}
+STREAMING_FALLBACK_DEVICES = ['x', '12mini']
+FALLBACK_DEVICE = '6pro'
+
+BASE_DEVICE = '6pro'
+BASE_SPECS = {'batteryWh': 19.26, 'screenSize': 6.4}
+DEFAULT_DEVICE = 'autre'
+
+CO2_MIN_G_PER_KWH = 21.7  # RTE 2024
+CO2_MAX_G_PER_KWH = 60    # ADEME
+
+_JS_FLOAT = re.compile(r'\s*([+-]?(?:Infinity|\d+\.?\d*(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?))')
+
+
+def js_parse_float(text):
+    """
+    JavaScript parseFloat: reads the longest numeric prefix, NaN if there is none.
+    """
+    match = _JS_FLOAT.match(str(text))
+    return float(match.group(1).replace('Infinity', 'inf')) if match else math.nan
+
+
+def _js_number(value):
+    # Coercion of `x * activity.duration` in the server
+    if value is None:
+        return 0.0
+    if isinstance(value, str):
+        value = value.strip()
+        if value == '':
+            return 0.0
+        try:
+            return float(value)
+        except ValueError:
+            return math.nan
+    return float(value)
+
+
+def _is_missing(value):
+    return value is None or value == '' or (isinstance(value, float) and math.isnan(value))
+
+
+def _network_variants(network):
+    # Allow "4g" <-> "lte" synonyms
+    if network == '4g':
+        return ['4g', 'lte']
+    if network == 'lte':
+        return ['lte', '4g']
+    return [network]
+
+
+class ScenarioEngine:
+    """
+    Scenario lookup and energy / battery / CO2 computation of the simulator.
+
+    Args:
+        server_dir: folder holding the summary CSVs and batteries_ue.csv
+    """
+
+    def __init__(self, server_dir=DEFAULT_SERVER_DIR):
+        self.scenarios = {}
+        for file_name in SUMMARY_FILES:
+            table = pd.read_csv(os.path.join(server_dir, file_name), dtype=str, keep_default_na=False)
+            for row in table.itertuples(index=False):
+                key = row.scenario_id.lower()
+                if key not in self.scenarios:
+                    self.scenarios[key] = (js_parse_float(row.E_BAT_Jm), js_parse_float(row.E_RF_Jm))
+
+        devices = pd.read_csv(os.path.join(server_dir, DEVICES_FILE), sep=';', dtype=str, keep_default_na=False)
+        self.device_specs = {}
+        for row in devices.to_dict('records'):
+            # Later rows overwrite earlier ones, like the server
+            self.device_specs[row['value'].strip().lower()] = {
+                'batteryWh': js_parse_float(row['batterie_Wh']),
+                'screenSize': js_parse_float(row['taille_ecran (inch)']),
+            }
+        self._resolved = {}
+
+    def _find(self, devices, networks, suffix):
+        key = ''
+        for device in devices:
+            for network in networks:
+                key = f"{device}_{network}_{suffix}"
+                if key in self.scenarios:
+                    return key, self.scenarios[key]
+        return key, None
+
+    def resolve(self, device, network, mobility, name, quality=None):
+        """
+        Returns the scenario used for one activity, with the fallback chain of the server.
+
+        Returns:
+            tuple: (scenario key, (E_BAT_Jm, E_RF_Jm) or None when nothing matches)
+        """
+        device = DEFAULT_DEVICE if _is_missing(device) else device
+        mobility = None if _is_missing(mobility) else mobility
+        quality = None if _is_missing(quality) else quality
+        cache_key = (device, network, mobility, name, quality)
+        if cache_key in self._resolved:
+            return self._resolved[cache_key]
+
+        dev_key = device.lower()
+        act_key = name.lower()
+        cond_key = 'dyna' if mobility == 'moving' else 'stat'
+        net_lower = network.lower()
+        networks = _network_variants(net_lower)
+
+        if act_key in STREAMING_APPS:
+            # Streaming -> requires quality
+            quality_key = quality.lower() if quality else DEFAULT_QUALITY.get(act_key, 'auto')
+            resolved = self._find([dev_key] + STREAMING_FALLBACK_DEVICES, networks,
+                                  f"{act_key}_{quality_key}_{cond_key}")
+        elif act_key == 'call':
+            voice_tech = quality or 'VoLTE'
+            if net_lower == '3g':
+                voice_tech = 'UMTS'
+            elif net_lower == 'wifi':
+                # VoWIFI is looked up in the 4G scenarios
+                voice_tech = 'VoWIFI'
+                networks = ['4g']
+            resolved = self._find([dev_key, FALLBACK_DEVICE], networks, voice_tech.lower())
+        else:
+            # Non-streaming -> no quality
+            resolved = self._find([dev_key, FALLBACK_DEVICE], networks, f"{act_key}_{cond_key}")
+
+        self._resolved[cache_key] = resolved
+        return resolved
+
+    def adjusted_capacity(self, device):
+        """
+        Battery capacity (Wh) of a device, scaled by its screen area relative to the 6pro.
+        """
+        base = self.device_specs.get(BASE_DEVICE, BASE_SPECS)
+        device = DEFAULT_DEVICE if _is_missing(device) else device
+        target = self.device_specs.get(device.lower(), base)
+        screen_ratio = (target['screenSize'] / base['screenSize']) ** 2
+        return target['batteryWh'] * screen_ratio
+
+    def calculate(self, request):
+        """
+        Same result as a POST /calculate with this JSON body.
+
+        Args:
+            request: dict with device, network, mobility and activities
+                (list of dicts with name, duration in minutes and optional quality)
+
+        Returns:
+            dict: total_energy (Wh), total_rf_energy (Wh), battery_percent, co2_min,
+            co2_max (g) and the activity details
+        """
+        device = request.get('device')
+        # Only read by the activities, like the server: no network and no
+        # activities gives zeros
+        network = request.get('network')
+        mobility = request.get('mobility')
+
+        total_energy = 0
+        total_rf_energy = 0
+        details = []
+        for activity in request.get('activities', []):
+            _, match = self.resolve(device, network, mobility, activity['name'], activity.get('quality'))
+            duration = _js_number(activity['duration']) if 'duration' in activity else math.nan
+            if match:
+                battery_consumption = match[0] / 3600 * duration
+                total_energy += battery_consumption
+                total_rf_energy += match[1] / 3600 * duration
+                details.append({**activity, 'consumption': battery_consumption, 'fallback': False})
+            else:
+                details.append({**activity, 'consumption': 0, 'fallback': True,
+                                'network': network, 'mobility': mobility})
+
+        adjusted_capacity = self.adjusted_capacity(device)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            battery_percent = float(np.minimum(100, np.float64(total_energy) / adjusted_capacity * 100))
+
+        # Convert Wh -> kWh
+        energy_kwh = total_energy / 1000
+        return {
+            'total_energy': total_energy,
+            'total_rf_energy': total_rf_energy,
+            'battery_percent': battery_percent,
+            'co2_min': energy_kwh * CO2_MIN_G_PER_KWH,
+            'co2_max': energy_kwh * CO2_MAX_G_PER_KWH,
+            'activities': details,
+        }
+
+    def evaluate_batch(self, activities):
+        """
+        Scores many activity timelines at once.
+
+        Args:
+            activities: DataFrame with one row per activity, in timeline order:
+                timeline (id), device, network, mobility, name, duration (minutes)
+                and optionally quality. Device, network and mobility are repeated
+                on each row, the battery capacity uses the device of the first row.
+
+        Returns:
+            pd.DataFrame: indexed by timeline, total_energy, total_rf_energy,
+            battery_percent, co2_min, co2_max and the number of fallback activities
+        """
+        codes, timelines = pd.factorize(activities['timeline'], sort=False)
+        n = len(timelines)
+
+        # Each distinct activity is resolved once, then broadcast to its rows
+        combo = np.zeros(len(activities), dtype=np.int64)
+        for column in ['device', 'network', 'mobility', 'name', 'quality']:
+            values = activities[column] if column in activities else pd.Series(None, index=activities.index)
+            column_codes, column_uniques = pd.factorize(values, use_na_sentinel=False)
+            combo = pd.factorize(combo * len(column_uniques) + column_codes)[0]
+        _, representative, combo = np.unique(combo, return_index=True, return_inverse=True)
+        rates = np.full((len(representative), 2), np.nan)
+        matched = np.zeros(len(representative), dtype=bool)
+        keys = activities.reindex(columns=['device', 'network', 'mobility', 'name', 'quality']).iloc[representative]
+        for i, row in enumerate(keys.astype(object).itertuples(index=False)):
+            _, match = self.resolve(*row)
+            if match:
+                rates[i] = match
+                matched[i] = True
+
+        duration = pd.to_numeric(activities['duration'], errors='coerce').to_numpy(dtype=float)
+        row_matched = matched[combo]
+        energy = np.where(row_matched, rates[combo, 0] / 3600 * duration, 0.0)
+        rf_energy = np.where(row_matched, rates[combo, 1] / 3600 * duration, 0.0)
+        # bincount adds the rows in order, like the running sum of the server
+        total_energy = np.bincount(codes, weights=energy, minlength=n)
+        total_rf_energy = np.bincount(codes, weights=rf_energy, minlength=n)
+        fallbacks = np.bincount(codes, weights=~row_matched, minlength=n).astype(int)
+
+        _, first = np.unique(codes, return_index=True)
+        devices = pd.Series(activities['device'].to_numpy()[first]).astype(object)
+        capacity = devices.map({device: self.adjusted_capacity(device) for device in devices.unique()})
+        with np.errstate(divide='ignore', invalid='ignore'):
+            battery_percent = np.minimum(100, total_energy / capacity.to_numpy(dtype=float) * 100)
+
+        energy_kwh = total_energy / 1000
+        return pd.DataFrame({
+            'total_energy': total_energy,
+            'total_rf_energy': total_rf_energy,
+            'battery_percent': battery_percent,
+            'co2_min': energy_kwh * CO2_MIN_G_PER_KWH,
+            'co2_max': energy_kwh * CO2_MAX_G_PER_KWH,
+            'fallbacks': fallbacks,
+        }, index=pd.Index(timelines, name='timeline'))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scores activity timelines like the /calculate endpoint")
+    parser.add_argument('timelines', help="CSV with timeline, device, network, mobility, name, duration[, quality]")
+    parser.add_argument('--server-dir', default=DEFAULT_SERVER_DIR)
+    parser.add_argument('--output', default=None, help="CSV file for the results (printed otherwise)")
+    args = parser.parse_args()
+
+    engine = ScenarioEngine(args.server_dir)
+    results = engine.evaluate_batch(pd.read_csv(args.timelines))
+    if args.output:
+        results.to_csv(args.output)
+        print(f"✅ {len(results)} timelines scored -> {args.output}")
+    else:
+        print(results.to_string())
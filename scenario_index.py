@@ -0,0 +1,129 @@
+"""
+Precompiled scenario index of the website (website/server/scenario_index.json).
+
+The five scenario summary CSVs and batteries_ue.csv are compiled into one JSON
+file read by server.js in a single call before it starts listening:
+
+    scenarios   lowercase scenario_id -> [E_BAT_Jm, E_RF_Jm] (first file wins, like the server)
+    devices     lowercase device value -> {batteryWh, screenSize}
+    fallbacks   "<network variants>_<suffix>" -> scenario_id found by the fallback
+                chain (x / 12mini devices for streaming, 6pro otherwise), e.g.
+                "4g/lte_netflix_eco_stat" -> "x_lte_netflix_eco_stat"
+    rules       streaming apps, default qualities, base device and specs
+    sources     sha256 of each source file (stale index warning)
+
+The values are checked while compiling (numeric energies, device specs), so
+a broken summary fails the build instead of the server.
+
+Usage:
+    python scenario_index.py [--server-dir website/server]
+"""
+import os
+import json
+import hashlib
+import math
+import argparse
+from datetime import datetime
+from scenario_engine import (ScenarioEngine, SUMMARY_FILES, DEVICES_FILE, DEFAULT_SERVER_DIR, STREAMING_APPS,
+                             DEFAULT_QUALITY, STREAMING_FALLBACK_DEVICES, FALLBACK_DEVICE, BASE_DEVICE,
+                             BASE_SPECS)
+
+INDEX_FILE = 'scenario_index.json'
+INDEX_VERSION = 1
+NETWORK_SYNONYMS = ['4g', 'lte']
+
+
+def _network_lists(network):
+    # Network variant lists the server may look a scenario up with
+    if network in NETWORK_SYNONYMS:
+        return [[network], NETWORK_SYNONYMS, NETWORK_SYNONYMS[::-1]]
+    return [[network]]
+
+
+def _fallbacks(engine):
+    """
+    Resolves the fallback chain of every (network variants, suffix) a fallback
+    device has a scenario for.
+    """
+    fallbacks = {}
+    for key in engine.scenarios:
+        parts = key.split('_', 2)
+        if len(parts) < 3:
+            continue
+        device, network, suffix = parts
+        devices = STREAMING_FALLBACK_DEVICES if suffix.split('_')[0] in STREAMING_APPS else [FALLBACK_DEVICE]
+        if device not in devices:
+            continue
+        for networks in _network_lists(network):
+            name = f"{'/'.join(networks)}_{suffix}"
+            if name not in fallbacks:
+                resolved, match = engine._find(devices, networks, suffix)
+                if match:
+                    fallbacks[name] = resolved
+    return dict(sorted(fallbacks.items()))
+
+
+def _validate(engine):
+    errors = []
+    for key, values in engine.scenarios.items():
+        if not all(math.isfinite(v) for v in values):
+            errors.append(f"scenario {key}: E_BAT_Jm / E_RF_Jm not numeric {values}")
+    for key, specs in engine.device_specs.items():
+        if not all(math.isfinite(v) and v > 0 for v in specs.values()):
+            errors.append(f"device {key}: invalid specs {specs}")
+    if errors:
+        raise ValueError("Invalid scenario data:\n" + "\n".join(errors))
+
+
+def _sources(server_dir):
+    sources = {}
+    for file_name in SUMMARY_FILES + [DEVICES_FILE]:
+        with open(os.path.join(server_dir, file_name), 'rb') as f:
+            sources[file_name] = hashlib.sha256(f.read()).hexdigest()
+    return sources
+
+
+def compile_index(server_dir=DEFAULT_SERVER_DIR, output=None):
+    """
+    Compiles and validates the scenario index, written atomically.
+
+    Returns:
+        dict: the index
+    """
+    engine = ScenarioEngine(server_dir)
+    _validate(engine)
+    index = {
+        'version': INDEX_VERSION,
+        'built': datetime.now().isoformat(timespec='seconds'),
+        'sources': _sources(server_dir),
+        'rules': {
+            'streaming_apps': STREAMING_APPS,
+            'default_quality': DEFAULT_QUALITY,
+            'base_device': BASE_DEVICE,
+            'base_specs': engine.device_specs.get(BASE_DEVICE, BASE_SPECS),
+        },
+        'scenarios': {key: list(values) for key, values in engine.scenarios.items()},
+        'devices': engine.device_specs,
+        'fallbacks': _fallbacks(engine),
+    }
+    output = output or os.path.join(server_dir, INDEX_FILE)
+    tmp = f"{output}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp, output)
+    return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compiles the scenario index read by the website server")
+    parser.add_argument('--server-dir', default=DEFAULT_SERVER_DIR)
+    parser.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    try:
+        index = compile_index(args.server_dir, args.output)
+    except (ValueError, OSError) as e:
+        print(f"❌ Error with the scenario index: {e}")
+        raise SystemExit(1)
+    print(f"✅ {len(index['scenarios'])} scenarios, {len(index['devices'])} devices, "
+          f"{len(index['fallbacks'])} fallbacks -> {args.output or os.path.join(args.server_dir, INDEX_FILE)}")
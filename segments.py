@@ -0,0 +1,192 @@
+"""
+Segment index of measurement logs: per-phase energy and time-range queries.
+
+A log is cut into segments wherever a label column changes (useful_data for
+the video sessions of a rasp_ff log, useful_state for a call...). Segment
+boundaries are kept as sorted row offsets, so the energy, duration and mean
+power of every segment come out of one np.add.reduceat pass, and time ranges
+are found by binary search on the sorted timestamps instead of boolean masks
+over the whole frame.
+
+    index = SegmentIndex.from_frame(df, 'Timestamp', 'useful_data')
+    index.segments()                       # one row per segment (video_session order)
+    index.energy('2025-05-20 14:01', '2025-05-20 14:02')
+    df.iloc[index.rows(start, end)]        # rows of a time window, no full scan
+
+    table = segment_table(file_list)       # segments of many rasp_ff files
+    segments_overlapping(table, start, end)
+"""
+import os
+import numpy as np
+import pandas as pd
+
+RASP_FF_POWER_COLUMNS = ['P_BAT', 'P_RF', 'P_PA', 'P_BB']
+
+
+def _as_times(times):
+    """
+    Returns times as int64 ns (datetimes) or float seconds, the divisor giving
+    seconds and the datetime dtype to restore (or None).
+    """
+    values = np.asarray(times)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype('datetime64[ns]').view(np.int64), 1e9, np.dtype('datetime64[ns]')
+    return values.astype(float), 1.0, None
+
+
+class SegmentIndex:
+    """
+    Segments of one log and its per-row trapezoid energy steps.
+
+    Args:
+        times: sorted sample times (datetimes, or seconds)
+        power: dict of channel name -> power array (W)
+        labels: segment label of each row (a new segment starts at each change),
+            None for a single segment
+    """
+
+    def __init__(self, times, power, labels=None):
+        self.times, self._per_second, self._time_dtype = _as_times(times)
+        n = len(self.times)
+        if np.any(np.diff(self.times) < 0):
+            raise ValueError("times must be sorted")
+        self.channels = list(power)
+
+        # Energy of the interval ending at each row, same rule as
+        # utils.cumulative_trapezoid_energy (intervals with dt <= 0 add nothing)
+        values = np.column_stack([np.asarray(power[c], dtype=float) for c in self.channels]) \
+            if self.channels else np.zeros((n, 0))
+        dt = np.diff(self.times, prepend=self.times[:1]) / self._per_second
+        previous = np.concatenate([values[:1], values[:-1]])
+        self.steps = np.where((dt > 0)[:, None], dt[:, None] * (previous + values) / 2.0, 0.0)
+        self._values = values
+        self._cumulative = None
+
+        if labels is None:
+            self.starts = np.zeros(min(n, 1), dtype=np.int64)
+            self.labels = np.zeros(len(self.starts))
+        else:
+            labels = np.asarray(labels)
+            changes = np.flatnonzero(labels[1:] != labels[:-1]) + 1
+            self.starts = np.concatenate([[0], changes]).astype(np.int64) if n else np.zeros(0, dtype=np.int64)
+            self.labels = labels[self.starts]
+        self.ends = np.append(self.starts[1:], n).astype(np.int64)    # exclusive
+
+    @classmethod
+    def from_frame(cls, df, time_column, label_column=None, power_columns=None):
+        """
+        Builds the index of a DataFrame (or CompactRaspFF). The power columns
+        default to the rasp_ff ones.
+        """
+        power_columns = power_columns or RASP_FF_POWER_COLUMNS
+        labels = df[label_column].to_numpy() if label_column else None
+        return cls(df[time_column].to_numpy(), {c: df[c].to_numpy() for c in power_columns}, labels)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _restore(self, times):
+        return times.astype(np.int64).view(self._time_dtype) if self._time_dtype is not None else times
+
+    def _to_time(self, bound):
+        if self._time_dtype is not None:
+            return pd.Timestamp(bound).as_unit('ns').value
+        return float(bound)
+
+    def segments(self):
+        """
+        Returns one row per segment: label, rows, start/end time, duration,
+        energy of each channel (J, intervals inside the segment) and the
+        time-weighted mean power (energy / duration, NaN for single-sample segments).
+        """
+        if len(self) == 0:
+            return pd.DataFrame()
+        inner = self.steps.copy()
+        inner[self.starts] = 0.0      # The interval before a segment belongs to no segment
+        energy = np.add.reduceat(inner, self.starts, axis=0)
+        last = self.ends - 1
+        duration = (self.times[last] - self.times[self.starts]) / self._per_second
+        table = pd.DataFrame({
+            'segment': np.arange(1, len(self) + 1),
+            'label': self.labels,
+            'start_row': self.starts,
+            'end_row': self.ends,
+            'rows': self.ends - self.starts,
+            'start': self._restore(self.times[self.starts]),
+            'end': self._restore(self.times[last]),
+            'duration_s': duration,
+        })
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for i, channel in enumerate(self.channels):
+                table[f'E_{channel[2:] if channel.startswith("P_") else channel}_J'] = energy[:, i]
+            for i, channel in enumerate(self.channels):
+                table[f'{channel}_mean_W'] = np.where(duration > 0, energy[:, i] / duration, np.nan)
+        return table
+
+    def rows(self, start=None, end=None):
+        """
+        Returns the slice of rows with start <= time <= end (binary search).
+        """
+        lo = 0 if start is None else int(np.searchsorted(self.times, self._to_time(start), 'left'))
+        hi = len(self.times) if end is None else int(np.searchsorted(self.times, self._to_time(end), 'right'))
+        return slice(lo, max(lo, hi))
+
+    def energy(self, start=None, end=None):
+        """
+        Returns the energy of each channel (J) between start and end, over the
+        intervals between samples of the window.
+        """
+        if self._cumulative is None:
+            self._cumulative = np.cumsum(self.steps, axis=0)
+        window = self.rows(start, end)
+        if window.stop - window.start < 2:
+            return dict.fromkeys(self.channels, 0.0)
+        totals = self._cumulative[window.stop - 1] - self._cumulative[window.start]
+        return dict(zip(self.channels, totals.tolist()))
+
+    def segments_between(self, start=None, end=None):
+        """
+        Returns the positions of the segments overlapping [start, end].
+        """
+        first = self.times[self.starts]
+        last = self.times[self.ends - 1]
+        lo = 0 if start is None else int(np.searchsorted(last, self._to_time(start), 'left'))
+        hi = len(self) if end is None else int(np.searchsorted(first, self._to_time(end), 'right'))
+        return np.arange(lo, max(lo, hi))
+
+
+def segment_table(file_list, label_column='useful_data'):
+    """
+    Segments of many rasp_ff files (read in compact mode), sorted by start time.
+    """
+    from utils import open_file_nf_6pro_3ch_rasp_ff
+
+    tables = []
+    for file_name in file_list:
+        try:
+            session = open_file_nf_6pro_3ch_rasp_ff(file_name, compact=True)[0]
+            table = SegmentIndex.from_frame(session, 'Timestamp', label_column).segments()
+        except Exception as e:
+            print(f"❌ Error with {os.path.basename(file_name)}: {e}")
+            continue
+        table.insert(0, 'File name', os.path.basename(file_name))
+        tables.append(table)
+    if not tables:
+        return pd.DataFrame()
+    return pd.concat(tables, ignore_index=True).sort_values('start', kind='stable', ignore_index=True)
+
+
+def segments_overlapping(table, start, end):
+    """
+    Rows of a segment_table (sorted by start) overlapping [start, end], found by
+    binary search on the start times and on the running maximum of the end times.
+    """
+    if len(table) == 0:
+        # np.maximum.accumulate has no identity for an empty array
+        return table.iloc[:0]
+    starts = table['start'].to_numpy()
+    reach = np.maximum.accumulate(table['end'].to_numpy())
+    lo = np.searchsorted(reach, np.datetime64(pd.Timestamp(start)), 'left')
+    hi = np.searchsorted(starts, np.datetime64(pd.Timestamp(end)), 'right')
+    candidates = table.iloc[lo:max(lo, hi)]
+    return candidates[candidates['end'] >= pd.Timestamp(start)]
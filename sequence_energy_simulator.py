@@ -1,52 +1,69 @@
+import io
 import os
 import pandas as pd
-from datetime import datetime
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from decimation import build_pyramids, show
 
 
 DATA_PATH = "./data/Experiment_Data/call_test/iPX_CALL_Callee_RX_4G_pac1954.csv"
 
-def parse_simple_power_csv(filepath, year=2024):
-    timestamps = []
-    p_bat, p_rf = [], []
+def _read_fields(raw):
+    """
+    Returns the date, time, P_BAT and P_RF fields of the raw lines as strings.
+    """
+    # Quotes dropped: the packed values become normal fields, only the first two are kept
+    text = raw.replace(b'"', b'')
+    try:
+        return pd.read_csv(io.BytesIO(text), header=None, usecols=range(4), names=range(4),
+                           dtype=str, engine='c')
+    except (pd.errors.ParserError, ValueError):
+        pass
+
+    # Fallback for files the C parser cannot read (e.g. first row too short)
+    lines = pd.Series(text.decode('utf-8', errors='replace').splitlines())
+    lines = lines[lines.str.strip() != '']
+    return lines.str.split(',', n=4, expand=True).reindex(columns=range(4)).reset_index(drop=True)
 
-    with open(filepath, 'r') as file:
-        next(file)  # skip header
-        for line in file:
-            try:
-                parts = line.strip().split(',', 2)
-                if len(parts) < 3:
-                    continue
 
-                date_part = parts[0].strip()
-                time_part = parts[1].strip()
-                values = [float(v) for v in parts[2].strip().strip('"').split(',') if v.strip() != '']
+def parse_simple_power_csv(filepath, year=2024):
+    """
+    Reads a call capture: date, time, then the packed "P_BAT,P_RF,..." values.
 
-                # Extract values
-                pb, prf = values[0], values[1]
+    The whole file is parsed in bulk and the sanity rule (P_RF must not exceed
+    P_BAT) is applied as a mask. Dropped rows are counted instead of printed.
 
-                # Sanity check: P_RF must not exceed P_BAT
-                if prf > pb:
-                    print(f"[⚠️ Skipped] RF > BAT at {date_part} {time_part} → P_RF={prf:.3f} W > P_BAT={pb:.3f} W")
-                    continue
+    Returns:
+        pd.DataFrame: timestamp, P_BAT and P_RF. df.attrs['skipped'] counts the
+        rows dropped because P_RF > P_BAT, df.attrs['malformed'] the unreadable ones
+    """
+    with open(filepath, 'rb') as file:
+        next(file)  # skip header
+        fields = _read_fields(file.read())
 
-                # Reconstruct timestamp
-                full_timestamp = f"{date_part}:{time_part}"
-                timestamp = datetime.strptime(full_timestamp, "%d-%m %H:%M:%S.%f").replace(year=year)
+    p_bat = pd.to_numeric(fields[2].str.strip(), errors='coerce')
+    p_rf = pd.to_numeric(fields[3].str.strip(), errors='coerce')
+    valid_values = p_bat.notna() & p_rf.notna()
 
-                timestamps.append(timestamp)
-                p_bat.append(pb)
-                p_rf.append(prf)
+    # Sanity check: P_RF must not exceed P_BAT
+    skipped = valid_values & (p_rf > p_bat)
 
-            except Exception as e:
-                print(f"Skipping line: {e}")
+    # Reconstruct timestamp ("dd-mm HH:MM" + "SS.ffffff"): the minute part has few
+    # distinct values, so it goes through the to_datetime cache, the seconds are added as numbers
+    minutes = pd.to_datetime(f"{year}-" + fields[0].str.strip(), format="%Y-%d-%m %H:%M", errors='coerce')
+    seconds_text = fields[1].str.strip()
+    seconds = pd.to_numeric(seconds_text, errors='coerce')
+    seconds = seconds.where(seconds_text.str.contains('.', regex=False) & seconds.between(0, 61))
+    timestamps = minutes + pd.to_timedelta((seconds * 1e6).round(), unit='us')
+    keep = valid_values & ~skipped & timestamps.notna()
 
     df = pd.DataFrame({
-        'timestamp': timestamps,
-        'P_BAT': p_bat,
-        'P_RF': p_rf
+        'timestamp': timestamps[keep].to_numpy(),
+        'P_BAT': p_bat[keep].to_numpy(),
+        'P_RF': p_rf[keep].to_numpy()
     })
+    df.attrs['skipped'] = int(skipped.sum())
+    df.attrs['malformed'] = int(len(fields) - keep.sum() - skipped.sum())
     return df
 
 
@@ -73,6 +90,12 @@ def plot_power(df, title="Call Test – Power Consumption Over Time"):
         "P_RF max": f"{df['P_RF'].max():.3f} W"
     }
 
+    # Min/max decimation: about two points per pixel of the 825 px wide plot,
+    # finer levels are fetched when zooming (Jupyter)
+    pyramids = build_pyramids(df, 'timestamp', ['P_BAT', 'P_RF'])
+    bat_x, bat_y = pyramids['P_BAT'].query(width=825)
+    rf_x, rf_y = pyramids['P_RF'].query(width=825)
+
     # Create subplot: 1 row, 2 columns
     fig = make_subplots(
         rows=1, cols=2,
@@ -83,16 +106,16 @@ def plot_power(df, title="Call Test – Power Consumption Over Time"):
 
     # Add power traces
     fig.add_trace(go.Scatter(
-        x=df['timestamp'],
-        y=df['P_BAT'],
+        x=bat_x,
+        y=bat_y,
         mode='lines',
         name='Battery Power (P_BAT)',
         line=dict(color='red')
     ), row=1, col=1)
 
     fig.add_trace(go.Scatter(
-        x=df['timestamp'],
-        y=df['P_RF'],
+        x=rf_x,
+        y=rf_y,
         mode='lines',
         name='RF Power (P_RF)',
         line=dict(color='blue')
@@ -117,7 +140,8 @@ def plot_power(df, title="Call Test – Power Consumption Over Time"):
         showlegend=True
     )
 
-    fig.show()
+    # The stats table is not decimated
+    return show(fig, [pyramids['P_BAT'], pyramids['P_RF'], None], width=825)
 
 
 if __name__ == "__main__":
@@ -125,5 +149,7 @@ if __name__ == "__main__":
         print(f"❌ File not found: {DATA_PATH}")
     else:
         df = parse_simple_power_csv(DATA_PATH)
+        if df.attrs['skipped'] or df.attrs['malformed']:
+            print(f"[⚠️ Skipped] {df.attrs['skipped']} rows with RF > BAT, {df.attrs['malformed']} malformed rows")
         display_statistics(df)
         plot_power(df)
@@ -0,0 +1,192 @@
+"""
+Mergeable distribution statistics for large sample archives.
+
+A StreamStats holds, for any number of samples, a fixed amount of state:
+count, mean and sum of squared deviations (merged with Chan's formula),
+min/max, and a logarithmic histogram (DDSketch-style buckets) giving every
+quantile within a relative error of `relative_accuracy`. Partial aggregates
+are built per file and merged, so statistics over a whole archive never need
+the samples in memory at the same time.
+
+    stats = StreamStats()
+    for file_name in files:
+        stats.add(load_frame(file_name, 'rasp_ff', columns=['P_PA'])['P_PA'].to_numpy())
+    stats.summary()          # count, mean, std, min, q1, median, q3, max, fences
+    box_trace(stats, 'RF')   # go.Box drawn from the precomputed quartiles
+"""
+import math
+import numpy as np
+
+DEFAULT_RELATIVE_ACCURACY = 0.001
+
+
+class StreamStats:
+    """
+    Count, moments, min/max and quantile sketch of a stream of values.
+
+    Args:
+        relative_accuracy: maximum relative error of the quantiles
+    """
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.zeros = 0
+        self.positive = {}   # bucket index -> count, value in (gamma**(i-1), gamma**i]
+        self.negative = {}   # same on -value
+
+    def _bucket_counts(self, values):
+        buckets = np.ceil(np.log(values) / self._log_gamma).astype(np.int64)
+        keys, counts = np.unique(buckets, return_counts=True)
+        return zip(keys.tolist(), counts.tolist())
+
+    def add(self, values):
+        """
+        Adds an array of values (NaN are ignored).
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        part = StreamStats(self.relative_accuracy)
+        part.count = len(values)
+        part.mean = float(values.mean())
+        part.m2 = float(((values - part.mean) ** 2).sum())
+        part.min = float(values.min())
+        part.max = float(values.max())
+        part.zeros = int((values == 0).sum())
+        part.positive = dict(part._bucket_counts(values[values > 0]))
+        part.negative = dict(part._bucket_counts(-values[values < 0]))
+        return self.merge(part)
+
+    def merge(self, other):
+        """
+        Adds the values summarized by another StreamStats (same accuracy).
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracies")
+        if other.count == 0:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.zeros += other.zeros
+        for mine, theirs in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, n in theirs.items():
+                mine[key] = mine.get(key, 0) + n
+        return self
+
+    def std(self, ddof=1):
+        return math.sqrt(self.m2 / (self.count - ddof)) if self.count > ddof else math.nan
+
+    def _sorted_buckets(self):
+        # (value, count) from the smallest to the largest value
+        gamma = self.gamma
+        buckets = [(-2 * gamma ** key / (gamma + 1), n) for key, n in sorted(self.negative.items(), reverse=True)]
+        if self.zeros:
+            buckets.append((0.0, self.zeros))
+        buckets += [(2 * gamma ** key / (gamma + 1), n) for key, n in sorted(self.positive.items())]
+        return buckets
+
+    def quantiles(self, qs):
+        """
+        Returns the values at the quantiles `qs` (same ranks as pandas' linear
+        method, within the relative accuracy).
+        """
+        if self.count == 0:
+            return [math.nan for _ in qs]
+        buckets = self._sorted_buckets()
+        values = np.array([value for value, _ in buckets])
+        upper_ranks = np.cumsum([n for _, n in buckets]) - 1
+        results = []
+        for q in qs:
+            rank = q * (self.count - 1)
+            lower = values[np.searchsorted(upper_ranks, math.floor(rank))]
+            upper = values[np.searchsorted(upper_ranks, math.ceil(rank))]
+            value = lower + (upper - lower) * (rank - math.floor(rank))
+            results.append(min(max(float(value), self.min), self.max))
+        return results
+
+    def quantile(self, q):
+        return self.quantiles([q])[0]
+
+    def _first_at_least(self, threshold):
+        if threshold <= self.min:
+            return self.min
+        for value, _ in self._sorted_buckets():
+            if value >= threshold:
+                return max(value, self.min)
+        return self.max
+
+    def _last_at_most(self, threshold):
+        if threshold >= self.max:
+            return self.max
+        for value, _ in reversed(self._sorted_buckets()):
+            if value <= threshold:
+                return min(value, self.max)
+        return self.min
+
+    def summary(self):
+        """
+        Returns count, mean, std, min, q1, median, q3, max and the box-plot
+        fences (furthest values within 1.5 IQR of the quartiles).
+        """
+        q1, median, q3 = self.quantiles([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        return {
+            'count': self.count,
+            'mean': self.mean if self.count else math.nan,
+            'std': self.std(),
+            'min': self.min if self.count else math.nan,
+            'q1': q1,
+            'median': median,
+            'q3': q3,
+            'max': self.max if self.count else math.nan,
+            'lowerfence': self._first_at_least(q1 - 1.5 * iqr) if self.count else math.nan,
+            'upperfence': self._last_at_most(q3 + 1.5 * iqr) if self.count else math.nan,
+        }
+
+    def to_dict(self):
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'count': self.count, 'mean': self.mean, 'm2': self.m2,
+            'min': self.min, 'max': self.max, 'zeros': self.zeros,
+            'positive': {str(k): n for k, n in self.positive.items()},
+            'negative': {str(k): n for k, n in self.negative.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls(data['relative_accuracy'])
+        for key in ['count', 'mean', 'm2', 'min', 'max', 'zeros']:
+            setattr(stats, key, data[key])
+        stats.positive = {int(k): n for k, n in data['positive'].items()}
+        stats.negative = {int(k): n for k, n in data['negative'].items()}
+        return stats
+
+
+def box_trace(stats, name, **kwargs):
+    """
+    Returns a go.Box drawn from the precomputed quartiles of a StreamStats
+    (no per-sample points).
+    """
+    import plotly.graph_objects as go
+
+    s = stats.summary()
+    return go.Box(
+        x=[name], name=name,
+        q1=[s['q1']], median=[s['median']], q3=[s['q3']],
+        lowerfence=[s['lowerfence']], upperfence=[s['upperfence']],
+        mean=[s['mean']], sd=[s['std']],
+        **kwargs
+    )
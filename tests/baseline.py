@@ -0,0 +1,64 @@
+"""
+Reference versions of the readers as they were before the optimizations, used
+to check that the fast paths give the same numbers.
+
+They follow the original row-by-row code, with np.trapz (removed in numpy 2)
+replaced by np.trapezoid, its new name.
+"""
+import numpy as np
+import pandas as pd
+
+trapezoid = getattr(np, 'trapezoid', None) or np.trapz
+
+
+def split_packed(df, packed_column, names):
+    """
+    Original parsing of a packed column: str.split, then pd.to_numeric.
+    """
+    values = df[packed_column].str.split(',', expand=True)
+    values.columns = list(names)
+    values = values.apply(pd.to_numeric, errors='coerce')
+    return pd.concat([df.drop(columns=packed_column), values], axis=1)
+
+
+def row_energy(power, dt):
+    """
+    Original cumulative energy loop of one channel: rows with dt <= 0 (or NaN)
+    carry the previous value over.
+    """
+    energy = np.zeros(len(power))
+    for i in range(1, len(power)):
+        if dt[i] > 0:
+            energy[i] = energy[i - 1] + trapezoid([power[i - 1], power[i]], x=[0, dt[i]])
+        else:
+            energy[i] = energy[i - 1]
+    return energy
+
+
+def open_file_rasp_ff(file_name):
+    """
+    Original open_file_nf_6pro_3ch_rasp_ff, up to its returned totals.
+
+    Returns:
+        pd.DataFrame, float, float, float, dict: same as the current reader
+    """
+    df = split_packed(pd.read_csv(file_name), 'V_BAT,I_BAT,P_BAT,V_BB,I_BB,P_BB,V_PA,I_PA,P_PA',
+                      ['V_BAT', 'I_BAT', 'P_BAT', 'V_BB', 'I_BB', 'P_BB', 'V_PA', 'I_PA', 'P_PA'])
+    df['Timestamp'] = pd.to_datetime(df['Timestamp'])
+    df['dt'] = df['Timestamp'].diff().dt.total_seconds().fillna(0)
+    df['P_RF'] = df['P_BB'] + df['P_PA']
+    dt = df['dt'].to_numpy()
+    for channel in ['BAT', 'RF', 'PA', 'BB']:
+        df[f'E_{channel}_orig'] = row_energy(df[f'P_{channel}'].to_numpy(), dt)
+
+    df['sample_diff'] = df['acc_samples_total'].diff().fillna(0)
+    df['SPS'] = np.where(df['dt'] > 0, df['sample_diff'] / df['dt'], 0)
+    valid_sps = df['SPS'][(df['SPS'] > 0) & (df['dt'] > 0)]
+    sps_mean = valid_sps.mean() if len(valid_sps) > 0 else 0
+    df['time_second'] = df['Timestamp'].dt.floor('s')
+    sps_by_second = df.groupby('time_second')['sample_diff'].sum()
+    sps_count_mean = sps_by_second.mean() if len(sps_by_second) > 0 else 0
+
+    log_duration = (df['Timestamp'].max() - df['Timestamp'].min()).total_seconds()
+    energy_orig = {f'total_E_{channel}': df[f'E_{channel}_orig'].iloc[-1] for channel in ['BAT', 'RF', 'PA', 'BB']}
+    return df, sps_mean, sps_count_mean, log_duration, energy_orig
@@ -0,0 +1,41 @@
+import os
+import sys
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from synthetic import generate
+
+
+# ===== SYNTHETIC LOGS =====
+# Small captures (a few thousand lines), written once per test session
+
+@pytest.fixture(scope='session')
+def synthetic_dir(tmp_path_factory):
+    return str(tmp_path_factory.mktemp('synthetic'))
+
+
+@pytest.fixture(scope='session')
+def rasp_ff_file(synthetic_dir):
+    # 600 s at 64 SPS: 2400 lines, two video sessions
+    return generate('rasp_ff', 64, 600, synthetic_dir)
+
+
+@pytest.fixture(scope='session')
+def short_rasp_ff_file(synthetic_dir):
+    # 120 s at 64 SPS: acc_samples_total fits in int16 once downcast
+    return generate('rasp_ff', 64, 120, synthetic_dir)
+
+
+@pytest.fixture(scope='session')
+def nf1_file(synthetic_dir):
+    # 180 s from 58:00, so the "%M:%S.%f" clock wraps once
+    return generate('nf1', 64, 180, synthetic_dir)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv('SIR_CACHE_DIR', str(tmp_path / 'cache'))
+    return str(tmp_path / 'cache')
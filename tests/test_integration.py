@@ -0,0 +1,75 @@
+import os
+import re
+import json
+import numpy as np
+import pytest
+
+import baseline
+from utils import cumulative_trapezoid_energy
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def test_cumulative_energy_matches_row_loop():
+    rng = np.random.default_rng(1)
+    power = rng.uniform(0, 3, 500)
+    dt = rng.uniform(0, 0.02, 500)
+    dt[[10, 11, 200]] = 0       # Repeated timestamps
+    dt[50] = -0.01              # Clock going back
+    dt[300] = np.nan
+    np.testing.assert_allclose(cumulative_trapezoid_energy(power, dt), baseline.row_energy(power, dt),
+                               rtol=1e-12, atol=0)
+
+
+def test_cumulative_energy_channels():
+    rng = np.random.default_rng(2)
+    power = rng.uniform(0, 3, (400, 4))
+    dt = rng.uniform(0, 0.02, 400)
+    energy = cumulative_trapezoid_energy(power, dt)
+    for channel in range(4):
+        np.testing.assert_allclose(energy[:, channel], baseline.row_energy(power[:, channel], dt), rtol=1e-12)
+
+
+@pytest.mark.parametrize('block', [1, 7, 128])
+def test_cumulative_energy_by_block(block):
+    rng = np.random.default_rng(3)
+    power = rng.uniform(0, 3, (300, 2))
+    dt = rng.uniform(-0.001, 0.02, 300)
+    whole = cumulative_trapezoid_energy(power, dt)
+    parts, initial = [], None
+    for start in range(0, len(power), block):
+        part = cumulative_trapezoid_energy(power[start:start + block], dt[start:start + block], initial)
+        initial = (power[start + len(part) - 1], part[-1])
+        parts.append(part)
+    np.testing.assert_allclose(np.concatenate(parts), whole, rtol=1e-12)
+
+
+def test_cumulative_energy_empty():
+    assert cumulative_trapezoid_energy(np.zeros(0), np.zeros(0)).shape == (0,)
+
+
+def _code_lines():
+    # Code of the modules and of the notebook code cells, without comments
+    for folder, _, files in os.walk(ROOT):
+        parts = os.path.relpath(folder, ROOT).split(os.sep)
+        if any(part.startswith('.') or part in ('node_modules', '__pycache__', 'tests') for part in parts if part != '.'):
+            continue
+        for name in files:
+            path = os.path.join(folder, name)
+            if name.endswith('.py'):
+                with open(path, encoding='utf-8') as f:
+                    lines = f.read().splitlines()
+            elif name.endswith('.ipynb'):
+                with open(path, encoding='utf-8') as f:
+                    cells = json.load(f)['cells']
+                lines = [line for cell in cells if cell['cell_type'] == 'code' for line in cell['source']]
+            else:
+                continue
+            for line in lines:
+                yield os.path.relpath(path, ROOT), line.split('#', 1)[0]
+
+
+def test_no_np_trapz():
+    # np.trapz was removed in numpy 2: the readers must not call it
+    calls = [f"{path}: {line.strip()}" for path, line in _code_lines() if re.search(r'\bnp\.trapz\(', line)]
+    assert calls == []
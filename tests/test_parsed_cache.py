@@ -0,0 +1,46 @@
+import os
+import numpy as np
+import pandas as pd
+
+import parsed_cache
+from utils import _read_rasp_ff, open_file_nf1, open_file_nf_6pro_3ch_rasp_ff
+
+
+def test_round_trip_rasp_ff(rasp_ff_file, cache_dir):
+    expected = _read_rasp_ff(rasp_ff_file)
+    # First load parses and stores, the second one reads the memory-mapped arrays
+    for _ in range(2):
+        pd.testing.assert_frame_equal(parsed_cache.load_frame(rasp_ff_file, 'rasp_ff'), expected)
+    key = parsed_cache.entry_key(rasp_ff_file, 'rasp_ff')
+    assert key.startswith(f"rasp_ff.v{parsed_cache.READER_VERSIONS['rasp_ff']}-")
+    assert os.path.isfile(os.path.join(cache_dir, key, 'meta.json'))
+
+
+def test_cached_readers_match(rasp_ff_file, nf1_file, cache_dir):
+    uncached, cached = open_file_nf_6pro_3ch_rasp_ff(rasp_ff_file), \
+        open_file_nf_6pro_3ch_rasp_ff(rasp_ff_file, use_cache=True)
+    pd.testing.assert_frame_equal(cached[0], uncached[0])
+    assert cached[1:] == uncached[1:]
+
+    uncached, cached = open_file_nf1(nf1_file), open_file_nf1(nf1_file, use_cache=True)
+    pd.testing.assert_frame_equal(cached[0], uncached[0])
+    assert cached[1:] == uncached[1:]
+
+
+def test_missing_text_value(tmp_path, cache_dir):
+    # A missing text value comes back as NaN, not as the string 'nan'
+    file_name = str(tmp_path / 'log.csv')
+    with open(file_name, 'w') as f:
+        f.write('x\n')
+    df = pd.DataFrame({'label': np.array(['a', np.nan, 'b', 'a'], dtype=object), 'value': [1.0, 2.0, 3.0, 4.0]})
+    parsed_cache.store(file_name, df, 'nf1')
+    loaded = parsed_cache.load_columns(file_name, 'nf1')
+    assert loaded['label'][0] == 'a' and loaded['label'][2] == 'b'
+    assert pd.isna(loaded['label'][1])
+    np.testing.assert_array_equal(loaded['value'], df['value'].to_numpy())
+
+
+def test_reader_version_in_key(rasp_ff_file, cache_dir, monkeypatch):
+    key = parsed_cache.entry_key(rasp_ff_file, 'rasp_ff')
+    monkeypatch.setitem(parsed_cache.READER_VERSIONS, 'rasp_ff', parsed_cache.READER_VERSIONS['rasp_ff'] + 1)
+    assert parsed_cache.entry_key(rasp_ff_file, 'rasp_ff') != key
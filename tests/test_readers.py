@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import baseline
+from utils import (read_packed_csv, open_file_nf_6pro_3ch_rasp_ff, open_file_nf_6pro_3ch_rasp_ff_chunked,
+                   RASP_FF_PACKED_COLUMN, RASP_FF_CHANNELS, NF1_PACKED_COLUMN, NF1_CHANNELS)
+
+TOTALS = ['total_E_BAT', 'total_E_RF', 'total_E_PA', 'total_E_BB']
+
+
+# ===== PACKED PARSER =====
+
+def test_packed_rasp_ff_matches_split(rasp_ff_file):
+    expected = baseline.split_packed(pd.read_csv(rasp_ff_file), RASP_FF_PACKED_COLUMN, RASP_FF_CHANNELS)
+    pd.testing.assert_frame_equal(read_packed_csv(rasp_ff_file, RASP_FF_PACKED_COLUMN, RASP_FF_CHANNELS), expected)
+
+
+def test_packed_nf1_matches_split(nf1_file):
+    expected = baseline.split_packed(pd.read_csv(nf1_file), NF1_PACKED_COLUMN, NF1_CHANNELS)
+    pd.testing.assert_frame_equal(read_packed_csv(nf1_file, NF1_PACKED_COLUMN, NF1_CHANNELS, dtype=None), expected)
+
+
+def test_packed_chunks_match_whole(rasp_ff_file):
+    whole = read_packed_csv(rasp_ff_file, RASP_FF_PACKED_COLUMN, RASP_FF_CHANNELS)
+    chunks = pd.concat(read_packed_csv(rasp_ff_file, RASP_FF_PACKED_COLUMN, RASP_FF_CHANNELS, chunksize=333),
+                       ignore_index=True)
+    pd.testing.assert_frame_equal(chunks, whole)
+
+
+def test_packed_short_row_is_nan(tmp_path):
+    # The second row lost its last packed value: NaN there, the next columns unchanged
+    file_name = tmp_path / 'short.csv'
+    file_name.write_text('Timestamp,"a,b,c",count\n'
+                         '2025-05-20 14:00:00,"1.5,2.5,3.5",16\n'
+                         '2025-05-20 14:00:01,"1.5,2.5",32\n')
+    df = read_packed_csv(str(file_name), 'a,b,c', ['a', 'b', 'c'])
+    assert df['count'].tolist() == [16, 32]
+    assert df['b'].tolist() == [2.5, 2.5]
+    assert df['c'].iloc[0] == 3.5 and np.isnan(df['c'].iloc[1])
+
+
+# ===== RASP_FF READERS =====
+
+@pytest.fixture(scope='module')
+def full(rasp_ff_file):
+    return open_file_nf_6pro_3ch_rasp_ff(rasp_ff_file)
+
+
+def test_rasp_ff_matches_baseline(rasp_ff_file, full):
+    df, sps_mean, sps_count_mean, log_duration, energy = full
+    ref_df, ref_sps_mean, ref_sps_count_mean, ref_duration, ref_energy = baseline.open_file_rasp_ff(rasp_ff_file)
+    for column in ['dt', 'P_RF', 'E_BAT_orig', 'E_RF_orig', 'E_PA_orig', 'E_BB_orig', 'sample_diff', 'SPS']:
+        np.testing.assert_allclose(df[column].to_numpy(dtype=float), ref_df[column].to_numpy(dtype=float),
+                                   rtol=1e-12, err_msg=column)
+    assert sps_mean == pytest.approx(ref_sps_mean, rel=1e-12)
+    assert sps_count_mean == pytest.approx(ref_sps_count_mean, rel=1e-12)
+    assert log_duration == ref_duration
+    for name in TOTALS:
+        assert energy[name] == pytest.approx(ref_energy[name], rel=1e-12)
+
+
+@pytest.mark.parametrize('chunksize', [1, 100, 777, 1_000_000])
+def test_chunked_matches_full(rasp_ff_file, full, chunksize):
+    _, sps_mean, sps_count_mean, log_duration, energy = full
+    chunked = open_file_nf_6pro_3ch_rasp_ff_chunked(rasp_ff_file, chunksize=chunksize)
+    assert chunked[0] == pytest.approx(sps_mean, rel=1e-12)
+    assert chunked[1] == pytest.approx(sps_count_mean, rel=1e-12)
+    assert chunked[2] == log_duration
+    for name in TOTALS:
+        assert chunked[3][name] == pytest.approx(energy[name], rel=1e-12)
+
+
+@pytest.mark.parametrize('log', ['rasp_ff_file', 'short_rasp_ff_file'])
+def test_compact_equals_full(request, log):
+    file_name = request.getfixturevalue(log)
+    df, *expected = open_file_nf_6pro_3ch_rasp_ff(file_name)
+    session, *totals = open_file_nf_6pro_3ch_rasp_ff(file_name, compact=True)
+    # float64 compact mode: same numbers, not just close ones (the int16/int32
+    # counters of the compact form must not change the SPS)
+    assert totals == expected
+    assert session.memory_usage() * 3 < df.memory_usage(deep=True).sum()
+    for column in ['P_RF', 'E_BAT_orig', 'E_RF_orig', 'SPS', 'time_formated_abs', 'video_session']:
+        np.testing.assert_array_equal(session[column].to_numpy(), df[column].to_numpy(), err_msg=column)
+
+
+def test_compact_float32_close(rasp_ff_file, full):
+    _, sps_mean, sps_count_mean, log_duration, energy = full
+    _, *totals = open_file_nf_6pro_3ch_rasp_ff(rasp_ff_file, compact=True, dtype=np.float32)
+    assert totals[:3] == [pytest.approx(sps_mean), sps_count_mean, log_duration]
+    for name in TOTALS:
+        assert totals[3][name] == pytest.approx(energy[name], rel=1e-5)
@@ -0,0 +1,104 @@
+import os
+import json
+import time
+import shutil
+import socket
+import subprocess
+import urllib.request
+import pandas as pd
+import pytest
+
+from scenario_engine import ScenarioEngine
+
+SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'website', 'server')
+FIGURES = ['total_energy', 'total_rf_energy', 'battery_percent', 'co2_min', 'co2_max']
+
+REQUESTS = [
+    # Streaming: default and explicit quality, fallback devices, 4G <-> LTE synonyms
+    {'device': '12mini', 'network': 'LTE', 'mobility': 'static',
+     'activities': [{'name': 'netflix', 'duration': 30}, {'name': 'youtube', 'duration': 12.5, 'quality': '480p'}]},
+    {'device': 'pixel-8', 'network': '4G', 'mobility': 'static',
+     'activities': [{'name': 'amazon', 'duration': 45}, {'name': 'disney', 'duration': 10, 'quality': 'eco'}]},
+    # Short videos and calls, moving, over 3G and WiFi
+    {'device': '6pro', 'network': '4G', 'mobility': 'moving',
+     'activities': [{'name': 'tiktok', 'duration': 20}, {'name': 'insta', 'duration': 5}, {'name': 'call', 'duration': 8}]},
+    {'device': 'iphone-15', 'network': '3G', 'mobility': 'static',
+     'activities': [{'name': 'call', 'duration': 15}, {'name': 'ytshorts', 'duration': 3}]},
+    {'device': 'samsung-s24', 'network': 'wifi', 'mobility': 'static',
+     'activities': [{'name': 'call', 'duration': 60}, {'name': 'apple', 'duration': 25, 'quality': 'high'}]},
+    # Nothing matches: fallback activities with no consumption
+    {'device': 'unknown-phone', 'network': '2G', 'mobility': 'static',
+     'activities': [{'name': 'netflix', 'duration': 30}, {'name': 'gaming', 'duration': 10}]},
+    # No device and no mobility; no network with no activities
+    {'network': '4G', 'activities': [{'name': 'insta', 'duration': 7}]},
+    {'activities': []},
+]
+
+
+def _node_ready():
+    # server.js needs node and its npm dependencies (npm install in website/server)
+    if shutil.which('node') is None:
+        return False
+    check = subprocess.run(['node', '-e', "require('express'); require('cors'); require('body-parser')"],
+                           cwd=SERVER_DIR, capture_output=True)
+    return check.returncode == 0
+
+
+@pytest.fixture(scope='module')
+def server():
+    if not _node_ready():
+        pytest.skip("node or the server dependencies are not installed")
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    process = subprocess.Popen(['node', 'server.js'], cwd=SERVER_DIR, env={**os.environ, 'PORT': str(port)},
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 15
+    while True:
+        try:
+            urllib.request.urlopen(url, timeout=1).close()
+            break
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                pytest.fail("server.js did not start")
+            time.sleep(0.1)
+    yield url
+    process.terminate()
+    process.wait()
+
+
+def _post(url, body):
+    request = urllib.request.Request(url, json.dumps(body).encode(), {'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.load(response)
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return ScenarioEngine(SERVER_DIR)
+
+
+@pytest.mark.parametrize('body', REQUESTS)
+def test_calculate_matches_server(server, engine, body):
+    expected = _post(f"{server}/calculate", body)
+    result = engine.calculate(body)
+    for figure in FIGURES:
+        assert result[figure] == pytest.approx(expected[figure], rel=1e-12, abs=1e-15), figure
+    assert [(a['fallback'], a['consumption']) for a in result['activities']] == \
+        [(a['fallback'], pytest.approx(a['consumption'], rel=1e-12)) for a in expected['activities']]
+
+
+def test_batch_matches_calculate(engine):
+    rows = [{'timeline': i, 'device': body.get('device'), 'network': body.get('network'),
+             'mobility': body.get('mobility'), **activity}
+            for i, body in enumerate(REQUESTS) for activity in body['activities']]
+    batch = engine.evaluate_batch(pd.DataFrame(rows))
+    for i, body in enumerate(REQUESTS):
+        if not body['activities']:
+            continue
+        result = engine.calculate(body)
+        for figure in FIGURES:
+            assert batch.loc[i, figure] == pytest.approx(result[figure], rel=1e-12, abs=1e-15), (i, figure)
+        assert batch.loc[i, 'fallbacks'] == sum(a['fallback'] for a in result['activities'])
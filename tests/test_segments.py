@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import baseline
+from segments import SegmentIndex, RASP_FF_POWER_COLUMNS
+from utils import open_file_nf_6pro_3ch_rasp_ff
+
+
+@pytest.fixture(scope='module')
+def session(rasp_ff_file):
+    df = open_file_nf_6pro_3ch_rasp_ff(rasp_ff_file)[0]
+    return df, SegmentIndex.from_frame(df, 'Timestamp', 'useful_data')
+
+
+def _seconds(df):
+    return (df['Timestamp'] - df['Timestamp'].iloc[0]).dt.total_seconds().to_numpy()
+
+
+def test_segments_match_trapezoid(session):
+    df, index = session
+    table = index.segments()
+    # useful_data alternates 240 s on / 60 s off: 4 segments in 600 s
+    assert table['label'].tolist() == [1, 0, 1, 0]
+    assert table['rows'].sum() == len(df)
+    seconds = _seconds(df)
+    for row in table.itertuples():
+        rows = slice(row.start_row, row.end_row)
+        for channel in RASP_FF_POWER_COLUMNS:
+            expected = baseline.trapezoid(df[channel].to_numpy()[rows], x=seconds[rows])
+            assert getattr(row, f'E_{channel[2:]}_J') == pytest.approx(expected, rel=1e-12)
+
+
+def test_window_energy_matches_trapezoid(session):
+    df, index = session
+    start, end = pd.Timestamp('2025-05-20 14:01:10.1'), pd.Timestamp('2025-05-20 14:07:00')
+    mask = ((df['Timestamp'] >= start) & (df['Timestamp'] <= end)).to_numpy()
+    assert df.iloc[index.rows(start, end)].index.tolist() == df.index[mask].tolist()
+    energy = index.energy(start, end)
+    for channel in RASP_FF_POWER_COLUMNS:
+        expected = baseline.trapezoid(df[channel].to_numpy()[mask], x=_seconds(df)[mask])
+        assert energy[channel] == pytest.approx(expected, rel=1e-12)
+
+
+def test_whole_energy_matches_reader(session):
+    df, index = session
+    energy = index.energy()
+    for channel in RASP_FF_POWER_COLUMNS:
+        assert energy[channel] == pytest.approx(df[f'E_{channel[2:]}_orig'].iloc[-1], rel=1e-12)
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from uncertainty import scenario_intervals
+
+COLUMNS = ['E_BAT_Jm', 'E_RF_Jm']
+
+
+def _loop_intervals(df, n_resamples, confidence, seed):
+    # One scenario at a time, every resample drawn explicitly (same draws as
+    # the batch version: one generator per number of repetitions)
+    alpha = (1 - confidence) / 2
+    rows = []
+    for scenario, group in df.groupby('scenario_id', sort=True):
+        values = group[COLUMNS].to_numpy(dtype=float)
+        n = len(values)
+        draws = np.random.default_rng([seed, n]).multinomial(n, np.full(n, 1 / n), size=n_resamples)
+        row = {'scenario_id': scenario, 'n_repetitions': n}
+        for i, column in enumerate(COLUMNS):
+            valid = ~np.isnan(values[:, i])
+            with np.errstate(invalid='ignore', divide='ignore'):
+                means = draws @ np.where(valid, values[:, i], 0.0) / (draws @ valid)
+            means = means[~np.isnan(means)]
+            row[f'{column}_se'] = means.std(ddof=1) if len(means) > 1 else np.nan
+            low, high = np.quantile(means, [alpha, 1 - alpha]) if len(means) else (np.nan, np.nan)
+            row[f'{column}_ci_low'], row[f'{column}_ci_high'] = low, high
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def repetitions():
+    rng = np.random.default_rng(4)
+    scenarios = np.repeat([f's{i:02d}' for i in range(12)], rng.integers(1, 6, 12))
+    df = pd.DataFrame({'scenario_id': rng.permutation(scenarios),
+                       'E_BAT_Jm': rng.normal(60, 5, len(scenarios)),
+                       'E_RF_Jm': rng.normal(20, 3, len(scenarios))})
+    df.loc[df.index[:2], 'E_RF_Jm'] = np.nan    # Missing values are skipped, like DataFrame.mean
+    return df
+
+
+def test_intervals_match_loop(repetitions):
+    result = scenario_intervals(repetitions, 'scenario_id', COLUMNS, n_resamples=2000, seed=7)
+    expected = _loop_intervals(repetitions, 2000, 0.95, 7)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, rtol=1e-9)
+
+
+def test_intervals_do_not_depend_on_other_scenarios(repetitions):
+    # The interval of a scenario is the same in an incremental or a full build
+    alone = repetitions[repetitions['scenario_id'] == 's03']
+    full = scenario_intervals(repetitions, 'scenario_id', COLUMNS, n_resamples=500)
+    part = scenario_intervals(alone, 'scenario_id', COLUMNS, n_resamples=500)
+    pd.testing.assert_frame_equal(part, full[full['scenario_id'] == 's03'].reset_index(drop=True),
+                                  check_dtype=False)
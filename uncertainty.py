@@ -0,0 +1,166 @@
+"""
+Bootstrap confidence intervals of the scenario energy figures.
+
+Each scenario of a summary CSV is the mean of a few repetitions (3 to 5 files,
+`1_5_...`, `2_5_...`). The repetitions of every scenario are laid out in one
+NaN-padded matrix (scenarios x repetitions x metrics) and resampled in batch:
+all the scenarios with n repetitions share one set of multinomial resampling
+weights, so their resampled means are a single matrix product, and a
+scenario's interval only depends on its own values (the same in an incremental
+or a full build). No Python loop runs over the scenarios.
+
+    intervals = scenario_intervals(per_file_df, 'scenario_id', ['E_BAT_Jm', 'E_RF_Jm'])
+    # scenario_id, n_repetitions, E_BAT_Jm_se, E_BAT_Jm_ci_low, E_BAT_Jm_ci_high, ...
+"""
+import numpy as np
+import pandas as pd
+
+DEFAULT_RESAMPLES = 10_000
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_SEED = 0
+BATCH_ELEMENTS = 4_000_000   # Distinct resampled means per batch of groups (bounds memory)
+
+
+def repetition_matrix(values, groups):
+    """
+    Lays the rows of each group out in a NaN-padded matrix.
+
+    Args:
+        values: array (rows, metrics)
+        groups: group label of each row
+
+    Returns:
+        np.ndarray: labels of the groups (sorted)
+        np.ndarray: matrix (groups, max repetitions, metrics)
+        np.ndarray: number of rows of each group
+    """
+    values = np.asarray(values, dtype=float)
+    labels, codes = np.unique(np.asarray(groups), return_inverse=True)
+    order = np.argsort(codes, kind='stable')
+    counts = np.bincount(codes, minlength=len(labels))
+    # Position of each row inside its group
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    positions = np.arange(len(codes)) - np.repeat(starts, counts)
+    matrix = np.full((len(labels), max(counts.max(initial=0), 1), values.shape[1]), np.nan)
+    matrix[codes[order], positions] = values[order]
+    return labels, matrix, counts
+
+
+def _resample_weights(n, n_resamples, seed):
+    """
+    Multinomial counts of each of n repetitions in every resample, shared by
+    all the groups of n repetitions (same seed and n -> same draws).
+
+    Returns:
+        np.ndarray: distinct weight vectors, (distinct, n)
+        np.ndarray: number of resamples drawing each of them
+    """
+    rng = np.random.default_rng([seed, n])
+    draws = rng.multinomial(n, np.full(n, 1 / n), size=n_resamples)
+    weights, hits = np.unique(draws, axis=0, return_counts=True)
+    return weights.astype(float), hits
+
+
+def _by_repetition(values):
+    # (groups, n, metrics) -> (groups * metrics, n)
+    return values.transpose(0, 2, 1).reshape(-1, values.shape[1])
+
+
+def _weighted_summary(means, hits, qs):
+    """
+    Quantiles (np.quantile's linear method) and standard deviation of each row
+    of resampled means, where the value means[i, j] was drawn hits[j] times.
+    NaN means are skipped.
+    """
+    order = np.argsort(means, axis=1)                 # NaN last
+    values = np.take_along_axis(means, order, axis=1)
+    counts = np.where(np.isnan(values), 0, hits[order])
+    cumulative = np.cumsum(counts, axis=1)
+    total = cumulative[:, -1]
+    rows = np.arange(len(means))
+
+    def at_rank(rank):
+        # Value of the sorted (expanded) resamples at a 0-based rank
+        position = (cumulative <= rank[:, None]).sum(axis=1)
+        return values[rows, np.minimum(position, values.shape[1] - 1)]
+
+    quantiles = []
+    for q in qs:
+        rank = q * (total - 1)
+        below = np.floor(rank)
+        lower, upper = at_rank(below), at_rank(np.minimum(below + 1, total - 1))
+        quantiles.append(np.where(total > 0, lower + (upper - lower) * (rank - below), np.nan))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        filled = np.where(counts > 0, values, 0.0)
+        mean = (filled * counts).sum(axis=1) / total
+        std = np.sqrt((counts * (filled - mean[:, None]) ** 2).sum(axis=1) / (total - 1))
+    return quantiles, std
+
+
+def bootstrap_intervals(matrix, counts, n_resamples=DEFAULT_RESAMPLES,
+                        confidence=DEFAULT_CONFIDENCE, seed=DEFAULT_SEED):
+    """
+    Bootstrap standard error and percentile interval of the mean of every group
+    and metric.
+
+    The groups are processed by number of repetitions n. The resamples of n
+    repetitions are drawn once as multinomial weights; with a few repetitions
+    they only hold a few distinct weight vectors (126 at most for n = 5), so
+    the resampled means of a whole batch of groups are one small matrix
+    product, and the quantiles are taken over the distinct means counted by
+    the number of resamples that drew them (same result as over every resample).
+
+    Args:
+        matrix: (groups, repetitions, metrics) from repetition_matrix
+        counts: number of valid repetitions of each group
+
+    Returns:
+        np.ndarray: standard error, (groups, metrics)
+        np.ndarray: lower bound, (groups, metrics)
+        np.ndarray: upper bound, (groups, metrics)
+    """
+    n_groups, _, n_metrics = matrix.shape
+    alpha = (1 - confidence) / 2
+    se, low, high = (np.full((n_groups, n_metrics), np.nan) for _ in range(3))
+    for n in np.unique(counts[counts > 0]).tolist():
+        weights, hits = _resample_weights(n, n_resamples, seed)
+        members = np.flatnonzero(counts == n)
+        batch = max(BATCH_ELEMENTS // (len(weights) * n_metrics), 1)
+        for start in range(0, len(members), batch):
+            groups = members[start:start + batch]
+            values = matrix[groups, :n]                                     # (batch, n, metrics)
+            valid = ~np.isnan(values)
+            # NaN values of a repetition are skipped, like DataFrame.mean
+            with np.errstate(invalid='ignore', divide='ignore'):
+                means = (_by_repetition(np.where(valid, values, 0.0)) @ weights.T) / \
+                    (_by_repetition(valid.astype(float)) @ weights.T)         # (batch * metrics, distinct)
+            (lower, upper), std = _weighted_summary(means, hits, [alpha, 1 - alpha])
+            shape = (len(groups), n_metrics)
+            low[groups], high[groups], se[groups] = lower.reshape(shape), upper.reshape(shape), std.reshape(shape)
+    return se, low, high
+
+
+def scenario_intervals(df, group_column, columns, n_resamples=DEFAULT_RESAMPLES,
+                       confidence=DEFAULT_CONFIDENCE, seed=DEFAULT_SEED):
+    """
+    Bootstrap standard error and percentile confidence interval of the mean of
+    `columns` for every group of a per-repetition DataFrame.
+
+    Returns:
+        pd.DataFrame: group_column, n_repetitions and, for each column,
+        <column>_se, <column>_ci_low, <column>_ci_high
+    """
+    if len(df) == 0:
+        return pd.DataFrame(columns=[group_column, 'n_repetitions'] +
+                            [f'{c}_{s}' for c in columns for s in ['se', 'ci_low', 'ci_high']])
+    values = df[columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    labels, matrix, counts = repetition_matrix(values, df[group_column].to_numpy())
+    se, low, high = bootstrap_intervals(matrix, counts, n_resamples, confidence, seed)
+
+    result = pd.DataFrame({group_column: labels, 'n_repetitions': counts})
+    for i, column in enumerate(columns):
+        result[f'{column}_se'] = se[:, i]
+        result[f'{column}_ci_low'] = low[:, i]
+        result[f'{column}_ci_high'] = high[:, i]
+    return result
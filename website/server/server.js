@@ -3,84 +3,116 @@ const express = require('express');
 const cors = require('cors');
 const bodyParser = require('body-parser');
 const fs = require('fs');
-const csv = require('csv-parser');
+const crypto = require('crypto');
 
 const app = express();
-const PORT = 5000;
+const PORT = parseInt(process.env.PORT) || 5000;
+
+// Largest /calculate/batch: MAX_BATCH timelines of up to TIMELINE_BYTES of JSON each
+// (about 60 activities), the JSON body limit is derived from it
+const MAX_BATCH = 1000;
+const TIMELINE_BYTES = 4096;
+const BODY_LIMIT = MAX_BATCH * TIMELINE_BYTES;
 
 app.use(cors());
-app.use(bodyParser.json());
-
-let energyTable = [];
-
-// Load the scenario summary CSV
-const allEnergyTables = [];
-
-function loadEnergyCSV(filePath) {
-  return new Promise((resolve) => {
-    const table = [];
-    fs.createReadStream(filePath)
-      .pipe(csv())
-      .on('data', (row) => {
-        table.push({
-          scenario_id: row.scenario_id,
-          E_BAT_Jm: parseFloat(row.E_BAT_Jm),
-          E_RF_Jm: parseFloat(row.E_RF_Jm),
-          E_BB_Jm: parseFloat(row.E_BB_Jm),
-          E_PA_Jm: parseFloat(row.E_PA_Jm)
-        });
-      })
-      .on('end', () => {
-        resolve(table);
-      });
-  });
+app.use(bodyParser.json({ limit: BODY_LIMIT }));
+
+// Scenario index compiled from the summary CSVs and batteries_ue.csv by
+// `python scenario_index.py`: lowercase keys, fallback chains already resolved
+const INDEX_FILE = 'scenario_index.json';
+
+function loadScenarioIndex(filePath) {
+  let index;
+  try {
+    index = JSON.parse(fs.readFileSync(filePath, 'utf8'));
+  } catch (err) {
+    console.error(`❌ Cannot load ${filePath}: ${err.message}`);
+    console.error('   Build it with: python scenario_index.py');
+    process.exit(1);
+  }
+  // Warn when a source CSV changed after the index was built
+  for (const [file, sha256] of Object.entries(index.sources || {})) {
+    if (!fs.existsSync(file)) continue;
+    if (crypto.createHash('sha256').update(fs.readFileSync(file)).digest('hex') !== sha256) {
+      console.warn(`⚠️ ${file} changed since ${filePath} was built, run python scenario_index.py`);
+    }
+  }
+  return index;
 }
 
-// Load both short video and streaming datasets
-Promise.all([
-  loadEnergyCSV('short_video_scenario_summary_df.csv'),                // short video apps
-  loadEnergyCSV('video_streaming_scenario_summary_df.csv'),// long video apps
-  loadEnergyCSV('visio_scenario_summary_df.csv'),           // visio apps
-  loadEnergyCSV('others_scenario_summary_df.csv'),
-  loadEnergyCSV('call_scenario_summary_df.csv')                // NEW: voice call scenarios
-]).then(([shortVideoTable, longVideoTable, visioTable, othersTable,callTable]) => {
-  energyTable = [...shortVideoTable, ...longVideoTable, ...visioTable,...othersTable,...callTable];
-  console.log(`✅ Total scenarios loaded: ${energyTable.length}`);
-});
+// Loaded synchronously: every request sees the complete tables
+const scenarioIndex = loadScenarioIndex(INDEX_FILE);
+const scenarios = new Map(Object.entries(scenarioIndex.scenarios));   // scenario_id -> [E_BAT_Jm, E_RF_Jm]
+const fallbacks = new Map(Object.entries(scenarioIndex.fallbacks));
+const deviceSpecs = scenarioIndex.devices;
+const streamingApps = scenarioIndex.rules.streaming_apps;
+const defaultQuality = scenarioIndex.rules.default_quality;
+console.log(`✅ Total scenarios loaded: ${scenarios.size}`);
+console.log('✅ Device specs loaded:', Object.keys(deviceSpecs).length);
+
+// Scenario of the device for the first network variant that has one,
+// else the scenario of the fallback devices (x / 12mini for streaming, 6pro otherwise)
+function findScenario(devKey, netVariants, suffix) {
+  for (const nv of netVariants) {
+    const key = `${devKey}_${nv}_${suffix}`;
+    if (scenarios.has(key)) return { key, match: scenarios.get(key) };
+  }
+  const key = fallbacks.get(`${netVariants.join('/')}_${suffix}`);
+  if (key) return { key, match: scenarios.get(key) };
+  return { key: `${devKey}_${netVariants[netVariants.length - 1]}_${suffix}`, match: null };
+}
 
 
+// Hot-path logging of the calculations:
+//   LOG_MODE   'full' (default, the detailed lines), 'json' (one structured line per request) or 'off'
+//   LOG_SAMPLE fraction of the requests logged, e.g. 0.01 under load (1 by default)
+const LOG_MODE = process.env.LOG_MODE || 'full';
+const LOG_SAMPLE = Number.isFinite(parseFloat(process.env.LOG_SAMPLE)) ? parseFloat(process.env.LOG_SAMPLE) : 1;
 
-let deviceSpecs = {};
+// LRU cache of the results, keyed by the normalized request (CALC_CACHE_SIZE entries, 0 to disable)
+const CACHE_SIZE = Number.isFinite(parseInt(process.env.CALC_CACHE_SIZE)) ? parseInt(process.env.CALC_CACHE_SIZE) : 1000;
 
-fs.createReadStream('batteries_ue.csv')
-  .pipe(csv({ separator: ';' }))
-  .on('data', (row) => {
-    const key = row.value.trim().toLowerCase(); 
-    deviceSpecs[key] = {
-      batteryWh: parseFloat(row['batterie_Wh']), 
-      screenSize: parseFloat(row['taille_ecran (inch)']),
-    };
-  })
-  .on('end', () => {
-    console.log('✅ Device specs loaded:', Object.keys(deviceSpecs).length);
-  });
+const resultCache = new Map();   // Map keeps insertion order: the first key is the least recently used
+const cacheStats = { hits: 0, misses: 0 };
+
+function cacheGet(key) {
+  const value = resultCache.get(key);
+  if (value === undefined) return undefined;
+  resultCache.delete(key);
+  resultCache.set(key, value);
+  return value;
+}
 
+function cacheSet(key, value) {
+  if (CACHE_SIZE <= 0) return;
+  resultCache.set(key, value);
+  if (resultCache.size > CACHE_SIZE) resultCache.delete(resultCache.keys().next().value);
+}
 
+// Everything the result depends on: lowercase keys, condition, durations as numbers
+function requestKey({ device, network, mobility, activities = [] }) {
+  return JSON.stringify([
+    (device || 'autre').toLowerCase(),
+    (network || '').toLowerCase(),   // only needed by the activities, like scoreRequest
+    mobility === 'moving' ? 'dyna' : 'stat',
+    activities.map(a => [a.name.toLowerCase(), a.quality ? String(a.quality).toLowerCase() : '', String(Number(a.duration))]),
+  ]);
+}
 
-app.post('/calculate', (req, res) => {
-  const { device, network, mobility, activities = [] } = req.body;
+// Energy, battery and CO2 of one request, with the consumption of each activity
+function scoreRequest({ device, network, mobility, activities = [] }, verbose) {
   const condition = mobility === 'moving' ? 'Dyna' : 'stat';
   const deviceName = device || 'autre';
 
-  console.log(`\n--- Calculating energy ---`);
-  const activityNames = activities.map(a => a.name).join(', ');
-  console.log(`📱 Device: ${deviceName}, 🌐 Network: ${network}, 🧭 Mobility: ${mobility}, 🎯 Activities: [${activityNames}]`);
-  
+  if (verbose) {
+    console.log(`\n--- Calculating energy ---`);
+    const activityNames = activities.map(a => a.name).join(', ');
+    console.log(`📱 Device: ${deviceName}, 🌐 Network: ${network}, 🧭 Mobility: ${mobility}, 🎯 Activities: [${activityNames}]`);
+  }
+
   let totalEnergy = 0;
   let totalRfEnergy = 0; 
-  const details = [];
-  // Define which activities are considered streaming
-  const streamingApps = ['netflix', 'disney', 'amazon', 'apple', 'youtube'];
+  const consumptions = [];
 
   for (const activity of activities) {
     //–– normalize keys for case-insensitive matching
@@ -95,131 +127,52 @@ app.post('/calculate', (req, res) => {
     let netVariants = [netLower];
     if (netLower === '4g')      netVariants.push('lte');
     else if (netLower === 'lte') netVariants.push('4g');
-  
-    let match        = null;
-    let scenarioKey  = '';
-    // Attempt direct match first (device + all info)
-
-    // Attempt direct match first (device + all info)
-      if (isStreaming) {
-        // Streaming → requires quality
-        let quality = 'auto';
-        if (activity.quality) {
-          quality = activity.quality.toLowerCase();
-        } else {
-          // fallback default
-          if (actKey === 'netflix')  quality = 'eco';
-          if (actKey === 'youtube')  quality = '720p';
-          if (actKey === 'amazon')   quality = 'good';
-          if (actKey === 'apple')    quality = 'auto';
-          if (actKey === 'disney')   quality = 'eco';
-        }
-        for (const nv of netVariants) {
-          const key = `${devKey}_${nv}_${actKey}_${quality}_${condKey}`;
-          scenarioKey = key;
-          match = energyTable.find(e => e.scenario_id.toLowerCase() === key);
-          if (match) break;
-        }
-
-        // Fallback to x device
-        if (!match) {
-          for (const nv of netVariants) {
-            const key = `x_${nv}_${actKey}_${quality}_${condKey}`;
-            scenarioKey = key;
-            match = energyTable.find(e => e.scenario_id.toLowerCase() === key);
-            if (match) break;
-          }
-        }
-
-        // 3. Fallback to '12mini' if no data for X device (worst case)
-        if (!match) {
-          for (const nv of netVariants) {
-            const key = `12mini_${nv}_${actKey}_${quality}_${condKey}`;
-            scenarioKey = key;
-            match = energyTable.find(e => e.scenario_id.toLowerCase() === key);
-            if (match) break;
-          }
-        }
-
-        } else if (activity.name.toLowerCase() === 'call') {
-            let voiceTech = activity.quality || 'VoLTE';  // Default to VoLTE if not explicitly provided
-
-            if (netLower === '3g') {
-                // Force UMTS if user selects 3G network
-                voiceTech = 'UMTS';
-            } else if (netLower === 'wifi') {
-                // VoWIFI over 4G fallback when using WiFi for voice calls
-                voiceTech = 'VoWIFI';
-                netVariants = ['4g']; // force lookup in 4G scenarios
-            }
-
-            // Try matching scenario for given device
-            for (const nv of netVariants) {
-                const key = `${devKey}_${nv}_${voiceTech}`;
-                scenarioKey = key;
-                match = energyTable.find(e =>
-                    e.scenario_id.toLowerCase() === key.toLowerCase()
-                );
-                if (match) break;
-            }
-
-            // Fallback to 6Pro if no match
-            if (!match) {
-                for (const nv of netVariants) {
-                    const key = `6pro_${nv}_${voiceTech}`;
-                    scenarioKey = key;
-                    match = energyTable.find(e =>
-                        e.scenario_id.toLowerCase() === key.toLowerCase()
-                    );
-                    if (match) break;
-                }
-            }
-        }
- else {
-        // Non-streaming → no quality
-        for (const nv of netVariants) {
-          const key = `${devKey}_${nv}_${actKey}_${condKey}`;
-          scenarioKey = key;
-          match = energyTable.find(e => e.scenario_id.toLowerCase() === key);
-          if (match) break;
-        }
-
-        // Fallback to 6pro device
-        if (!match) {
-          for (const nv of netVariants) {
-            const key = `6pro_${nv}_${actKey}_${condKey}`;
-            scenarioKey = key;
-            match = energyTable.find(e => e.scenario_id.toLowerCase() === key);
-            if (match) break;
-          }
-        }
+
+    let suffix;
+    if (isStreaming) {
+      // Streaming → requires quality
+      const quality = activity.quality ? activity.quality.toLowerCase() : (defaultQuality[actKey] || 'auto');
+      suffix = `${actKey}_${quality}_${condKey}`;
+    } else if (actKey === 'call') {
+      let voiceTech = activity.quality || 'VoLTE';  // Default to VoLTE if not explicitly provided
+
+      if (netLower === '3g') {
+        // Force UMTS if user selects 3G network
+        voiceTech = 'UMTS';
+      } else if (netLower === 'wifi') {
+        // VoWIFI over 4G fallback when using WiFi for voice calls
+        voiceTech = 'VoWIFI';
+        netVariants = ['4g']; // force lookup in 4G scenarios
       }
+      suffix = voiceTech.toLowerCase();
+    } else {
+      // Non-streaming → no quality
+      suffix = `${actKey}_${condKey}`;
+    }
+
+    const { key: scenarioKey, match } = findScenario(devKey, netVariants, suffix);
 
-    console.log(`Scenario Key: ${scenarioKey}`);
+    if (verbose) console.log(`Scenario Key: ${scenarioKey}`);
   
     if (match) {
-      console.log("found E_BAT "+match.E_BAT_Jm)
-      console.log("found E_RF "+match.E_RF_Jm)
-      const batteryRate = parseFloat(match.E_BAT_Jm) / 3600;
+      const [eBatJm, eRfJm] = match;
+      if (verbose) {
+        console.log("found E_BAT "+eBatJm)
+        console.log("found E_RF "+eRfJm)
+      }
+      const batteryRate = eBatJm / 3600;
       const batteryConsumption = batteryRate * activity.duration;
       totalEnergy += batteryConsumption;
 
-      const rfRate = parseFloat(match.E_RF_Jm) / 3600;
+      const rfRate = eRfJm / 3600;
       const rfConsumption = rfRate * activity.duration;
       totalRfEnergy += rfConsumption;
 
-      details.push({ ...activity, consumption : batteryConsumption, fallback: false });
+      consumptions.push({ consumption: batteryConsumption, fallback: false });
     } else {
-      details.push({
-        ...activity,
-        consumption: 0,
-        fallback:    true,
-        network,
-        mobility
-      });
+      consumptions.push({ consumption: 0, fallback: true });
     }
   }
-  
 
   const baseDevice = '6pro';
   const userKey = deviceName.toLowerCase();
@@ -237,23 +190,77 @@ app.post('/calculate', (req, res) => {
   const co2Min = energy_kWh * 21.7; // RTE 2024
   const co2Max = energy_kWh * 60; // ADEME
 
-  console.log(`⚡ Total Energy: ${totalEnergy.toFixed(2)} Wh`);
-  console.log(`🔋 Battery %: ${batteryPercent.toFixed(1)}%`);
-  console.log(`🌍 CO2 min: ${co2Min.toFixed(2)} g`);
-  console.log(`--- End calculation ---\n`);
-
-  res.json({
-    // Send both min and max
+  if (verbose) {
+    console.log(`⚡ Total Energy: ${totalEnergy.toFixed(2)} Wh`);
+    console.log(`🔋 Battery %: ${batteryPercent.toFixed(1)}%`);
+    console.log(`🌍 CO2 min: ${co2Min.toFixed(2)} g`);
+    console.log(`--- End calculation ---\n`);
+  }
 
+  return {
     total_energy: totalEnergy,
     total_rf_energy: totalRfEnergy,
     battery_percent: batteryPercent,
     co2_min: co2Min,
     co2_max: co2Max,
-    activities: details
-    });
+    consumptions
+  };
 }
-);
+
+// Response of /calculate: the (cached) figures and the activities of this request
+function calculate(body) {
+  const sampled = LOG_MODE !== 'off' && Math.random() < LOG_SAMPLE;
+  const key = requestKey(body);
+  let scored = cacheGet(key);
+  const cached = scored !== undefined;
+  if (cached) {
+    cacheStats.hits++;
+    if (sampled && LOG_MODE === 'full') console.log(`♻️ Cached result: ${key}`);
+  } else {
+    cacheStats.misses++;
+    scored = scoreRequest(body, sampled && LOG_MODE === 'full');
+    cacheSet(key, scored);
+  }
+  if (sampled && LOG_MODE === 'json') {
+    console.log(JSON.stringify({ key, cached, total_energy: scored.total_energy, battery_percent: scored.battery_percent }));
+  }
+
+  const { network, mobility, activities = [] } = body;
+  const { consumptions, ...totals } = scored;
+  const details = activities.map((activity, i) => consumptions[i].fallback
+    ? { ...activity, consumption: 0, fallback: true, network, mobility }
+    : { ...activity, consumption: consumptions[i].consumption, fallback: false });
+  // Send both min and max
+  return { ...totals, activities: details };
+}
+
+app.post('/calculate', (req, res) => {
+  res.json(calculate(req.body));
+});
+
+// Scores many timelines in one round trip: { timelines: [<body of /calculate>, ...] }
+app.post('/calculate/batch', (req, res) => {
+  const { timelines } = req.body || {};
+  if (!Array.isArray(timelines)) {
+    return res.status(400).json({ error: 'timelines must be an array of /calculate requests' });
+  }
+  if (timelines.length > MAX_BATCH) {
+    return res.status(413).json({ error: `at most ${MAX_BATCH} timelines per batch` });
+  }
+  const results = timelines.map(timeline => {
+    try {
+      return calculate(timeline);
+    } catch (err) {
+      return { error: err.message };
+    }
+  });
+  res.json({ results });
+});
+
+app.get('/calculate/stats', (req, res) => {
+  res.json({ cache_size: resultCache.size, cache_capacity: CACHE_SIZE, ...cacheStats, log_mode: LOG_MODE, log_sample: LOG_SAMPLE });
+});
+
 
 app.get('/', (req, res) => {
   res.send('✅ Hello from the energy simulator backend!');